@@ -11,22 +11,146 @@ pppoker_id = 1
 supremapoker_id = 2
 pokerbros_id = 3
 
+# Prioridade de cada ação, na Celery e na fila interna do robô (0 é a mais alta)
 actions_priorities = {
-    'base': 0,
-    'transaction': 0,
-    'balance': 0,
-    'members': 0,
-    'club_stats': 0,
-    'real_time_stats': 0,
+    'base': 1,
+    'transaction': 2,
+    'balance': 1,
+    'members': 1,
+    'club_stats': 1,
+    'real_time_stats': 1,
     'send_chips': 0,
     'receive_chips': 0
 }
 
 NUMERO_DE_FILAS_DE_PRIORIDADE_POR_ROBO = 3 # 0 é a mais alta prioridade, 1 é a média e 2 é a mais baixa
 THRESHOLD_CONTINUOS_QUEUE_FLUX = 2  # Threshold baixo para manter fluxo contínuo da queue
+PRIORITY_AGING_SECONDS = 30  # Espera (s) que equivale a subir um nível de prioridade na fila interna do robô
 TEMPO_MEDIO_TASKS = 5  # Tempo médio de execução de uma task em segundos
 BATCH_SIZE = 12  # Tamanho do lote para transferir do buffer para a principal
 
+# Reordenação da fila do robô por afinidade de aba
+AFFINITY_WINDOW = 5  # Quantas operações do início da fila podem ser adiantadas para aproveitar a aba atual
+AFFINITY_MAX_SKIPS = 3  # Vezes que uma operação pode ser passada para trás antes de ser executada obrigatoriamente
+
+# Envio de resultados via webhook
+WEBHOOK_TIMEOUT = (3.05, 10)  # (conexão, leitura) em segundos
+WEBHOOK_POOL_SIZE = 4  # Conexões mantidas abertas por destino
+WEBHOOK_MAX_ATTEMPTS = 8  # Tentativas antes de mover o resultado para a fila de falhas
+WEBHOOK_BACKOFF_BASE = 1  # Espera (s) após a primeira falha, dobrada a cada nova tentativa
+WEBHOOK_BACKOFF_MAX = 300  # Espera máxima (s) entre tentativas
+WEBHOOK_POLL_INTERVAL = 1  # Intervalo (s) em que o envio verifica a fila quando não é acordado
+WEBHOOK_BATCH_MODE = False  # Agrupa vários resultados em uma única requisição (também via variável de ambiente)
+WEBHOOK_BATCH_SIZE = 20  # Resultados por requisição no modo em lote; atingir esse número dispara o envio
+WEBHOOK_BATCH_MAX_WAIT = 2  # Tempo máximo (s) que um resultado espera o lote encher
+WEBHOOK_INFLIGHT_STALE = 60  # Tempo (s) sem atividade após o qual um item em envio é considerado abandonado
+
+# Inicialização dos aplicativos
+LAUNCH_TIMEOUT = 60  # Tempo máximo (s) até o aplicativo exibir a tela inicial
+LAUNCH_POLL_INTERVAL = 0.25  # Intervalo (s) entre as verificações da tela inicial (e a primeira busca pela janela)
+LAUNCH_FIND_MAX_INTERVAL = 2  # Intervalo máximo (s) entre as buscas pela janela, que enumeram todas as janelas
+# Pixels (posição relativa, cor) que indicam que a tela inicial do app carregou.
+# Apps sem entrada usam o primeiro passo 'color' do mapeamento Base.
+launch_fingerprints: dict[str, list[tuple[tuple[float, float], tuple[int, int, int]]]] = {}
+
+# Recuperação de falhas
+# Pixels que indicam a tela inicial já logada. Apps sem entrada usam o último passo 'color' do mapeamento Base.
+home_fingerprints: dict[str, list[tuple[tuple[float, float], tuple[int, int, int]]]] = {}
+RECOVERY_COLOR_TIMEOUT = 1.5  # Espera máxima (s) por cada cor ao tentar renavegar durante a recuperação
+# Mantém uma segunda instância já logada e minimizada para substituir a principal (o app precisa aceitar várias instâncias)
+STANDBY_INSTANCES: dict[str, bool] = {
+    'pppoker': False,
+    'supremapoker': False,
+    'pokerbros': False
+}
+
+# Reconhecimento de tela
+# Pixels que identificam cada aba, por app: {app: {aba: [(posição relativa, cor), ...]}}.
+# Abas sem entrada usam os passos 'color' do início do Ret e do fim do Nav da aba; a aba inicial usa home_fingerprints.
+screen_fingerprints: dict[str, dict[str, list[tuple[tuple[float, float], tuple[int, int, int]]]]] = {}
+SCREEN_FINGERPRINT_MIN_PIXELS = 2  # Pixels distintos exigidos para reconhecer uma aba; com menos, a aba nunca é reconhecida
+SCREEN_FINGERPRINT_POSITION_TOLERANCE = 0.01  # Distância (relativa) em que dois pixels de mapeamentos são o mesmo
+SCREEN_CONFIRM_DELAY = 0.15  # Espera (s) antes da segunda captura que confirma a aba reconhecida
+
+# Planejamento da navegação entre abas
+NAV_STEP_COST_MS = 400  # Custo estimado (ms) de cada passo de uma transição de aba ainda não medida
+NAV_COST_SMOOTHING = 0.3  # Peso de cada nova medição na média móvel do custo de uma transição
+
+# Leitura de listas roláveis (scroll)
+SCROLL_MAX_PAGES = 200  # Limite de páginas percorridas em uma única leitura de lista
+SCROLL_UNCHANGED_THRESHOLD = 2.0  # Diferença média (tons de cinza) abaixo da qual a rolagem não mudou a tela: fim da lista
+SCROLL_ALIGN_THRESHOLD = 8.0  # Erro médio máximo para aceitar o alinhamento entre duas páginas
+SCROLL_MAX_STRIDE = 16  # Máximo de rolagens entre duas leituras na busca por data (listas ordenadas por data)
+
+# Envio parcial das linhas de listas longas, enquanto a leitura continua
+RESULT_STREAM_ACTIONS = ['transaction', 'members']  # Ações cujas listas são publicadas em pedaços
+RESULT_STREAM_MODE = ""  # "" (desligado: a exportação leva a lista completa), "redis" (Redis stream), "webhook" (pedaços pelo WebhookDispatcher) ou "both"
+RESULT_STREAM_CHUNK_SIZE = 10  # Linhas por pedaço
+RESULT_STREAM_MAX_WAIT = 2  # Tempo máximo (s) que uma linha espera o pedaço encher
+RESULT_STREAM_TTL = 3600  # Tempo (s) que o stream fica disponível no Redis após a última escrita
+RESULT_STREAM_MAXLEN = 10000  # Tamanho máximo (aproximado) de cada stream
+
+# Verificação de cliques (missclickHandler.py)
+CLICK_VERIFY_ENABLED = False  # Confere também os cliques sem verify no mapeamento (pode esperar até CLICK_VERIFY_TIMEOUT por clique)
+CLICK_VERIFY_RADIUS = 30  # Metade do lado (px) da região conferida em volta do ponto clicado
+CLICK_VERIFY_TIMEOUT = 0.4  # Tempo máximo (s) esperando a região mudar antes de considerar o clique perdido
+CLICK_VERIFY_RETRIES = 2  # Novos cliques no mesmo ponto quando a verificação declarada no mapeamento falha
+MISSCLICK_MODE = "threshold"  # "exact" (qualquer pixel), "threshold" (proporção de pixels) ou "perceptual" (dHash)
+MISSCLICK_PIXEL_TOLERANCE = 24  # Diferença em tons de cinza (0-255) abaixo da qual um pixel não mudou
+MISSCLICK_CHANGE_RATIO = 0.02  # Proporção de pixels alterados para considerar que a região mudou
+MISSCLICK_PERCEPTUAL_DISTANCE = 4  # Bits diferentes no dHash (de 64) tolerados como ruído no modo "perceptual"
+
+# Execução dos passos
+STEP_SETTLE = 0.1  # Espera (s) após cada passo do mapeamento
+COLOR_WAIT_POLLS = 20  # Leituras da cor esperada por um passo 'color' antes de considerar a tela errada
+COLOR_POLL_INTERVAL = 0.3  # Intervalo (s) entre as leituras de cor
+
+# Núcleo assíncrono (roboRuntime.py)
+RUNTIME_MODE = "sync"  # "sync" (cada task da Celery conduz o robô até esvaziar a fila) ou "async" (RoboRuntime)
+RUNTIME_IO_WORKERS = 4  # Threads para leituras de tela, Redis e envios, que não usam mouse nem teclado
+RUNTIME_CONTROL_CHANNEL = "robo:control"  # Canal Redis de mensagens de controle (pause, resume, stop, status); "" desliga
+
+# Captura de tela (screenCapture.py)
+CAPTURE_GRID_SCALE = 1  # Lado (px) dos blocos da grade reduzida usada na conferência de cores; 1 lê o pixel exato
+
+# Localização de elementos que mudam de posição (templateLocator.py)
+LOCATE_SEARCH_RADIUS = 40  # Distância máxima (px) da posição esperada em que o template é procurado
+LOCATE_MIN_SCORE = 0.8  # Correlação normalizada mínima (de -1 a 1) para considerar o elemento encontrado
+
+# Leitura de textos (OCR) por tipo de campo (ocrProfiles.py)
+# Perfil de cada campo lido, pelo nome da pergunta em minúsculas; o benchmark ocr_benchmark.py compara os perfis
+OCR_FIELD_PROFILES: dict[str, str] = {
+    'saldo': 'amount',
+    'chipamount': 'amount',
+    'listatransacoes': 'amount',
+    'ganhos': 'amount',
+    'ganhomtt': 'amount',
+    'buyinspinup': 'amount',
+    'taxa': 'amount',
+    'id': 'id',
+    'listids': 'id_list',
+    'timenow': 'date',
+    'period': 'date',
+    'club': 'line',
+    'app': 'line',
+    'mode': 'line',
+}
+OCR_DEFAULT_PROFILE = 'block'  # Perfil dos campos sem entrada acima (tratamento original: SHARPEN e --psm 6)
+OCR_MIN_CONFIDENCE = 0.6  # Confiança (0 a 1) abaixo da qual a área é relida com o tratamento alternativo do perfil
+OCR_POOL_WORKERS = 2  # Processos que fazem o OCR enquanto o robô segue com os cliques; 0 faz o OCR na thread do robô
+OCR_RESULT_TIMEOUT = 30  # Tempo máximo (s) esperando uma leitura do pool
+GLYPH_MIN_SCORE = 0.85  # Semelhança mínima de cada caractere com o template para aceitar a leitura sem o Tesseract
+GLYPH_SPACE_RATIO = 0.4  # Distância entre caracteres, relativa à altura da linha, a partir da qual há um espaço
+
+# Overlay de depuração (marcações na tela dos cliques, cores e leituras)
+OVERLAY_ENABLED = False  # Desligado em produção; a variável de ambiente ROBO_OVERLAY=1 liga sem alterar o código
+OVERLAY_POLL_MS = 100  # Intervalo (ms) em que a thread do Tk desenha as marcações pendentes
+
+# Logs dos robôs
+LOG_DIR = "log"  # Um arquivo JSON lines por robô em LOG_DIR/<App>/<App>.jsonl
+LOG_BACKUP_DAYS = 14  # Dias de log mantidos após a rotação da meia-noite
+LOG_SAMPLE_EVERY = 10  # Eventos repetitivos (leituras de pixel) são registrados 1 a cada N
+
 full_feature_dict: dict[str, list[Union[str, list[str]]]] = {
     'Input': ['', '', 'Input', ["App", "Mode", "Action", "Id", "Listids", "Club", "Chipamount", "Timenow"]],
     'base': ['base', 'clube', '', ['']],
@@ -39,6 +163,27 @@ full_feature_dict: dict[str, list[Union[str, list[str]]]] = {
     'receive_chips': ['active', 'contador', 'makeTransaction', ['Ok', 'Saldo']]
 }
 
+# Tempo (em segundos) que o resultado de cada ação pode ser reaproveitado sem passar pelo robô. 0 desativa o cache
+actions_cache_ttl: dict[str, int] = {
+    'base': 0,
+    'transaction': 10,
+    'balance': 15,
+    'members': 30,
+    'club_stats': 30,
+    'real_time_stats': 15,
+    'send_chips': 0,
+    'receive_chips': 0
+}
+
+# Ações de escrita e os resultados em cache que elas tornam inválidos
+cache_invalidations: dict[str, list[str]] = {
+    'send_chips': ['balance', 'transaction', 'members', 'real_time_stats'],
+    'receive_chips': ['balance', 'transaction', 'members', 'real_time_stats']
+}
+
+# Perguntas de entrada que não diferenciam um resultado de outro na chave do cache
+CACHE_IGNORED_INPUTS = ['App', 'Mode', 'Action', 'Timenow']
+
 
 MODE = 0
 ABA = 1
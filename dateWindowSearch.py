@@ -0,0 +1,69 @@
+from typing import Optional, Callable
+
+from Constants import SCROLL_MAX_STRIDE
+
+
+class DateWindowSearch:
+    """
+    Classe responsável por encontrar, em uma lista ordenada por data, a página em que a janela de datas termina.
+
+    Em vez de comparar linha por linha, a busca lê só uma linha por posição (a última visível) e avança com passos
+    que dobram a cada leitura (1, 2, 4... rolagens, até SCROLL_MAX_STRIDE) enquanto a data ainda está dentro da janela.
+    Quando a data passa da janela, uma busca binária entre as duas últimas posições encontra a primeira rolagem em
+    que isso acontece. Para N páginas, são O(log N) leituras em vez de uma leitura por linha.
+
+    Só vale para listas ordenadas por data: a condição lida (probe) precisa ser falsa até um ponto e verdadeira depois dele.
+    """
+
+    def __init__(self, probe: Callable[[], Optional[bool]], scroll: Callable[[int], bool],
+                 max_stride: int = SCROLL_MAX_STRIDE):
+        """
+        :param probe: diz se a última linha visível já passou da janela (None se não foi possível ler a data)
+        :param scroll: rola a lista n páginas (n negativo rola para cima); retorna False se a lista não se moveu
+        """
+        self.probe = probe
+        self.scroll = scroll
+        self.max_stride = max(1, max_stride)
+        self.position = 0
+        self.probes = 0
+
+    def _probe(self) -> bool:
+        self.probes += 1
+        return bool(self.probe())
+
+    def _move_to(self, position: int) -> bool:
+        moved = self.scroll(position - self.position) if position != self.position else True
+        self.position = position
+        return moved
+
+    def locate(self) -> int:
+        """
+        Método responsável por deixar a lista na primeira posição (em rolagens a partir da atual) em que a última linha
+        visível já passou da janela; as linhas anteriores da página ainda podem estar dentro dela.
+        Se a lista terminar antes, ela fica no fim.
+
+        :return: número de rolagens a partir da posição inicial
+        """
+        if self._probe():
+            return self.position
+
+        inside, stride = 0, 1
+        while True:
+            if not self._move_to(self.position + stride):
+                # Fim da lista: a janela não termina nela
+                return self.position
+            if self._probe():
+                outside = self.position
+                break
+            inside = self.position
+            stride = min(stride * 2, self.max_stride)
+
+        while outside - inside > 1:
+            middle = (inside + outside) // 2
+            self._move_to(middle)
+            if self._probe():
+                outside = middle
+            else:
+                inside = middle
+        self._move_to(outside)
+        return self.position
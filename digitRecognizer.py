@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+from PIL import Image
+
+from ocrProfiles import binarize
+from Constants import GLYPH_MIN_SCORE, GLYPH_SPACE_RATIO
+
+GLYPH_SIZE = (16, 12)  # (altura, largura) em que cada caractere é comparado
+GLYPH_UPSCALE = 3  # Ampliação antes da binarização; as fontes dos apps têm cerca de 11 px de altura
+MAX_WIDTH_RATIO = 1.6  # Diferença máxima de largura (relativa à altura da linha) entre o caractere e o template
+
+
+class DigitRecognizer:
+    """
+    Classe responsável por ler campos numéricos (saldos, ids, datas) sem o Tesseract, comparando cada caractere
+    com templates da própria fonte do aplicativo.
+
+    A imagem é binarizada e cortada em caracteres pelas colunas vazias entre eles; cada caractere é ampliado para
+    GLYPH_SIZE (mantendo a altura da linha, para diferenciar '.', ',' e '-') e comparado com todos os templates
+    de uma vez. A confiança da leitura é a do pior caractere: abaixo de GLYPH_MIN_SCORE, a leitura é recusada e
+    quem chamou usa o OCR completo.
+
+    Os templates são treinados (train) a partir de áreas já lidas e rotuladas, como as de read_imgs/labels.json,
+    e ficam em Mapeamentos/<app>/glyphs.npz.
+    """
+
+    def __init__(self, app: str, path: Optional[str] = None):
+        self.app = app
+        self.path = path or f"Mapeamentos/{app.lower().strip()}/glyphs.npz"
+        self.chars: list[str] = []
+        self.templates = np.zeros((0, GLYPH_SIZE[0] * GLYPH_SIZE[1]))
+        self.widths = np.zeros(0)
+        if os.path.isfile(self.path):
+            self.load()
+
+    def covers(self, charset: Optional[str]) -> bool:
+        """
+        Método responsável por dizer se há template para todos os caracteres possíveis do campo.
+        Um caractere sem template seria lido como o template mais parecido, então o campo fica com o OCR completo.
+        """
+        return bool(charset) and set(charset) <= set(self.chars)
+
+    def load(self) -> None:
+        data = np.load(self.path)
+        self.chars = list(str(data["chars"]))
+        self.templates = data["templates"]
+        self.widths = data["widths"]
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        np.savez(self.path, chars="".join(self.chars), templates=self.templates, widths=self.widths)
+
+    @staticmethod
+    def _spans(text: np.ndarray) -> list[tuple[int, int]]:
+        filled = np.concatenate(([False], text.any(axis=0), [False]))
+        edges = np.flatnonzero(filled[1:] != filled[:-1])
+        return list(zip(edges[::2], edges[1::2]))
+
+    @staticmethod
+    def segment(image: Image.Image) -> tuple[np.ndarray, list[float], list[bool]]:
+        """
+        Método responsável por cortar a linha de texto em caracteres.
+
+        :return: vetores normalizados dos caracteres, largura de cada um relativa à altura da linha e, para cada
+            caractere, se há um espaço antes dele
+        """
+        gray = image.convert("L")
+        gray = gray.resize((gray.width * GLYPH_UPSCALE, gray.height * GLYPH_UPSCALE), Image.LANCZOS)
+        text = binarize(np.asarray(gray))
+        spans = DigitRecognizer._spans(text)
+        if not spans:
+            return np.zeros((0, GLYPH_SIZE[0] * GLYPH_SIZE[1])), [], []
+
+        # A linha vai do topo à base típicos dos caracteres, com folga para o que desce da base (',');
+        # assim '.', ',' e '-' mantêm a posição vertical, e a linha tem a mesma altura em qualquer captura
+        bounds = [np.flatnonzero(text[:, start:end].any(axis=1)) for start, end in spans]
+        top = int(np.median([b[0] for b in bounds]))
+        base = int(np.median([b[-1] for b in bounds]))
+        height = base - top + 1
+        line_top = max(top - height // 8, 0)
+        line = text[line_top:base + 1 + height // 4]
+        # Restos da moldura sobem acima de todos os caracteres ou ficam inteiros abaixo da base; caracteres não
+        base -= line_top
+        spans = [(start, end) for start, end in DigitRecognizer._spans(line)
+                 if not line[0, start:end].any() and line[:base + 1, start:end].any()]
+
+        vectors, widths, spaces = [], [], []
+        for i, (start, end) in enumerate(spans):
+            glyph = Image.fromarray(line[:, start:end].astype(np.uint8) * 255)
+            glyph = glyph.resize((GLYPH_SIZE[1], GLYPH_SIZE[0]), Image.BILINEAR)
+            vectors.append(np.asarray(glyph, dtype=np.float64).ravel() / 255)
+            widths.append((end - start) / height)
+            spaces.append(i > 0 and start - spans[i - 1][1] > GLYPH_SPACE_RATIO * height)
+        return np.array(vectors), widths, spaces
+
+    def train(self, samples: Iterable[tuple[Image.Image, str]]) -> int:
+        """
+        Método responsável por montar os templates a partir de imagens com o texto correto.
+        Imagens em que o número de caracteres cortados não bate com o texto são ignoradas.
+
+        :return: quantidade de caracteres usados no treino
+        """
+        vectors: dict[str, list[np.ndarray]] = {}
+        widths: dict[str, list[float]] = {}
+        used = 0
+        for image, label in samples:
+            glyphs, glyph_widths, _ = self.segment(image)
+            chars = label.replace(" ", "")
+            if len(chars) != len(glyphs):
+                continue
+            for char, vector, width in zip(chars, glyphs, glyph_widths):
+                vectors.setdefault(char, []).append(vector)
+                widths.setdefault(char, []).append(width)
+            used += len(chars)
+        self.chars = sorted(vectors)
+        self.templates = np.array([np.mean(vectors[c], axis=0) for c in self.chars]).reshape(len(self.chars), -1)
+        self.widths = np.array([np.mean(widths[c]) for c in self.chars])
+        return used
+
+    def recognize(self, image: Image.Image) -> tuple[Optional[str], float]:
+        """
+        Método responsável por ler a linha de texto.
+
+        :return: texto lido e confiança (0 a 1); o texto é None se algum caractere não foi reconhecido com
+            GLYPH_MIN_SCORE, ou se não há templates
+        """
+        if not self.chars:
+            return None, 0.0
+        glyphs, widths, spaces = self.segment(image)
+        if not len(glyphs):
+            return None, 0.0
+        scores = 1 - np.abs(glyphs[:, None, :] - self.templates[None, :, :]).mean(axis=2)
+        ratio = np.asarray(widths)[:, None] / self.widths[None, :]
+        scores[(ratio > MAX_WIDTH_RATIO) | (ratio < 1 / MAX_WIDTH_RATIO)] = 0
+        best = scores.argmax(axis=1)
+        confidence = float(scores[np.arange(len(best)), best].min())
+        if confidence < GLYPH_MIN_SCORE:
+            return None, confidence
+        text = "".join((" " if space else "") + self.chars[i] for i, space in zip(best, spaces))
+        return text, confidence
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina os templates de caracteres de um app a partir das áreas rotuladas")
+    parser.add_argument("app")
+    parser.add_argument("--labels", default="read_imgs/labels.json")
+    args = parser.parse_args()
+
+    with open(args.labels, "r", encoding="utf-8") as file:
+        labels = json.load(file)
+    samples = [(Image.open(os.path.join("read_imgs", path)), label["text"]) for path, label in labels.items()
+               if path.split("/")[0] == args.app.lower() and os.path.isfile(os.path.join("read_imgs", path))]
+    recognizer = DigitRecognizer(args.app)
+    used = recognizer.train(samples)
+    recognizer.save()
+    print(f"{used} caracteres de {len(samples)} imagens; templates: {''.join(recognizer.chars)} -> {recognizer.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,11 @@ from utils import QuestionBuilder, Comando
 from Constants import actions_priorities
 from task import process_command
 from robo import Robo
+from resultCache import ResultCache
+from resultStream import ResultStream
 
 app_flask = Flask(__name__)
+result_cache = ResultCache()
 
 
 
@@ -26,6 +29,21 @@ def questions_action(bot_id: int):
             nome_da_fila = f"bot_queue"
 
             comando = Comando(question=question_builder.build(), filtro='Input')
+
+            # Consultas repetidas dentro do TTL são respondidas sem acionar o robô
+            cached_result = result_cache.get(comando.question)
+            if cached_result is not None:
+                item['cached_result'] = cached_result
+                print(f"Resposta do cache para {comando.question.attrs}")
+                continue
+            result_cache.invalidate(comando.question)
+
+            # Listas longas são publicadas em pedaços; quem fez o pedido acompanha pelo stream devolvido
+            if ResultStream.enabled(comando.question.Action):
+                stream_id = ResultStream.new_id()
+                comando.question.attrs.update({'Streamid': stream_id})
+                item['stream'] = stream_id
+
             process_command.apply_async(
                 args=[comando.toJSON()], # é importante passar para json para serializar o objeto Comando
                 queue=nome_da_fila,
@@ -39,6 +57,15 @@ def questions_action(bot_id: int):
     else:
         return jsonify({"error": "Nenhum dado enviado!"}), 400
 
+@app_flask.route('/stream/<stream_id>', methods=['GET'])
+def stream_rows(stream_id: str):
+    """
+    Devolve as linhas já publicadas de uma lista longa. Use ?after=<id da última entrada recebida> para continuar.
+    A última entrada tem type "end" quando a leitura terminou.
+    """
+    entries = ResultStream.read(stream_id, last_id=request.args.get('after', '0'))
+    return jsonify([{"id": entry_id, **fields} for entry_id, fields in entries]), 200
+
 if __name__ == '__main__':
     app_flask.run(debug=True, port=5001)
     questions_action(1)
\ No newline at end of file
@@ -0,0 +1,186 @@
+import os
+import time
+import subprocess
+from typing import Optional, Callable
+
+import psutil
+
+from utils import FileManager, color_in_range
+from windowRegistry import WindowRegistry, WindowInfo, window_registry
+from screenCapture import ScreenCapture
+from Constants import LAUNCH_TIMEOUT, LAUNCH_POLL_INTERVAL, LAUNCH_FIND_MAX_INTERVAL, launch_fingerprints, \
+    relativePosition, color
+
+fingerprint = list[tuple[relativePosition, color]]
+
+
+class LaunchSupervisor:
+    """
+    Classe responsável por abrir um aplicativo e avisar quando ele está pronto para receber comandos.
+
+    Depois que a janela aparece, o processo passa a ser acompanhado pelo PID da própria janela
+    (sem percorrer a lista de processos do sistema). O aplicativo é considerado pronto quando todos os
+    pixels da sua impressão digital (launch_fingerprints, ou o primeiro passo 'color' do mapeamento Base)
+    exibem a cor esperada, o que substitui as esperas fixas de antes.
+
+    Enquanto a janela não aparece, a enumeração de janelas é repetida em intervalos crescentes (até
+    LAUNCH_FIND_MAX_INTERVAL); os pixels são lidos pelo ScreenCapture, que captura só o ponto conferido.
+    """
+
+    def __init__(self, registry: Optional[WindowRegistry] = None,
+                 pixel_reader: Optional[Callable[[int, int], tuple]] = None):
+        self.registry = registry if registry is not None else window_registry
+        self.pixel_reader = pixel_reader if pixel_reader is not None else self._read_pixel
+        self.process: Optional[psutil.Process] = None
+
+    @staticmethod
+    def default_fingerprint(app: str) -> fingerprint:
+        """
+        Método responsável por obter a impressão digital da tela inicial do aplicativo.
+        Usa launch_fingerprints (Constants.py) e, na falta dela, o primeiro passo 'color' do mapeamento Base.
+        """
+        if app.lower() in launch_fingerprints:
+            return launch_fingerprints[app.lower()]
+        base_path = f"Mapeamentos/{app.lower().strip()}/Base/Base.txt"
+        for command in FileManager(base_path).load_commands(action=base_path):
+            if command.get('action') == 'color':
+                return [(tuple(command['position']), tuple(command['value']))]
+        return []
+
+    @staticmethod
+    def _read_pixel(x: int, y: int) -> tuple[int, int, int]:
+        return ScreenCapture.shared().color((x, y))
+
+    def is_alive(self) -> bool:
+        """
+        Método responsável por verificar se o processo do app acompanhado (ver watch) ainda está em execução.
+        """
+        return self.process is not None and self.process.is_running()
+
+    def matches(self, info: WindowInfo, expected: fingerprint) -> bool:
+        """
+        Método responsável por verificar se a impressão digital está presente na janela.
+        """
+        if not info.width or not info.height:
+            return False
+        for position, expected_color in expected:
+            x = int(position[0] * info.width) + info.client_left
+            y = int(position[1] * info.height) + info.client_top
+            if not color_in_range(self.pixel_reader(x, y), expected_color):
+                return False
+        return True
+
+    def launch(self, app_path: str, app_title: str, expected: Optional[fingerprint] = None,
+               timeout: float = LAUNCH_TIMEOUT, new_instance: bool = False,
+               cancelled: Optional[Callable[[], bool]] = None) -> WindowInfo:
+        """
+        Método responsável por abrir o aplicativo (se ainda não estiver aberto) e aguardar sua tela inicial.
+        Se uma nova instância não chegar à tela inicial (tempo esgotado, processo encerrado ou espera cancelada),
+        a janela que já tinha aparecido é fechada e o seu handle, liberado.
+
+        :param app_path: atalho ou executável do aplicativo
+        :param app_title: título (ou parte dele) da janela do aplicativo
+        :param expected: impressão digital da tela inicial; por padrão, default_fingerprint(app_title)
+        :param timeout: tempo máximo de espera, em segundos
+        :param new_instance: abre outra instância mesmo que o aplicativo já esteja aberto (a nova janela
+            não é registrada como a janela do aplicativo nem passa a ser acompanhada; veja RecoveryManager)
+        :param cancelled: consultada a cada verificação; se retornar True, a espera é interrompida
+        :return: janela do aplicativo pronta para uso
+        :raises TimeoutError: se a janela ou a tela inicial não aparecerem dentro do tempo
+        :raises RuntimeError: se o processo do aplicativo terminar durante a espera
+        :raises InterruptedError: se a espera for cancelada
+        """
+        provider = self.registry.provider
+        existing = {provider.handle(w) for w in provider.find_all(app_title)} if new_instance else set()
+        info = None if new_instance else self.registry.get(app_title)
+        if info:
+            self.watch(info)
+            return info
+
+        if not os.path.exists(app_path):
+            raise FileNotFoundError(f"Arquivo {app_path} não encontrado.")
+        subprocess.Popen([app_path], shell=True)
+        print(f"Aguardando o processo do {app_title} iniciar...")
+
+        if expected is None:
+            expected = self.default_fingerprint(app_title)
+        deadline = time.monotonic() + timeout
+        find_interval = LAUNCH_POLL_INTERVAL
+        process: Optional[psutil.Process] = None
+
+        while time.monotonic() < deadline:
+            if cancelled is not None and cancelled():
+                if new_instance and info is not None:
+                    self.discard(info)
+                raise InterruptedError(f"Abertura do {app_title} cancelada.")
+            if info is None:
+                info = self._find_new_window(app_title, existing) if new_instance else self.registry.get(app_title)
+                if info:
+                    if new_instance:
+                        # A nova instância tem o mesmo título da ativa: fica fora das consultas por título
+                        self.registry.reserve(info.hwnd)
+                    process = self.process_of(info)
+                    print(f"Janela do {app_title} detectada (PID {process.pid if process else '?'}).")
+                else:
+                    # Cada busca enumera todas as janelas do sistema: espera cada vez mais até a janela aparecer
+                    time.sleep(min(find_interval, max(0.0, deadline - time.monotonic())))
+                    find_interval = min(find_interval * 2, LAUNCH_FIND_MAX_INTERVAL)
+                    continue
+            elif process is not None and not process.is_running():
+                if new_instance:
+                    self.registry.release(info.hwnd)
+                else:
+                    self.registry.invalidate(app_title)
+                raise RuntimeError(f"O processo do {app_title} terminou durante a inicialização.")
+            else:
+                if new_instance:
+                    info.client_left, info.client_top, info.width, info.height = provider.client_geometry(info.hwnd)
+                else:
+                    info = self.registry.get(app_title) or info
+                if self.matches(info, expected):
+                    if not new_instance:
+                        self.process = process
+                    return info
+            time.sleep(LAUNCH_POLL_INTERVAL)
+
+        if new_instance and info is not None:
+            self.discard(info)
+        raise TimeoutError(f"{app_title} não ficou pronto em {timeout}s.")
+
+    def discard(self, info: WindowInfo) -> None:
+        """
+        Método responsável por fechar uma instância extra (reserva) que não será usada e liberar o seu handle.
+        O processo da instância é encerrado, a menos que seja o mesmo da instância ativa acompanhada.
+        """
+        self.registry.release(info.hwnd)
+        try:
+            info.window.close()
+        except Exception as e:
+            print(f"Não foi possível fechar a janela {info.hwnd}: {e}")
+        if info.pid and (self.process is None or info.pid != self.process.pid):
+            try:
+                psutil.Process(info.pid).terminate()
+            except psutil.Error:
+                pass
+
+    def _find_new_window(self, app_title: str, existing: set[int]) -> Optional[WindowInfo]:
+        provider = self.registry.provider
+        for window in provider.find_all(app_title):
+            hwnd = provider.handle(window)
+            if hwnd not in existing:
+                info = WindowInfo(window, hwnd, provider.window_rect(hwnd), 0, 0, 0, 0, pid=provider.pid(hwnd))
+                info.client_left, info.client_top, info.width, info.height = provider.client_geometry(hwnd)
+                return info
+        return None
+
+    def process_of(self, info: WindowInfo) -> Optional[psutil.Process]:
+        try:
+            return psutil.Process(self.registry.provider.pid(info.hwnd))
+        except (psutil.Error, AttributeError):
+            return None
+
+    def watch(self, info: WindowInfo) -> None:
+        """
+        Método responsável por passar a acompanhar o processo da janela ativa do aplicativo (usado por is_alive).
+        """
+        self.process = self.process_of(info)
@@ -1,45 +1,128 @@
-import hashlib
-import pyautogui
-from PIL import Image
-import io
+import zlib
+from PIL import Image, ImageChops
 from typing import Optional, Tuple, Dict
 import time
 import logging
 
+from screenCapture import ScreenCapture
+from Constants import MISSCLICK_MODE, MISSCLICK_PIXEL_TOLERANCE, MISSCLICK_CHANGE_RATIO, MISSCLICK_PERCEPTUAL_DISTANCE
+
+
 class MissclickHandler:
 
-    def __init__(self, delay_between_checks: float = 0.5):
+    def __init__(self, delay_between_checks: float = 0.5, mode: str = MISSCLICK_MODE,
+                 pixel_tolerance: int = MISSCLICK_PIXEL_TOLERANCE, change_ratio: float = MISSCLICK_CHANGE_RATIO):
         """    
         Args:
             delay_between_checks: Delay in seconds between verification checks
+            mode: How two captures are compared:
+                  "exact"      - any pixel difference is a change (raw pixel hash)
+                  "threshold"  - a change needs change_ratio of the pixels to differ by more than pixel_tolerance
+                  "perceptual" - a change needs the difference hashes (dHash) to differ in more than
+                                 MISSCLICK_PERCEPTUAL_DISTANCE bits
+            pixel_tolerance: Grayscale difference (0-255) below which a pixel is considered unchanged
+            change_ratio: Fraction of changed pixels needed to report a change in "threshold" mode
         """
         self.delay_between_checks = delay_between_checks
+        self.mode = mode
+        self.pixel_tolerance = pixel_tolerance
+        self.change_ratio = change_ratio
         self.stored_hashes: Dict[str, str] = {}
+        self.stored_images: Dict[str, Image.Image] = {}
         self.logger = logging.getLogger(__name__)
-        
+
+    def capture(self, region: Tuple[int, int, int, int]) -> Image.Image:
+        """
+        Capture a screen region.
+
+        Only the region is copied from the screen, through the process-wide ScreenCapture.
+
+        Args:
+            region: Tuple of (left, top, width, height) defining the screen region
+        """
+        screen = ScreenCapture.shared()
+        with screen.lock:
+            # The capture is a view of the shared buffer, valid until the next capture: copy it into the image
+            return Image.fromarray(screen.capture(region).copy())
+
+    @staticmethod
+    def raw_hash(image: Image.Image) -> str:
+        """
+        Hash the raw pixel buffer with CRC32 (no image encoding, no cryptographic hash).
+        """
+        return f"{zlib.crc32(image.tobytes()):08x}"
+
+    @staticmethod
+    def perceptual_hash(image: Image.Image) -> int:
+        """
+        Difference hash (dHash): 64 bits telling, for a 9x8 grayscale thumbnail, whether each pixel is brighter
+        than its right neighbour. Small rendering noise does not change it.
+        """
+        pixels = image.convert("L").resize((9, 8), Image.BILINEAR).tobytes()
+        bits = 0
+        for row in range(8):
+            for col in range(8):
+                bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+        return bits
+
+    def difference(self, before: Image.Image, after: Image.Image) -> float:
+        """
+        Measure how much two captures of the same region differ, according to the mode.
+
+        Returns:
+            "exact": 0.0 or 1.0; "threshold": fraction of changed pixels; "perceptual": fraction of differing hash bits
+        """
+        if before.size != after.size:
+            return 1.0
+        if self.mode == "exact":
+            return float(self.raw_hash(before) != self.raw_hash(after))
+        if self.mode == "perceptual":
+            return bin(self.perceptual_hash(before) ^ self.perceptual_hash(after)).count("1") / 64
+        diff = ImageChops.difference(before.convert("L"), after.convert("L"))
+        changed = sum(diff.histogram()[self.pixel_tolerance + 1:])
+        return changed / (before.size[0] * before.size[1])
+
+    def has_changed(self, before: Image.Image, after: Image.Image) -> bool:
+        """
+        Tell whether the difference between two captures is above the tolerance of the current mode.
+        """
+        difference = self.difference(before, after)
+        if self.mode == "exact":
+            return difference > 0
+        if self.mode == "perceptual":
+            return difference * 64 > MISSCLICK_PERCEPTUAL_DISTANCE
+        return difference >= self.change_ratio
+
+    def wait_for_change(self, region: Tuple[int, int, int, int], baseline: Image.Image,
+                        timeout: float, interval: float = 0.03) -> bool:
+        """
+        Poll a region until it differs from the baseline capture or the timeout expires.
+
+        Returns:
+            True as soon as a change is seen, False if the region stayed the same for the whole timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.has_changed(baseline, self.capture(region)):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
     def capture_region_hash(self, region: Tuple[int, int, int, int]) -> str:
         """
-        Capture a screen region and return its MD5 hash.
+        Capture a screen region and return the hash of its raw pixels.
         
         Args:
             region: Tuple of (left, top, width, height) defining the screen region
             
         Returns:
-            MD5 hash string of the captured region
+            CRC32 hash string of the captured region
         """
         try:
-            screenshot = pyautogui.screenshot(region=region)
-            
-            # Convert to bytes for hashing
-            img_byte_arr = io.BytesIO()
-            screenshot.save(img_byte_arr, format='PNG')
-            img_bytes = img_byte_arr.getvalue()
-            
-            # Generate MD5 hash
-            md5_hash = hashlib.md5(img_bytes).hexdigest()
-            
-            self.logger.debug(f"Captured hash for region {region}: {md5_hash}")
-            return md5_hash
+            region_hash = self.raw_hash(self.capture(region))
+            self.logger.debug(f"Captured hash for region {region}: {region_hash}")
+            return region_hash
             
         except Exception as e:
             self.logger.error(f"Error capturing region hash: {e}")
@@ -56,8 +139,10 @@ class MissclickHandler:
         Returns:
             The captured baseline hash
         """
-        baseline_hash = self.capture_region_hash(region)
+        baseline = self.capture(region)
+        baseline_hash = self.raw_hash(baseline)
         self.stored_hashes[region_name] = baseline_hash
+        self.stored_images[region_name] = baseline
         self.logger.info(f"Stored baseline hash for region '{region_name}'")
         return baseline_hash
     
@@ -81,17 +166,16 @@ class MissclickHandler:
             self.store_baseline(region, region_name)
             return True  # First capture, assume success
         
-        current_hash = self.capture_region_hash(region)
-        baseline_hash = self.stored_hashes[region_name]
+        changed = self.has_changed(self.stored_images[region_name], self.capture(region))
         
         if expect_change:
             # Action should have changed the screen
-            success = current_hash != baseline_hash
+            success = changed
             self.logger.info(f"Action verification for '{region_name}': {'SUCCESS' if success else 'FAILED'} "
                            f"(Expected change, got {'change' if success else 'no change'})")
         else:
             # Action should NOT have changed the screen
-            success = current_hash == baseline_hash
+            success = not changed
             self.logger.info(f"Action verification for '{region_name}': {'SUCCESS' if success else 'FAILED'} "
                            f"(Expected no change, got {'no change' if success else 'change'})")
         
@@ -141,6 +225,7 @@ class MissclickHandler:
         """
         if region_name in self.stored_hashes:
             del self.stored_hashes[region_name]
+            self.stored_images.pop(region_name, None)
             self.logger.info(f"Cleared stored hash for region '{region_name}'")
             return True
         return False
@@ -148,6 +233,7 @@ class MissclickHandler:
     def clear_all_hashes(self):
         """Clear all stored hashes."""
         self.stored_hashes.clear()
+        self.stored_images.clear()
         self.logger.info("Cleared all stored hashes")
 
 
@@ -0,0 +1,170 @@
+import os
+import glob
+import json
+import heapq
+from typing import Optional
+
+from utils import FileManager
+from Constants import abas, NAV_STEP_COST_MS, NAV_COST_SMOOTHING
+
+
+class NavigationGraph:
+    """
+    Classe responsável por representar as abas de um aplicativo como um grafo e planejar a navegação entre elas.
+
+    As arestas vêm dos próprios mapeamentos:
+    * Nav/<aba>.txt: da aba inicial (abas['base']) até a aba;
+    * Ret/<aba>.txt: da aba de volta à aba inicial;
+    * Tra/<origem>_<destino>.txt: transição direta entre duas abas, usada automaticamente assim que é gravada.
+
+    O custo de uma aresta é o tempo medido (ms) para percorrê-la, obtido dos eventos 'step' do log (campo edge)
+    e atualizado a cada navegação. Arestas ainda não medidas custam NAV_STEP_COST_MS por passo do mapeamento.
+    """
+
+    def __init__(self, app: str):
+        self.app = app
+        self.app_dir = f"Mapeamentos/{app.lower().strip()}"
+        self.home = abas['base']
+        self.edges: dict[str, dict[str, list[dict]]] = {}
+        self.costs: dict[str, float] = {}
+        self._open_edge: Optional[str] = None
+        self._open_ms = 0.0
+        self.load_edges()
+
+    @staticmethod
+    def edge_name(source: str, target: str) -> str:
+        return f"{source}>{target}"
+
+    def _load(self, path: str) -> list[dict]:
+        return FileManager(path).load_commands(action=path)
+
+    def load_edges(self) -> None:
+        """
+        Método responsável por montar as arestas a partir dos mapeamentos Nav, Ret e Tra.
+        Mapeamentos vazios ou ausentes não geram arestas.
+        """
+        self.edges = {}
+        for aba in set(abas.values()) - {self.home}:
+            self.add_edge(self.home, aba, self._load(f"{self.app_dir}/Nav/{aba}.txt"))
+            self.add_edge(aba, self.home, self._load(f"{self.app_dir}/Ret/{aba}.txt"))
+
+        transitions_dir = f"{self.app_dir}/Tra"
+        if os.path.isdir(transitions_dir):
+            for file_name in os.listdir(transitions_dir):
+                name, extension = os.path.splitext(file_name)
+                if extension != '.txt' or '_' not in name:
+                    continue
+                source, target = name.split('_', 1)
+                self.add_edge(source, target, self._load(f"{transitions_dir}/{file_name}"))
+
+    def add_edge(self, source: str, target: str, commands: list[dict]) -> None:
+        if commands:
+            self.edges.setdefault(source, {})[target] = commands
+
+    def cost(self, source: str, target: str) -> float:
+        measured = self.costs.get(self.edge_name(source, target))
+        if measured is not None:
+            return measured
+        return len(self.edges[source][target]) * NAV_STEP_COST_MS
+
+    def shortest_path(self, source: str, target: str) -> Optional[list[str]]:
+        """
+        Método responsável por encontrar a rota mais barata (Dijkstra) entre duas abas.
+
+        :return: abas visitadas, da origem ao destino (inclusive), ou None se o destino for inalcançável
+        """
+        queue = [(0.0, source, [source])]
+        visited: set[str] = set()
+        while queue:
+            total, node, path = heapq.heappop(queue)
+            if node == target:
+                return path
+            if node in visited:
+                continue
+            visited.add(node)
+            for neighbor in self.edges.get(node, {}):
+                if neighbor not in visited:
+                    heapq.heappush(queue, (total + self.cost(node, neighbor), neighbor, path + [neighbor]))
+        return None
+
+    def route(self, source: str, target: str) -> Optional[list[dict]]:
+        """
+        Método responsável por montar os comandos da rota mais barata entre duas abas.
+        Cada comando leva no campo 'edge' a aresta a que pertence, para que o tempo gasto seja medido.
+
+        :return: comandos da rota (lista vazia se origem e destino coincidem) ou None se não houver rota
+        """
+        path = self.shortest_path(source, target)
+        if path is None:
+            return None
+        commands = []
+        for step_source, step_target in zip(path, path[1:]):
+            edge = self.edge_name(step_source, step_target)
+            commands.extend({**command, 'edge': edge} for command in self.edges[step_source][step_target])
+        return commands
+
+    def trace(self, edge: Optional[str], elapsed_ms: Optional[float]) -> None:
+        """
+        Método responsável por acumular o tempo de cada passo executado.
+        Passos consecutivos da mesma aresta somam uma travessia, registrada quando um passo de outra aresta
+        (ou sem aresta) chega.
+        """
+        if edge != self._open_edge:
+            if self._open_edge is not None:
+                self.observe(self._open_edge, self._open_ms)
+            self._open_edge, self._open_ms = edge, 0.0
+        if edge is not None and elapsed_ms:
+            self._open_ms += elapsed_ms
+
+    def discard_trace(self) -> None:
+        """
+        Método responsável por descartar a travessia em andamento (ex.: quando a operação falhou no meio dela).
+        """
+        self._open_edge, self._open_ms = None, 0.0
+
+    def observe(self, edge: str, elapsed_ms: float) -> None:
+        previous = self.costs.get(edge)
+        if previous is None:
+            self.costs[edge] = elapsed_ms
+        else:
+            self.costs[edge] = previous + NAV_COST_SMOOTHING * (elapsed_ms - previous)
+
+    @staticmethod
+    def failed(entry: dict) -> bool:
+        """
+        Método responsável por dizer se um registro do log indica falha ou tempo esgotado (cor que não apareceu,
+        clique sem efeito, recuperação, avisos e erros).
+        """
+        if entry.get("level") in ("WARNING", "ERROR", "CRITICAL") or entry.get("event") == "recovery":
+            return True
+        return entry.get("event") in ("step", "click_verify") and entry.get("result") is False
+
+    def load_traces(self, log_path: str) -> None:
+        """
+        Método responsável por medir o custo das arestas a partir do log JSON lines do robô (RoboLogPipeline),
+        incluindo os arquivos já rotacionados, do mais antigo ao atual.
+        Travessias com algum passo que falhou ou esgotou o tempo são descartadas: medem a falha, e não a aresta.
+        """
+        failed_edge = None  # Aresta da travessia que falhou, ignorada até o log passar para outra aresta
+        for path in sorted(glob.glob(f"{log_path}.*")) + [log_path]:
+            if not os.path.isfile(path):
+                continue
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    edge = entry.get("edge")
+                    if edge != failed_edge:
+                        failed_edge = None
+                    if failed_edge is not None:
+                        continue
+                    if edge is not None and self.failed(entry):
+                        if edge != self._open_edge:
+                            self.trace(edge, None)
+                        self.discard_trace()
+                        failed_edge = edge
+                    elif entry.get("event") == "step":
+                        self.trace(edge, entry.get("elapsed_ms"))
+            self.trace(None, None)
@@ -0,0 +1,147 @@
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+from typing import Optional
+
+from PIL import Image
+
+from ocrProfiles import profile_for
+from digitRecognizer import DigitRecognizer
+from Constants import OCR_MIN_CONFIDENCE, OCR_POOL_WORKERS, OCR_RESULT_TIMEOUT
+
+# Templates de caracteres de cada app, carregados uma vez por processo
+_recognizers: dict[str, DigitRecognizer] = {}
+
+
+def recognize(image: Image.Image, field: Optional[str], app: str, treated_save_path: Optional[str] = None) -> tuple[str, float, list[dict]]:
+    """
+    Função responsável por extrair o texto de uma área capturada, com a confiança da leitura (0 a 1).
+    Roda nos processos do OcrPool, por isso não registra logs: devolve os eventos para o robô registrar.
+
+    Campos numéricos são lidos primeiro pelos templates de caracteres (DigitRecognizer). Os demais, e os que os
+    templates recusarem, vão para o Tesseract com o perfil de OCR do campo; só se a confiança ficar abaixo de
+    OCR_MIN_CONFIDENCE a área é relida com o tratamento alternativo do perfil, e vale a leitura mais confiável.
+
+    :return: texto, confiança e eventos de log ({"message", "elapsed_ms", "result"})
+    """
+    profile = profile_for(field)
+    events = []
+    if app not in _recognizers:
+        _recognizers[app] = DigitRecognizer(app)
+    recognizer = _recognizers[app]
+
+    start = perf_counter()
+    if profile.glyphs and recognizer.covers(profile.whitelist):
+        text, confidence = recognizer.recognize(image)
+        elapsed_ms = round((perf_counter() - start) * 1000, 2)
+        events.append({"message": f"Read {field} with glyph templates in {elapsed_ms} ms (confidence {confidence:.2f})",
+                       "elapsed_ms": elapsed_ms, "result": text})
+        if text:
+            return text, confidence, events
+        # Confiança baixa: o campo segue para o Tesseract
+        start = perf_counter()
+
+    treated = profile.prepare(image)
+    if treated_save_path:
+        os.makedirs(os.path.dirname(treated_save_path), exist_ok=True)
+        treated.save(treated_save_path)
+    text, confidence = profile.recognize(treated)
+    elapsed_ms = round((perf_counter() - start) * 1000, 1)
+    events.append({"message": f"Read {field} with profile {profile.name} in {elapsed_ms} ms (confidence {confidence:.2f})",
+                   "elapsed_ms": elapsed_ms, "result": text})
+    if confidence >= OCR_MIN_CONFIDENCE:
+        return text, confidence, events
+
+    start = perf_counter()
+    alt_text, alt_confidence = profile.alternate.read(image)
+    elapsed_ms = round((perf_counter() - start) * 1000, 1)
+    events.append({"message": f"Re-read {field} with profile {profile.alternate.name} in {elapsed_ms} ms "
+                              f"(confidence {alt_confidence:.2f} x {confidence:.2f})",
+                   "elapsed_ms": elapsed_ms, "result": alt_text})
+    if alt_confidence > confidence:
+        return alt_text, alt_confidence, events
+    return text, confidence, events
+
+
+class PendingRead:
+    """
+    Classe que representa uma leitura enviada ao OcrPool e ainda não consumida.
+    Fica guardada no lugar do texto (ex.: em Question.attrs) até que um passo precise do valor.
+    """
+
+    def __init__(self, future: Future, field: Optional[str]):
+        self.future = future
+        self.field = field
+
+    def __repr__(self) -> str:
+        return f"PendingRead({self.field}, done={self.future.done()})"
+
+    def result(self, timeout: float = OCR_RESULT_TIMEOUT) -> tuple[str, float, list[dict]]:
+        return self.future.result(timeout=timeout)
+
+
+class OcrPool:
+    """
+    Classe responsável por fazer o OCR em outros processos, para que o robô siga com os cliques enquanto o
+    Tesseract trabalha. submit() devolve um PendingRead, resolvido só onde o texto é usado (uma comparação,
+    a decisão de uma rolagem ou a exportação).
+
+    Com OCR_POOL_WORKERS = 0 a leitura é feita na hora, na thread do robô, e o PendingRead já volta resolvido.
+    Os processos só são criados na primeira leitura, e nunca na importação: no Windows (spawn) cada processo reimporta
+    o módulo principal, e um pool criado durante a importação quebra (BrokenProcessPool). Se um processo morrer, o
+    executor quebrado é descartado e a leitura é reenviada uma vez a um executor novo.
+    """
+
+    _shared: Optional["OcrPool"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, workers: int = OCR_POOL_WORKERS):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "OcrPool":
+        """
+        Método responsável por devolver o pool único do processo (os processos só são criados na primeira leitura).
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        with self._executor_lock:
+            if self.executor is None and self.workers > 0:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self.executor
+
+    def submit(self, image: Image.Image, field: Optional[str], app: str, treated_save_path: Optional[str] = None) -> PendingRead:
+        executor = self._get_executor()
+        if executor is None:
+            future: Future = Future()
+            try:
+                future.set_result(recognize(image, field, app, treated_save_path))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            try:
+                future = executor.submit(recognize, image, field, app, treated_save_path)
+            except BrokenProcessPool:
+                # Um processo morreu (ex.: falta de memória) e o executor não aceita mais leituras: recria uma vez
+                self._discard_executor(executor)
+                future = self._get_executor().submit(recognize, image, field, app, treated_save_path)
+        return PendingRead(future, field)
+
+    def _discard_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            # Outra thread pode já ter trocado o executor quebrado
+            if self.executor is broken:
+                self.executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,177 @@
+from typing import Optional
+
+import numpy as np
+import pytesseract
+from PIL import Image, ImageFilter, ImageOps
+
+from Constants import OCR_FIELD_PROFILES, OCR_DEFAULT_PROFILE
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """
+    Função responsável por escolher o limiar que melhor separa texto e fundo (método de Otsu).
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_bg = hist.cumsum()
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = (hist * levels).cumsum()
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+
+def strip_frame(text: np.ndarray, fill: float = 0.9) -> np.ndarray:
+    """
+    Função responsável por apagar a moldura do campo, capturada junto com o texto: linhas e colunas das bordas
+    quase totalmente preenchidas são apagadas, da borda para dentro, até encontrar uma que não seja moldura.
+    """
+    text = text.copy()
+    top, bottom, left, right = 0, text.shape[0], 0, text.shape[1]
+    while bottom - top > 2 and right - left > 2:
+        inner = text[top:bottom, left:right]
+        edges = {'top': inner[0].mean(), 'bottom': inner[-1].mean(), 'left': inner[:, 0].mean(), 'right': inner[:, -1].mean()}
+        if max(edges.values()) < fill:
+            break
+        if edges['top'] >= fill:
+            text[top] = False
+            top += 1
+        if edges['bottom'] >= fill:
+            text[bottom - 1] = False
+            bottom -= 1
+        if edges['left'] >= fill:
+            text[:, left] = False
+            left += 1
+        if edges['right'] >= fill:
+            text[:, right - 1] = False
+            right -= 1
+    return text
+
+
+def binarize(gray: np.ndarray) -> np.ndarray:
+    """
+    Função responsável por separar o texto do fundo de uma imagem em tons de cinza.
+
+    :return: máscara em que True é texto, já sem a moldura do campo
+    """
+    bright = gray > otsu_threshold(gray)
+    # O texto é a classe minoritária; se ele for claro (tema escuro dos apps), a máscara é invertida
+    return strip_frame(bright if bright.mean() < 0.5 else ~bright)
+
+
+class OcrProfile:
+    """
+    Classe que define como uma área é tratada antes do OCR e como o Tesseract a lê.
+
+    :param name: nome do perfil
+    :param psm: modo de segmentação do Tesseract (6 = bloco de texto, 7 = uma única linha)
+    :param whitelist: caracteres aceitos na leitura (None aceita todos)
+    :param scale: fator de ampliação da imagem (o Tesseract lê melhor letras com 20-30 px de altura)
+    :param grayscale: converte para tons de cinza
+    :param binarize: separa texto e fundo pelo limiar de Otsu, deixando o texto preto sobre fundo branco
+    :param sharpen: aplica ImageFilter.SHARPEN (tratamento original de todas as leituras)
+    :param glyphs: campo de uma linha que pode ser lido pelo DigitRecognizer antes do Tesseract
+    """
+
+    def __init__(self, name: str, psm: int = 6, whitelist: Optional[str] = None, scale: int = 1,
+                 grayscale: bool = False, binarize: bool = False, sharpen: bool = False, glyphs: bool = False):
+        self.name = name
+        self.psm = psm
+        self.whitelist = whitelist
+        self.scale = scale
+        self.grayscale = grayscale or binarize
+        self.binarize = binarize
+        self.sharpen = sharpen
+        self.glyphs = glyphs
+        self._alternate: Optional["OcrProfile"] = None
+
+    def __repr__(self) -> str:
+        return f"OcrProfile({self.name}, psm={self.psm}, whitelist={self.whitelist!r}, scale={self.scale})"
+
+    @property
+    def config(self) -> str:
+        config = f"--psm {self.psm}"
+        if self.whitelist:
+            config += f" -c tessedit_char_whitelist={self.whitelist}"
+        return config
+
+    def prepare(self, image: Image.Image) -> Image.Image:
+        """
+        Método responsável por aplicar o tratamento do perfil à imagem capturada.
+        """
+        image = image.convert("L") if self.grayscale else image.convert("RGB")
+        if self.scale > 1:
+            image = image.resize((image.width * self.scale, image.height * self.scale), Image.LANCZOS)
+        if self.binarize:
+            text = binarize(np.asarray(image))
+            image = Image.fromarray(np.where(text, 0, 255).astype(np.uint8))
+            # Margem branca em volta do texto, que o Tesseract espera encontrar
+            image = ImageOps.expand(image, border=10, fill=255)
+        if self.sharpen:
+            image = image.filter(ImageFilter.SHARPEN)
+        return image
+
+    @property
+    def alternate(self) -> "OcrProfile":
+        """
+        Perfil usado na releitura de uma leitura com confiança baixa: o mesmo campo com o outro tratamento
+        (tons de cinza sem limiar, deixando a binarização para o Tesseract, ou binarizado, se este não binariza).
+        """
+        if self._alternate is None:
+            self._alternate = OcrProfile(f"{self.name}_alt", psm=self.psm, whitelist=self.whitelist,
+                                         scale=max(self.scale, 2), grayscale=True, binarize=not self.binarize)
+        return self._alternate
+
+    def recognize(self, prepared: Image.Image) -> tuple[str, float]:
+        """
+        Método responsável por extrair o texto de uma imagem já tratada, com a confiança da leitura.
+
+        :return: texto (linhas separadas por quebra de linha) e confiança de 0 a 1, a da palavra menos confiável;
+            0 se nada foi lido
+        """
+        data = pytesseract.image_to_data(prepared, config=self.config, output_type=pytesseract.Output.DICT)
+        lines: dict[tuple, list[str]] = {}
+        confidences = []
+        for i, word in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if not str(word).strip() or confidence < 0:
+                continue
+            lines.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]), []).append(str(word).strip())
+            confidences.append(confidence)
+        text = "\n".join(" ".join(words) for words in lines.values())
+        return text, (min(confidences) / 100 if confidences else 0.0)
+
+    def read(self, image: Image.Image) -> tuple[str, float]:
+        """
+        Método responsável por tratar a imagem e extrair o texto com o Tesseract.
+        """
+        return self.recognize(self.prepare(image))
+
+
+AMOUNT_CHARS = "0123456789.,-"
+DIGITS = "0123456789"
+
+PROFILES: dict[str, OcrProfile] = {
+    # Tratamento original: qualquer texto, em várias linhas
+    'block': OcrProfile('block', psm=6, sharpen=True),
+    # Uma linha de texto livre (nomes de clube, modo, app)
+    'line': OcrProfile('line', psm=7, scale=2, binarize=True),
+    # Valores em fichas, com separador de milhar e sinal (ex.: "1,591.00", "-1.00")
+    'amount': OcrProfile('amount', psm=7, whitelist=AMOUNT_CHARS, scale=3, binarize=True, glyphs=True),
+    # Um id numérico
+    'id': OcrProfile('id', psm=7, whitelist=DIGITS, scale=3, binarize=True, glyphs=True),
+    # Vários ids, um por linha
+    'id_list': OcrProfile('id_list', psm=6, whitelist=DIGITS, scale=2, binarize=True),
+    # Datas e horários (ex.: "12/05/2025 14:30")
+    'date': OcrProfile('date', psm=7, whitelist=DIGITS + "/-:", scale=3, binarize=True, glyphs=True),
+}
+
+
+def profile_for(field: Optional[str]) -> OcrProfile:
+    """
+    Função responsável por escolher o perfil de OCR do campo lido (nome da pergunta, ex.: Saldo, Id, Listatransacoes).
+    Campos sem perfil configurado em OCR_FIELD_PROFILES usam OCR_DEFAULT_PROFILE.
+    """
+    name = OCR_FIELD_PROFILES.get(str(field or '').strip().lstrip('.').lower(), OCR_DEFAULT_PROFILE)
+    return PROFILES.get(name, PROFILES[OCR_DEFAULT_PROFILE])
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark de precisão e velocidade dos perfis de OCR (ocrProfiles.py) sobre as áreas salvas em read_imgs/.
+Execute: python ocr_benchmark.py [--repeat 5] [--labels read_imgs/labels.json]
+
+O arquivo de rótulos associa cada imagem (caminho relativo a read_imgs/) ao campo lido e ao texto correto:
+    {"supremapoker/Send_ch.png": {"field": "Saldo", "text": "870.00"}, ...}
+Para cada campo, todos os perfis (e as variantes "_alt" usadas na releitura) são medidos; o perfil configurado em
+OCR_FIELD_PROFILES é marcado com *.
+A linha "glyphs" mede o DigitRecognizer treinado do app (python digitRecognizer.py <app>); leituras recusadas por
+confiança baixa contam como erro, pois iriam para o Tesseract.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+
+from ocrProfiles import PROFILES, profile_for
+from digitRecognizer import DigitRecognizer
+
+READ_DIR = "read_imgs"
+
+
+def load_samples(labels_path: str) -> dict[str, list[tuple[Image.Image, str, str]]]:
+    """Agrupa por campo as imagens rotuladas que existem em disco"""
+    with open(labels_path, "r", encoding="utf-8") as file:
+        labels = json.load(file)
+    samples = defaultdict(list)
+    for path, label in labels.items():
+        full_path = os.path.join(READ_DIR, path)
+        if not os.path.isfile(full_path):
+            print(f"Imagem não encontrada, ignorada: {full_path}")
+            continue
+        samples[label["field"]].append((Image.open(full_path).convert("RGB"), label["text"], path.split("/")[0]))
+    return samples
+
+
+def benchmark(samples: list[tuple[Image.Image, str, str]], repeat: int) -> dict[str, tuple[float, float]]:
+    """Retorna, por perfil, a proporção de leituras corretas e o tempo médio (ms) por leitura"""
+    profiles = [p for profile in PROFILES.values() for p in (profile, profile.alternate)]
+    readers = {p.name: (lambda image, p=p: p.read(image)[0]) for p in profiles}
+    recognizers = {app: DigitRecognizer(app) for _, _, app in samples}
+    readers["glyphs"] = lambda image, app: recognizers[app].recognize(image)[0]
+    results = {}
+    for name, read in readers.items():
+        correct, elapsed = 0, 0.0
+        for image, expected, app in samples:
+            for _ in range(repeat):
+                start = perf_counter()
+                text = read(image, app) if name == "glyphs" else read(image)
+                elapsed += perf_counter() - start
+                correct += text == expected
+        total = len(samples) * repeat
+        results[name] = (correct / total, elapsed * 1000 / total)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", default=os.path.join(READ_DIR, "labels.json"))
+    parser.add_argument("--repeat", type=int, default=5, help="leituras de cada imagem por perfil")
+    args = parser.parse_args()
+
+    for field, samples in load_samples(args.labels).items():
+        configured = profile_for(field).name
+        print(f"\n=== {field} ({len(samples)} imagens) ===")
+        print(f"  {'perfil':<12} {'acertos':>8} {'ms/leitura':>11}")
+        results = benchmark(samples, args.repeat)
+        for name, (accuracy, ms) in sorted(results.items(), key=lambda item: (-item[1][0], item[1][1])):
+            mark = "*" if name == configured else " "
+            print(f"{mark} {name:<12} {accuracy:>7.0%} {ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
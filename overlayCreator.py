@@ -1,7 +1,11 @@
+import os
 import tkinter as tk
-from queue import Queue
+from queue import Queue, Empty
 import threading
 from time import sleep
+from typing import Optional
+
+from Constants import OVERLAY_ENABLED, OVERLAY_POLL_MS
 
 
 class TransparentOverlay:
@@ -132,6 +136,87 @@ class TransparentOverlay:
         
         return overlay
 
+class NullOverlay:
+    """
+    Overlay que não desenha nada: usado em produção, sem thread nem janelas do Tk.
+    Possui a mesma interface de marcação usada pelo robô (create_overlay e rectangle_overlay).
+    """
+
+    def create_overlay(self, x, y, callback=None):
+        pass
+
+    def rectangle_overlay(self, pos0, pos1, callback=None):
+        pass
+
+
+class OverlaySurface(NullOverlay):
+    """
+    Overlay de depuração com uma única janela transparente, do tamanho da tela, criada uma vez.
+    Cada marcação vira um retângulo no canvas dessa janela, apagado após `duration` segundos,
+    no lugar de uma nova Toplevel por evento. Como a janela usa a cor de transparência, ela não intercepta os cliques.
+    As marcações podem ser pedidas de qualquer thread: elas entram em uma fila lida pela thread do Tk.
+    """
+
+    def __init__(self, box_size=10, duration=1):
+        self.box_size = box_size
+        self.duration = int(duration * 1000)
+        self.queue = Queue()
+        self.root = None
+        self.canvas = None
+        self.gui_thread = threading.Thread(target=self.init_gui, name="OverlaySurface", daemon=True)
+        self.gui_thread.start()
+
+    def init_gui(self):
+        self.root = tk.Tk()
+        self.root.overrideredirect(True)
+        self.root.attributes('-topmost', True)
+        self.root.wm_attributes('-transparentcolor', 'white')
+        width, height = self.root.winfo_screenwidth(), self.root.winfo_screenheight()
+        self.root.geometry(f"{width}x{height}+0+0")
+        self.canvas = tk.Canvas(self.root, width=width, height=height, bg="white", highlightthickness=0)
+        self.canvas.pack()
+        self.root.after(OVERLAY_POLL_MS, self.process_queue)
+        self.root.mainloop()
+
+    def process_queue(self):
+        while True:
+            try:
+                kind, pos0, pos1, color, callback = self.queue.get_nowait()
+            except Empty:
+                break
+            item = self.canvas.create_rectangle(pos0[0], pos0[1], pos1[0], pos1[1], outline=color, width=2, fill="")
+            self.root.after(self.duration, self.canvas.delete, item)
+            if callback:
+                self.root.after(self.duration, callback)
+        self.root.after(OVERLAY_POLL_MS, self.process_queue)
+
+    # quadradinho simples no ponto (x, y)
+    def create_overlay(self, x, y, callback=None):
+        x0, y0 = x - self.box_size // 2, y - self.box_size // 2
+        self.queue.put(("point", (x0, y0), (x0 + self.box_size, y0 + self.box_size), "red", callback))
+
+    # retângulo definido por dois pontos (canto sup. esq e inf. dir)
+    def rectangle_overlay(self, pos0, pos1, callback=None):
+        self.queue.put(("rect", pos0, pos1, "green", callback))
+
+
+_shared_overlay: Optional[NullOverlay] = None
+_shared_overlay_lock = threading.Lock()
+
+
+def shared_overlay(box_size=10, duration=1) -> NullOverlay:
+    """
+    Função responsável por devolver o overlay único do processo, compartilhado por todos os robôs.
+    Só desenha se OVERLAY_ENABLED (ou a variável de ambiente ROBO_OVERLAY) estiver ligado; caso contrário, é um NullOverlay.
+    """
+    global _shared_overlay
+    with _shared_overlay_lock:
+        if _shared_overlay is None:
+            enabled = os.getenv("ROBO_OVERLAY", str(OVERLAY_ENABLED)).strip().lower() in ("1", "true", "yes")
+            _shared_overlay = OverlaySurface(box_size=box_size, duration=duration) if enabled else NullOverlay()
+        return _shared_overlay
+
+
 if __name__ == "__main__":
     overlay = TransparentOverlay(duration=2)
 
@@ -0,0 +1,233 @@
+import time
+import threading
+from typing import Callable, Optional, TYPE_CHECKING
+
+from utils import FileManager, color_in_range
+from windowRegistry import WindowInfo
+from launchSupervisor import LaunchSupervisor, fingerprint
+from screenCapture import ScreenCapture
+from roboLogging import log_event
+from Constants import home_fingerprints, RECOVERY_COLOR_TIMEOUT, STANDBY_INSTANCES
+
+if TYPE_CHECKING:
+    from robo import Robo
+
+
+class RecoveryManager:
+    """
+    Classe responsável por devolver o robô a uma tela conhecida quando uma operação trava.
+
+    As estratégias são tentadas da mais barata para a mais cara:
+    * renavigate: executa o mapeamento Ret da aba atual e confirma que o app voltou à tela inicial;
+    * standby: troca o app travado por uma instância reserva, já aberta e logada (STANDBY_INSTANCES);
+    * restart: fecha e reabre o app, o que exige refazer o login do mapeamento Base.
+
+    A reserva é preparada com o robô ocioso e fora do caminho das operações: no modo síncrono, em uma thread
+    (start_standby) que Robo.open_app interrompe com stop_standby; no RoboRuntime, com a vez do executor de entrada,
+    interrompida quando chega uma operação. A interrupção acontece entre dois passos e fecha a instância incompleta.
+    """
+
+    # Preparação em segundo plano (modo síncrono); uma por processo, pois mouse e teclado são um só
+    _preparation: Optional[threading.Thread] = None
+    _preparation_lock = threading.Lock()
+    _cancel = threading.Event()
+
+    def __init__(self, robo: "Robo"):
+        self.robo = robo
+        self.app = robo.app
+        self.registry = robo.window_manager.registry
+        self.supervisor: LaunchSupervisor = robo.launch_supervisor
+        self.standby: Optional[WindowInfo] = None
+
+    @staticmethod
+    def home_fingerprint(app: str) -> fingerprint:
+        """
+        Método responsável por obter a impressão digital da tela inicial logada do aplicativo.
+        Usa home_fingerprints (Constants.py) e, na falta dela, o último passo 'color' do mapeamento Base.
+        """
+        if app.lower() in home_fingerprints:
+            return home_fingerprints[app.lower()]
+        base_path = f"Mapeamentos/{app.lower().strip()}/Base/Base.txt"
+        colors = [c for c in FileManager(base_path).load_commands(action=base_path) if c.get('action') == 'color']
+        return [(tuple(colors[-1]['position']), tuple(colors[-1]['value']))] if colors else []
+
+    def at_home(self, info: Optional[WindowInfo] = None) -> bool:
+        info = info or self.registry.get(self.app)
+        expected = self.home_fingerprint(self.app)
+        return bool(info and expected) and self.supervisor.matches(info, expected)
+
+    def recover(self, attempt: int, aba: Optional[str]) -> bool:
+        """
+        Método responsável por recuperar o robô após uma falha.
+
+        :param attempt: número da tentativa atual da operação (a renavegação só é tentada na primeira)
+        :param aba: aba em que a operação travou
+        :return: True se o app está na tela inicial já logado, False se foi reiniciado e precisa do mapeamento Base
+        """
+        start = time.perf_counter()
+        strategy, logged_in = "restart", False
+        # Com o processo encerrado não há janela para renavegar: segue direto para a reserva ou o reinício
+        alive = self.supervisor.is_alive()
+        if not alive:
+            self.robo.logger.warning(f"{self.app} process is no longer running.")
+        if attempt == 1 and aba and alive and self.renavigate(aba):
+            strategy, logged_in = "renavigate", True
+        elif self.swap_to_standby():
+            strategy, logged_in = "standby", True
+        else:
+            self.restart()
+
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        log_event(self.robo.logger, "recovery", f"Recovered with strategy '{strategy}' in {elapsed_ms} ms",
+                  action=strategy, elapsed_ms=elapsed_ms, result=logged_in)
+        return logged_in
+
+    def renavigate(self, aba: str) -> bool:
+        """
+        Método responsável por voltar à tela inicial pelo mapeamento Ret da aba, sem reiniciar o app.
+        """
+        if self.at_home():
+            return True
+        ret_path = f"Mapeamentos/{self.app.lower().strip()}/Ret/{aba}.txt"
+        commands = FileManager(ret_path).load_commands(action=ret_path)
+        if not commands:
+            return False
+        self.robo.logger.info(f"Trying to recover by returning from {aba} to the home screen.")
+        return self.run_mapping(commands) and self.at_home()
+
+    def run_mapping(self, commands: list[dict], cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Método responsável por executar um mapeamento sem escalar falhas para o retry_action.
+        Cada passo 'color' espera no máximo RECOVERY_COLOR_TIMEOUT; se a cor não aparecer, o mapeamento é abortado.
+        Com `cancelled`, o mapeamento também é abortado, entre dois passos, quando ela retornar True.
+        """
+        window_manager = self.robo.window_manager
+        for command in commands:
+            if cancelled is not None and cancelled():
+                return False
+            action, position, value, condition = self.robo.file_manager.read_command(command)
+            if action == 'color':
+                if not self.wait_color(window_manager.get_absolute_position(position), value, cancelled=cancelled):
+                    return False
+            elif action in ('click', 'write', 'clear'):
+                self.robo.follow_command(position, action, value, condition)
+        return True
+
+    @staticmethod
+    def wait_color(position: tuple[int, int], expected: tuple[int, int, int], timeout: float = RECOVERY_COLOR_TIMEOUT,
+                   cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            if color_in_range(ScreenCapture.shared().color(position), expected):
+                return True
+            if time.monotonic() >= deadline or (cancelled is not None and cancelled()):
+                return False
+            time.sleep(0.05)
+
+    def standby_ready(self) -> bool:
+        return self.standby is not None and self.registry.provider.is_valid(self.standby.hwnd)
+
+    def needs_standby(self) -> bool:
+        return bool(STANDBY_INSTANCES.get(self.app.lower())) and not self.standby_ready()
+
+    def prepare_standby(self, cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Método responsável por abrir e logar a instância reserva, deixando-a minimizada.
+        Deve ser chamado com o robô ocioso, pois o login usa mouse e teclado. Em qualquer falha (abertura, login ou
+        cancelamento), a instância aberta é fechada e o seu handle, liberado.
+
+        :param cancelled: consultada entre os passos; se retornar True, a preparação é abandonada
+        :return: True se a reserva ficou pronta
+        """
+        if not self.needs_standby():
+            return False
+
+        window_manager = self.robo.window_manager
+        self.robo.logger.info(f"Preparing standby instance of {self.app}...")
+        try:
+            info = self.supervisor.launch(f"{self.app}.lnk", self.app, new_instance=True, cancelled=cancelled)
+        except (FileNotFoundError, TimeoutError, RuntimeError, InterruptedError) as e:
+            self.robo.logger.warning(f"Standby instance of {self.app} was not started: {e}")
+            return False
+
+        base_path = f"Mapeamentos/{self.app.lower().strip()}/Base/Base.txt"
+        logged_in = False
+        try:
+            info.window.activate()
+            window_manager.apply_window_info(info)
+            logged_in = self.run_mapping(FileManager(base_path).load_commands(action=base_path), cancelled) \
+                and self.at_home(info)
+        finally:
+            active = self.registry.get(self.app)
+            if active:
+                window_manager.apply_window_info(active)
+            if not logged_in:
+                self.robo.logger.warning("Standby instance could not log in (or was interrupted), closing it.")
+                self.supervisor.discard(info)
+
+        if not logged_in:
+            return False
+        info.window.minimize()
+        self.standby = info
+        self.robo.logger.info(f"Standby instance of {self.app} ready (hwnd {info.hwnd}).")
+        return True
+
+    def start_standby(self) -> None:
+        """
+        Método responsável por preparar a reserva em uma thread, sem segurar o robô que acabou de esvaziar a fila.
+        """
+        if not self.needs_standby():
+            return
+        with RecoveryManager._preparation_lock:
+            running = RecoveryManager._preparation
+            if running is not None and running.is_alive():
+                return
+            RecoveryManager._cancel.clear()
+            RecoveryManager._preparation = threading.Thread(target=self._prepare_in_background, daemon=True,
+                                                            name=f"standby-{self.app}")
+            RecoveryManager._preparation.start()
+
+    def _prepare_in_background(self) -> None:
+        try:
+            self.prepare_standby(RecoveryManager._cancel.is_set)
+        except Exception as e:
+            self.robo.logger.error(f"Could not prepare standby instance: {e}")
+
+    @classmethod
+    def stop_standby(cls) -> None:
+        """
+        Método responsável por interromper a preparação em segundo plano (no fim do passo atual) e esperar que ela
+        devolva mouse, teclado e janelas. Chamado antes de cada operação.
+        """
+        with cls._preparation_lock:
+            running = cls._preparation
+            if running is None or not running.is_alive():
+                return
+            cls._cancel.set()
+        running.join()
+
+    def swap_to_standby(self) -> bool:
+        """
+        Método responsável por fechar a instância travada e colocar a reserva no lugar.
+        O registro passa a apontar para o handle e o PID da reserva, guardados no lançamento.
+        """
+        if not self.standby_ready():
+            return False
+        standby, self.standby = self.standby, None
+        self.robo.window_manager.closeapp()
+        info = self.registry.register(self.app, standby.window)
+        info.window.restore()
+        info.window.activate()
+        # Geometria atualizada depois de restaurar; o handle guardado é o da reserva, sem nova busca por título
+        info = self.registry.get(self.app)
+        self.supervisor.watch(info)
+        self.robo.window_manager.apply_window_info(info)
+        self.robo.logger.info(f"Swapped to standby instance of {self.app} (hwnd {info.hwnd}, PID {info.pid}).")
+        return self.at_home(info)
+
+    def restart(self) -> None:
+        """
+        Método responsável pelo reinício completo do aplicativo.
+        """
+        self.robo.window_manager.closeapp()
+        self.robo.open_app()
@@ -0,0 +1,94 @@
+import json
+import hashlib
+import redis
+from typing import Any, Optional
+
+from Constants import actions_cache_ttl, cache_invalidations, question_variable_names, CACHE_IGNORED_INPUTS
+
+# Mesmo Redis usado pelo broker do Celery
+REDIS_CLIENT = redis.Redis(host='localhost', port=6379, db=0)
+CACHE_PREFIX = "result_cache"
+
+
+class ResultCache:
+    """
+    Classe responsável por guardar, por um curto período, os resultados das ações exportadas pelos robôs.
+    Consultas repetidas (saldo, estatísticas em tempo real...) são respondidas direto do Redis,
+    sem passar pelo Celery, pelo foco da janela nem pelo OCR.
+
+    A chave é formada pelo app, pela ação e pelas perguntas de entrada que diferenciam um pedido do outro.
+    O tempo de vida de cada ação é definido em actions_cache_ttl (Constants.py).
+    """
+
+    KEY_INPUTS = [q for q in question_variable_names['Input'] if q not in CACHE_IGNORED_INPUTS]
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.client = client if client is not None else REDIS_CLIENT
+
+    @staticmethod
+    def _normalize(value: Any) -> str:
+        return str(value).strip().lower() if value is not None else ""
+
+    def make_key(self, question) -> str:
+        """
+        Método responsável por montar a chave do cache a partir de um objeto Question.
+        Os valores de entrada são serializados em ordem fixa para que pedidos equivalentes gerem a mesma chave.
+        """
+        app = self._normalize(getattr(question, 'App', ''))
+        action = self._normalize(getattr(question, 'Action', ''))
+        inputs = {q: getattr(question, q, None) for q in self.KEY_INPUTS}
+        inputs = {q: v for q, v in inputs.items() if v not in (None, "", [])}
+        digest = hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return f"{CACHE_PREFIX}:{app}:{action}:{digest}"
+
+    def ttl_for(self, action: str) -> int:
+        return actions_cache_ttl.get(self._normalize(action), 0)
+
+    def get(self, question) -> Optional[dict]:
+        """
+        Método responsável por buscar o resultado de uma pergunta no cache.
+        Retorna None quando a ação não é cacheável ou quando não há resultado válido.
+        """
+        if not self.ttl_for(getattr(question, 'Action', '')):
+            return None
+        try:
+            cached = self.client.get(self.make_key(question))
+        except redis.RedisError as e:
+            print(f"Erro ao consultar o cache de resultados: {e}")
+            return None
+        if cached is None:
+            return None
+        return json.loads(cached)
+
+    def store(self, question, result: dict) -> bool:
+        """
+        Método responsável por guardar o resultado exportado de uma pergunta.
+        Retorna True se o resultado foi guardado.
+        """
+        ttl = self.ttl_for(getattr(question, 'Action', ''))
+        if not ttl or not result:
+            return False
+        try:
+            self.client.setex(self.make_key(question), ttl, json.dumps(result, default=str))
+        except redis.RedisError as e:
+            print(f"Erro ao gravar no cache de resultados: {e}")
+            return False
+        return True
+
+    def invalidate(self, question) -> int:
+        """
+        Método responsável por apagar os resultados que uma ação de escrita torna obsoletos.
+        Apaga todas as entradas das ações relacionadas no mesmo app, independente das entradas.
+        Retorna a quantidade de chaves removidas.
+        """
+        app = self._normalize(getattr(question, 'App', ''))
+        action = self._normalize(getattr(question, 'Action', ''))
+        removed = 0
+        try:
+            for related in cache_invalidations.get(action, []):
+                keys = list(self.client.scan_iter(match=f"{CACHE_PREFIX}:{app}:{related}:*"))
+                if keys:
+                    removed += self.client.delete(*keys)
+        except redis.RedisError as e:
+            print(f"Erro ao invalidar o cache de resultados: {e}")
+        return removed
@@ -0,0 +1,139 @@
+import json
+import time
+import uuid
+from typing import Any, Optional
+
+import redis
+
+from Constants import RESULT_STREAM_ACTIONS, RESULT_STREAM_MODE, RESULT_STREAM_CHUNK_SIZE, RESULT_STREAM_MAX_WAIT, \
+    RESULT_STREAM_TTL, RESULT_STREAM_MAXLEN
+
+# Mesmo Redis usado pelo broker do Celery
+REDIS_CLIENT = redis.Redis(host='localhost', port=6379, db=0)
+STREAM_PREFIX = "result_stream"
+
+
+class ResultStream:
+    """
+    Classe responsável por publicar, em pedaços, as linhas de uma lista longa enquanto o robô ainda a percorre.
+
+    As linhas são agrupadas em pedaços de RESULT_STREAM_CHUNK_SIZE (ou enviadas após RESULT_STREAM_MAX_WAIT segundos)
+    e publicadas conforme RESULT_STREAM_MODE:
+    * "redis": em um Redis stream (XADD), com entradas {"type": "chunk", "seq", "rows"};
+    * "webhook": pelo WebhookDispatcher, com corpo {"stream", "seq", "rows", "done": false};
+    * "both": nos dois.
+    Vem desligado (""): ligado, a exportação leva só o resumo do stream no lugar da lista, então quem recebe o
+    webhook (e o cache de resultados) precisa ler as linhas do stream.
+    Ao terminar, close() publica o marcador final ({"type": "end"} / {"done": true}) com o total de linhas e o status.
+    O robô guarda apenas o pedaço atual, e não a lista inteira.
+
+    Se o Redis falhar, o destino que falhou é desligado só para este stream e a leitura continua; sem nenhum destino,
+    as linhas que não foram publicadas ficam em unsent e são devolvidas por close() junto com o resumo.
+
+    O id do stream vem da pergunta (Streamid, definido em index.py e devolvido a quem fez o pedido) ou é gerado aqui.
+    """
+
+    def __init__(self, question, dispatcher=None, client: Optional[redis.Redis] = None, mode: str = RESULT_STREAM_MODE):
+        self.client = client if client is not None else REDIS_CLIENT
+        self.dispatcher = dispatcher
+        self.mode = mode
+        self.stream_id = getattr(question, 'Streamid', None) or self.new_id()
+        self.key = self.key_for(self.stream_id)
+        self.context = {q: getattr(question, q, None) for q in ('App', 'Action', 'Id')}
+        self.buffer: list[Any] = []
+        self.buffer_since = 0.0
+        self.seq = 0
+        self.total = 0
+        self.unsent: list[Any] = []
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def key_for(stream_id: str) -> str:
+        return f"{STREAM_PREFIX}:{stream_id}"
+
+    @staticmethod
+    def enabled(action: Optional[str]) -> bool:
+        return bool(RESULT_STREAM_MODE) and str(action or '').strip().lower() in RESULT_STREAM_ACTIONS
+
+    def emit(self, row: Any) -> None:
+        """
+        Método responsável por acrescentar uma linha ao pedaço atual, publicando-o quando estiver cheio ou velho.
+        """
+        if not self.buffer:
+            self.buffer_since = time.monotonic()
+        self.buffer.append(row)
+        self.total += 1
+        if len(self.buffer) >= RESULT_STREAM_CHUNK_SIZE or time.monotonic() - self.buffer_since >= RESULT_STREAM_MAX_WAIT:
+            self.flush()
+
+    @property
+    def active(self) -> bool:
+        return bool(self.mode)
+
+    def flush(self) -> None:
+        if not self.buffer:
+            return
+        rows, self.buffer = self.buffer, []
+        if self._publish({"type": "chunk", "seq": self.seq, "rows": rows}):
+            self.seq += 1
+        else:
+            self.unsent.extend(rows)
+
+    def close(self, status: str = "completed") -> dict[str, Any]:
+        """
+        Método responsável por publicar as linhas pendentes e o marcador final.
+
+        :return: resumo do stream, exportado no lugar da lista completa
+        """
+        self.flush()
+        self._publish({"type": "end", "seq": self.seq, "total": self.total, "status": status})
+        summary = {"stream": self.key, "rows": self.total, "status": status}
+        if self.unsent:
+            summary["unsent"] = self.unsent
+        return summary
+
+    def _publish(self, entry: dict[str, Any]) -> bool:
+        """
+        Método responsável por publicar uma entrada nos destinos ativos.
+        Um erro do Redis desliga o destino que falhou para este stream, sem interromper a leitura.
+
+        :return: se a entrada foi publicada em algum destino
+        """
+        published = False
+        if self.mode in ("redis", "both"):
+            fields = {k: json.dumps(v, ensure_ascii=False, default=str) if k == "rows" else v for k, v in entry.items()}
+            try:
+                self.client.xadd(self.key, fields, maxlen=RESULT_STREAM_MAXLEN, approximate=True)
+                self.client.expire(self.key, RESULT_STREAM_TTL)
+                published = True
+            except redis.RedisError as e:
+                print(f"Erro ao publicar no stream {self.key}, envio pelo Redis desligado: {e}")
+                self.mode = "webhook" if self.mode == "both" else ""
+        if self.mode in ("webhook", "both") and self.dispatcher is not None:
+            payload = {"stream": self.key, "seq": entry["seq"], "done": entry["type"] == "end", **self.context}
+            payload.update({k: v for k, v in entry.items() if k not in ("type", "seq")})
+            try:
+                self.dispatcher.submit(payload)
+                published = True
+            except redis.RedisError as e:
+                print(f"Erro ao enfileirar o pedaço do stream {self.key}, envio por webhook desligado: {e}")
+                self.mode = "redis" if self.mode == "both" else ""
+        return published
+
+    @classmethod
+    def read(cls, stream_id: str, last_id: str = "0", client: Optional[redis.Redis] = None) -> list[tuple[str, dict]]:
+        """
+        Método responsável por ler as entradas publicadas após last_id (para quem consome o stream pelo Redis).
+        """
+        client = client if client is not None else REDIS_CLIENT
+        entries = []
+        for entry_id, fields in client.xrange(cls.key_for(stream_id), min=f"({last_id}" if last_id != "0" else "-"):
+            fields = {(k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+                      for k, v in fields.items()}
+            if "rows" in fields:
+                fields["rows"] = json.loads(fields["rows"])
+            entries.append((entry_id.decode() if isinstance(entry_id, bytes) else entry_id, fields))
+        return entries
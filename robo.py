@@ -1,29 +1,36 @@
 import os
-import sys
 import pyautogui
 pyautogui.FAILSAFE = True
 pyautogui.PAUSE = 0.1
 
 import operator
 import logging
-import pytesseract
-from PIL import ImageFilter
-import requests
-from time import sleep
-from datetime import timedelta, datetime
+from time import sleep, perf_counter
+from datetime import timedelta
 from typing import Optional, Any
 
-from utils import WindowManager, FileManager, Question, QuestionBuilder, Comando, area_add, parse_date
-from overlayCreator import TransparentOverlay
-from Constants import featureToQuestion,abas, actionToMode, id_app_correspondence, color, condition, absolutePosition, relativePosition, relativeArea
-from dotenv import load_dotenv
+from utils import WindowManager, FileManager, Question, QuestionBuilder, Comando, area_add, parse_date, color_in_range
+from overlayCreator import shared_overlay
+from launchSupervisor import LaunchSupervisor
+from recoveryManager import RecoveryManager
+from screenState import ScreenStateClassifier
+from navigationGraph import NavigationGraph
+from resultCache import ResultCache
+from resultStream import ResultStream
+from robotQueue import AffinityScheduler, CommandQueue
+from tableScanner import TableScanner
+from dateWindowSearch import DateWindowSearch
+from roboLogging import RoboLogPipeline, log_event
+from webhookDispatcher import WebhookDispatcher
+from missclickHandler import MissclickHandler
+from templateLocator import TemplateLocator
+from ocrPool import OcrPool, PendingRead
+from screenCapture import ScreenCapture
+from Constants import featureToQuestion,abas, actionToMode, id_app_correspondence, color, condition, absolutePosition, relativePosition, relativeArea, \
+    CLICK_VERIFY_ENABLED, CLICK_VERIFY_RADIUS, CLICK_VERIFY_TIMEOUT, CLICK_VERIFY_RETRIES, COLOR_WAIT_POLLS, COLOR_POLL_INTERVAL, \
+    STEP_SETTLE
 
 
-def better_emit(record, handler, log_dir):
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir, exist_ok=True)
-    handler._original_emit(record)
-
 class Robo:
     """
     Classe que define todo o comportamento do robo.
@@ -38,74 +45,95 @@ class Robo:
 
     def __init__(self, app_name: str, chosen_feature: str='Base'):
         self.app = app_name
-        self.transparent_overlay = TransparentOverlay(box_size=10, duration=5)
+        self.transparent_overlay = shared_overlay(box_size=10, duration=5)
         self.retries = 0
         self.commands: list[dict] = []
-        self.command_list: list[Comando] = []
+        self.command_list = CommandQueue()
+        self.scheduler = AffinityScheduler()
         self.operations_list: list[str] = []
-        self.questions = Question()
+        self.questions = Question({})
+        self.result_cache = ResultCache()
+        self.webhook_dispatcher = WebhookDispatcher.shared()
+        self.missclick_handler = MissclickHandler()
+        self.screen_capture = ScreenCapture.shared()
         self.window_manager = WindowManager(app=app_name)
+        self.launch_supervisor = LaunchSupervisor(registry=self.window_manager.registry)
+        self.recovery_manager = RecoveryManager(self)
+        self.screen_state = ScreenStateClassifier(app_name)
+        self.navigation_graph = NavigationGraph(app_name)
+        self.template_locator = TemplateLocator(app_name)
+        self.position_offset: tuple[int, int] = (0, 0)
+        self.read_confidence: dict[str, float] = {}
+        # RoboRuntime que conduz o robô (modo "async"); None no modo síncrono, em que next_operation encadeia as operações
+        self.runtime = None
+        self.operation_failed = False
+        self.failure_count = 0  # Falhas registradas por fail_operation; navigate usa para saber se um passo falhou
         self.window_manager.detect_window_position(app=app_name)
         self.chosen_feature = chosen_feature
         self.setup_logging()
+        self.navigation_graph.load_traces(self.log_pipeline.log_path)
 
         self.file_manager = FileManager("Mapeamentos/" + f"{self.app.lower().strip()}BaseCommands.txt")
 
     def setup_logging(self, log_level: int = logging.INFO) -> None:
+        """
+        Método responsável por configurar o log do robô.
+        A escrita (console e arquivo) acontece na thread do RoboLogPipeline, fora da thread do robô.
+        """
         logger_name = f"RoboLogger_{self.app}_{id(self)}"
-        self.logger = logging.getLogger(logger_name)
-        self.logger.setLevel(log_level)
-        self.logger.propagate = False
+        self.log_pipeline = RoboLogPipeline(self.app, logger_name, log_level)
+        self.logger = self.log_pipeline.logger
+        self.log_dir = self.log_pipeline.log_dir
 
-        if self.logger.hasHandlers():
-            self.logger.handlers.clear()
-
-        self.log_dir = f"log/{self.app.capitalize()}/{datetime.now().strftime('%d.%m.%Y')}"
-
-        # Console
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(log_level)
-        console_formatter = logging.Formatter('%(message)s')
-        console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
-        
-    def set_log_file(self, log_level: int = logging.INFO):
-        # File
-        file_handler = next((h for h in self.logger.handlers if isinstance(h, logging.FileHandler)), None)
-        if file_handler:
-            file_handler.close()
-            self.logger.removeHandler(file_handler)
-
-        log_filename = f"{self.chosen_feature}_{datetime.now().strftime('%H.%M.%S')}.log"
-        log_path = os.path.join(self.log_dir, log_filename)
-
-        file_handler = logging.FileHandler(log_path, encoding="utf-8", delay=True)
-        file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        # Can be made better with a custom FileHandler Class (NOT THE ONE FOR COMMAND MAPPING)
-        setattr(file_handler, '_original_emit', file_handler.emit) # Ugly as can be, but seems to work
-        file_handler.emit = lambda record, handler=file_handler, log_dir=self.log_dir: better_emit(record, handler, log_dir) # I was wrong this is uglier than the last line, but also seems to work
-        file_handler.setFormatter(file_formatter)
-        file_handler.setLevel(log_level)
-
-        self.logger.addHandler(file_handler)
-        self.logger.info(f"Started new log for action: {self.chosen_feature}")
+    def set_log_context(self, **context) -> None:
+        """
+        Método responsável por anexar o contexto da operação atual aos próximos registros de log,
+        no lugar de abrir um arquivo novo para cada operação.
+        """
+        self.log_pipeline.set_context(**context)
+        self.logger.info(f"Started new log context: {context}")
 
-    def open_app(self):
+    def open_app(self) -> bool:
         """
         Método responsável por abrir o aplicativo.
+        Retorna assim que a tela inicial do aplicativo é reconhecida pelo LaunchSupervisor.
+
+        :return: False se o aplicativo não pôde ser aberto (atalho ausente, tempo esgotado ou processo encerrado)
         """
+        # A preparação da instância reserva usa mouse e teclado: é interrompida antes de a operação começar
+        self.recovery_manager.stop_standby()
         app_path = f"{self.app}.lnk"
         self.logger.info(f"Iniciando o aplicativo {self.app}...")
-        if not os.path.exists(app_path):
+        try:
+            info = self.launch_supervisor.launch(app_path, self.app)
+        except FileNotFoundError:
             self.logger.error(f"Arquivo {app_path} não encontrado.")
-            raise FileNotFoundError(f"Arquivo {app_path} não encontrado.")
-        else:
-            self.window_manager.openapp(app_path, self.app)
-            sleep(4)
-            self.window_manager.detect_window_position(app=self.app)
-            self.logger.info(f"{self.app} iniciado com sucesso.")
+            return False
+        except (TimeoutError, RuntimeError) as e:
+            self.logger.error(f"Falha ao iniciar {self.app}: {e}")
+            return False
+        self.window_manager.apply_window_info(info)
+        self.logger.info(f"{self.app} iniciado com sucesso.")
+        return True
 
-    def follow_command(self, position: relativePosition, action: str, value: color | str, condition) -> None:
+    def abort_operation(self, reason: str) -> None:
+        """
+        Método responsável por encerrar a operação atual sem executá-la, reportando o motivo no campo Ok.
+        O estado do robô (comandos, tentativas) é limpo para que a próxima operação recebida o coloque para rodar de novo.
+        """
+        self.logger.error(f"Aborting operation {self.chosen_feature}: {reason}")
+        self.questions.attrs.update({"Ok": reason})
+        self.finish_operation()
+        if self.command_list.current is not None:
+            self.command_list.finish()
+        self.commands = []
+        self.retries = 0
+        self.navigation_graph.discard_trace()
+        # O estado da janela é desconhecido: a próxima operação começa pelo mapeamento Base
+        self.operations_list = []
+
+    def follow_command(self, position: relativePosition, action: str, value: color | str, condition, verify: Optional[dict] = None,
+                       settle: bool = True) -> None:
         """
         Método responsável por fazer com que o robô siga o passo a passo de determinado comando.
         Para isso, faz a verificação de qual foi o comando solicitado.
@@ -117,47 +145,94 @@ class Robo:
         :type value: color | str
         :param condition: Condição(cor em posição) sob a comando de click deve ser executado
         :type condition: tuple[relativePosition, color]
+        :param settle: Espera STEP_SETTLE após o passo; o RoboRuntime passa False e faz a espera sem ocupar o executor de entrada
         :return None:
         """
+        start = perf_counter()
+        result = None
         if position and not action == 'read':
-            position = self.window_manager.get_absolute_position(position)
+            position = self.step_position(position, action)
+
+        if action == 'locate':
+            result = self.locate_action(position, value)
 
-        if action == 'click':
-            self.click_action(position, condition) 
+        elif action == 'click':
+            self.click_action(position, condition, verify)
 
         elif action == 'write':
             self.clear_action()
             if value[0] == '.':
                 value = str(value[1:]).lower().capitalize()
+                self.resolve_reads([value])
                 value = str(getattr(self.questions, value))
             self.secure_write(value) 
 
         elif action == 'color':
-            self.color_detection_action(position, value) 
+            result = self.color_detection_action(position, value) 
 
         elif action == 'paramChange':
             self.param_change_action(value)
 
         elif action == 'read':
             value = str(value)
-            read_value = self.read_action(tuple(position)) 
+            # O OCR roda no OcrPool; o texto só é esperado quando for usado (comparação, escrita ou exportação)
+            read_value = self.read_action(tuple(position), field=value, wait=False)
             if not getattr(self.questions, value, None): 
                 self.questions.attrs[value] = [] 
             self.questions.attrs[value].append(read_value) 
+            result = read_value if isinstance(read_value, str) else None
         
         elif action == 'compare_variables':
             self.compare_action(value) 
+            result = self.questions.attrs.get("Ok")
             
         elif action == "scroll":
             self.scroll_action(tuple(value)) 
 
         elif action == 'webhook':
+            log_event(self.logger, "step", f"Step {action} started", action=action)
             self.export_action()
-    
-        sleep(0.1)
+            return
+
+        if settle:
+            sleep(STEP_SETTLE)
+        elapsed_ms = round((perf_counter() - start) * 1000, 1)
+        log_event(self.logger, "step", f"Step {action} finished in {elapsed_ms} ms", action=action, elapsed_ms=elapsed_ms, result=result)
+
+    def step_position(self, position: relativePosition, action: str) -> absolutePosition:
+        """
+        Método responsável por converter a posição de um passo para a tela, somando o deslocamento do último 'locate'.
+        """
+        position = self.window_manager.get_absolute_position(position)
+        if action in ('click', 'color'):
+            position = (position[0] + self.position_offset[0], position[1] + self.position_offset[1])
+        return position
 
+    def locate_action(self, position: absolutePosition, value: Optional[str]) -> tuple[int, int]:
+        """
+        Método responsável por encontrar um elemento que pode ter se deslocado e ajustar os próximos passos.
+        O deslocamento encontrado é somado às posições dos passos 'click' e 'color' seguintes, até o próximo
+        passo 'locate' (um 'locate' sem template volta ao deslocamento zero) ou até a próxima operação.
 
-    def click_action(self, position: relativePosition, condition: Optional[condition] = None) -> None:
+        :param position: posição em que o centro do elemento deveria estar
+        :param value: nome do template em Mapeamentos/<app>/Tpl
+        """
+        self.position_offset = (0, 0)
+        if not value:
+            return self.position_offset
+        start = perf_counter()
+        found = self.template_locator.locate(str(value), position)
+        elapsed_ms = round((perf_counter() - start) * 1000, 1)
+        if found is None:
+            # Sem o elemento, os passos seguem nas posições mapeadas; o próximo passo 'color' decide se a tela está certa
+            log_event(self.logger, "locate", f"Template {value} not found near {position}", level=logging.WARNING,
+                      elapsed_ms=elapsed_ms, result=None)
+            return self.position_offset
+        self.position_offset = found
+        log_event(self.logger, "locate", f"Template {value} found with offset {found}", elapsed_ms=elapsed_ms, result=found)
+        return found
+
+    def click_action(self, position: relativePosition, condition: Optional[condition] = None, verify: Optional[dict] = None) -> bool:
         """
         Método responsável por realizar o clique em uma determinada posição relativa a tela do windowManager.
         
@@ -165,7 +240,9 @@ class Robo:
         :type position: relativePosition
         :param condition: condição a ser verificada antes do clique
         :type condition: tuple[relativePosition, color]
-        :return: None
+        :param verify: verificação declarada no mapeamento (veja verified_click); se falhar mesmo após os novos cliques,
+            a operação é refeita (retry_action) na hora, sem esperar o próximo passo 'color' expirar
+        :return: True se o clique foi feito e teve efeito
         """
 
         self.transparent_overlay.create_overlay(position[0], position[1], callback=self.on_overlay_closed)
@@ -176,22 +253,80 @@ class Robo:
             condition_color = condition[1]
             while i<1:
                 expected_color : color = condition_color
-                detected_color = pyautogui.pixel(condition_pos[0], condition_pos[1])
-                self.logger.info(f"Detecting condition at {condition_pos}, expecting {expected_color} x detected {detected_color}")
+                detected_color = self.screen_capture.color(condition_pos)
+                log_event(self.logger, "condition_poll", f"Detecting condition at {condition_pos}, expecting {expected_color} x detected {detected_color}",
+                          sample_key=f"condition_poll:{condition_pos}", result=detected_color)
                 if self.color_detection_action(condition_pos, expected_color, conditional=True):
                     self.transparent_overlay.create_overlay(position[0], position[1], callback=self.on_overlay_closed)
-                    pyautogui.moveTo(position, duration=0.3)
-                    pyautogui.click()
-                    self.logger.info(f"Clicked at {position}")
-                    break
+                    return self.checked_click(position, verify)
                 sleep(0.1)
                 i+=1
             if i==2:
                 self.logger.warning("Condition not met, moving on.")
+            return False
         else:
-            pyautogui.moveTo(position, duration=0.3)
+            return self.checked_click(position, verify)
+
+    def checked_click(self, position: absolutePosition, verify: Optional[dict]) -> bool:
+        if self.verified_click(position, verify) or not verify:
+            return True
+        self.logger.error(f"Click at {position} had no effect after local retries, retrying operation.")
+        self.retry_action()
+        return False
+
+    def verified_click(self, position: absolutePosition, verify: Optional[dict] = None) -> bool:
+        """
+        Método responsável por clicar e conferir, em milissegundos, se o clique teve efeito.
+        A captura de referência é feita depois que o mouse chega no ponto (para não confundir o hover com o clique)
+        e as capturas de conferência começam logo após o clique, então um clique bem-sucedido quase não espera.
+
+        Sem verify, o clique só é conferido com CLICK_VERIFY_ENABLED (desligado por padrão, pois um clique que não muda
+        a tela espera CLICK_VERIFY_TIMEOUT): confere se a região em volta do ponto mudou e apenas registra o resultado.
+        O mapeamento pode declarar, no comando de clique, uma verificação própria:
+            "verify": {"region": [[x0, y0], [x1, y1]], "timeout": 0.3, "retries": 2}
+                a área (relativa) que deve mudar com o clique;
+            "verify": {"position": [x, y], "value": [r, g, b], "timeout": 0.3, "retries": 2}
+                a cor que deve aparecer na posição (relativa) após o clique.
+        Nesse caso, um clique sem efeito é repetido no mesmo ponto até `retries` vezes (CLICK_VERIFY_RETRIES por padrão).
+
+        :return: True se o clique teve o efeito esperado (ou se a verificação está desligada), False caso contrário
+        """
+        pyautogui.moveTo(position, duration=0.3)
+        if not CLICK_VERIFY_ENABLED and not verify:
             pyautogui.click()
             self.logger.info(f"Clicked at {position}")
+            return True
+
+        verify = verify or {}
+        timeout = verify.get('timeout', CLICK_VERIFY_TIMEOUT)
+        attempts = 1 + (verify.get('retries', CLICK_VERIFY_RETRIES) if verify else 0)
+        expected_color = verify.get('value')
+        if expected_color:
+            color_pos = self.window_manager.get_absolute_position(verify['position'])
+        elif verify.get('region'):
+            (x0, y0), (x1, y1) = (self.window_manager.get_absolute_position(p) for p in verify['region'])
+            region = (min(x0, x1), min(y0, y1), max(1, abs(x1 - x0)), max(1, abs(y1 - y0)))
+        else:
+            radius = CLICK_VERIFY_RADIUS
+            region = (position[0] - radius, position[1] - radius, 2 * radius, 2 * radius)
+
+        for attempt in range(1, attempts + 1):
+            baseline = None if expected_color else self.missclick_handler.capture(region)
+            pyautogui.click()
+            start = perf_counter()
+            if expected_color:
+                ok = self.recovery_manager.wait_color(color_pos, tuple(expected_color), timeout)
+            else:
+                ok = self.missclick_handler.wait_for_change(region, baseline, timeout)
+            elapsed_ms = round((perf_counter() - start) * 1000, 1)
+            log_event(self.logger, "click_verify", f"Clicked at {position} (attempt {attempt}/{attempts}), "
+                      f"{'expected effect seen' if ok else 'no effect'} after {elapsed_ms} ms",
+                      level=logging.INFO if ok else logging.WARNING, action="click", elapsed_ms=elapsed_ms, result=ok)
+            if ok:
+                return True
+            if attempt < attempts:
+                pyautogui.moveTo(position)
+        return False
 
     def color_detection_action(self, position: absolutePosition, expected_color: color, conditional: bool = False) -> bool:
         """
@@ -203,54 +338,83 @@ class Robo:
         :type expected_color: color
         """
         self.transparent_overlay.create_overlay(position[0], position[1], callback=self.on_overlay_closed)
-        for _ in range(20):
-            detected_color = pyautogui.pixel(position[0], position[1])
-            self.logger.info(f"Detecting color at {position}, expecting {expected_color} x detected {detected_color}")
-            specific_range = 10
-            total_range = 20
-            if all(abs(detected_color[i] - expected_color[i]) <= specific_range for i in range(3)) and \
-                sum(abs(detected_color[i] - expected_color[i]) for i in range(3)) <= total_range:
-                self.logger.info(f"Color {detected_color} detected within range.")
-                self.retires = 0
+        start = perf_counter()
+        for poll in range(1, COLOR_WAIT_POLLS + 1):
+            if self.color_matches(position, expected_color):
+                elapsed_ms = round((perf_counter() - start) * 1000, 1)
+                log_event(self.logger, "color_wait", f"Color detected within range after {poll} polls.",
+                          elapsed_ms=elapsed_ms, result=True, polls=poll)
                 return True
-            sleep(0.3)
+            sleep(COLOR_POLL_INTERVAL)
         else:
-            self.logger.warning("Color not detected within range after 20 attempts.")
+            elapsed_ms = round((perf_counter() - start) * 1000, 1)
+            # Numa condição, a cor ausente só decide o fluxo; fora dela, é uma falha da operação
+            log_event(self.logger, "color_wait", f"Color not detected within range after {COLOR_WAIT_POLLS} attempts.",
+                      level=logging.INFO if conditional else logging.WARNING, elapsed_ms=elapsed_ms, result=False,
+                      polls=COLOR_WAIT_POLLS)
             if not conditional:
                 self.retry_action()
             return False
 
+    def color_matches(self, position: absolutePosition, expected_color: color) -> bool:
+        """
+        Método responsável por conferir uma vez a cor de uma posição (uma leitura do polling de cor).
+        """
+        detected_color = self.screen_capture.color(position)
+        log_event(self.logger, "color_poll", f"Detecting color at {position}, expecting {expected_color} x detected {detected_color}",
+                  sample_key=f"color_poll:{position}", result=detected_color)
+        return color_in_range(detected_color, expected_color)
+
 
     def retry_action(self) -> None:
         """
-        Método responsável por redefinir o estado da operação atual.
+        Método responsável por redefinir o estado da operação atual e recomeçá-la (ou seguir para a próxima,
+        se ela foi abandonada). Quando o robô é conduzido pelo RoboRuntime, só a falha é registrada: o próprio runtime
+        segue com a fila.
+        """
+        self.fail_operation()
+        if self.runtime is None:
+            self.next_operation()
+
+    def fail_operation(self) -> bool:
         """
+        Método responsável por registrar a falha da operação atual e recuperar o aplicativo para uma nova tentativa.
+
+        :return: True se a operação será tentada de novo, False se foi abandonada após 3 tentativas
+        """
+        self.operation_failed = True
+        self.failure_count += 1
         self.retries += 1
+        # Os passos da recuperação e da nova tentativa não pertencem à aresta em que a falha aconteceu
+        self.commands = []
+        self.navigation_graph.discard_trace()
+        self.log_pipeline.set_context(step=None, edge=None)
 
         if self.retries >= 3:
-            self.command_list.pop(0)
+            self.command_list.finish()
+            self.retries = 0
             self.logger.error(f"Failed to perform operation {self.chosen_feature} after 3 retries. Moving to next operation.")
-            return
+            return False
 
         self.logger.warning(f"Retrying operation {self.chosen_feature} ({self.retries}°/3 try)")
         self.questions.attrs.update({"Ok": f'Could not perform operation {self.chosen_feature}'})
-        self.commands = []
-        self.operations_list = []
-        self.window_manager.closeapp()
-        self.open_app()
-        self.next_operation()
-        return
+        aba = abas.get(self.operations_list[-1]) if self.operations_list else None
+        # Na tela inicial já logado, a próxima operação só precisa dos mapeamentos Nav e Act
+        logged_in = self.recovery_manager.recover(self.retries, aba)
+        self.operations_list = ['base'] if logged_in else []
+        return True
 
-    def read_action(self, value: relativeArea) -> str:
+    def read_action(self, value: relativeArea, field: Optional[str] = None, wait: bool = True) -> str | PendingRead:
         """
         Método responsável por realizar a leitura de um texto exibido no aplicativo.
         
         :param value: coordenadas da bounding box a ser lida
         :type value: tuple[absolutePosition, absolutePosition]
-        :param param: parâmetro a ser atualizado
-        :type param: str
-        :return: texto lido
-        :rtype: str
+        :param field: nome da pergunta lida (Saldo, Id, ...), que escolhe o perfil de OCR (ocrProfiles.profile_for)
+        :type field: str
+        :param wait: espera o OCR; se False, devolve a leitura pendente (PendingRead) e o robô segue com os próximos passos
+        :return: texto lido, ou a leitura pendente
+        :rtype: str | PendingRead
         """
         
         self.logger.info(f"Reading action with value: {value}")
@@ -267,35 +431,53 @@ class Robo:
         height = pos[3] - pos[1]
 
         bbox = (pos[0], pos[1], width, height)
-        for _ in range(1):
-            overlay_window = self.transparent_overlay.create_rectangle_window((pos[0], pos[1]), (pos[2], pos[3]))
-            try:
-                save_path = f"read_imgs/{self.app}/{self.chosen_feature[:-3]}.png"
-                os.makedirs(os.path.dirname(save_path), exist_ok=True)
-                screenshot = pyautogui.screenshot(region=bbox)
-                screenshot.save(save_path)
-                print(f"Screenshot taken with bounding box: {bbox},\nsaved to {save_path}")
-                screenshot = screenshot.filter(ImageFilter.SHARPEN)
-                screenshot = screenshot.convert("RGB")
-                treated_save_path = save_path.replace("read_imgs/", "treated_imgs/")
-                os.makedirs(os.path.dirname(treated_save_path), exist_ok=True)
-                screenshot.save(treated_save_path)
-                self.logger.info(f"Screenshot also saved to {treated_save_path}")
-
-                text = pytesseract.image_to_string(screenshot, config="--psm 6").strip()
-                if text:
-                    self.logger.info(f"Extracted Text: {text}")
-                    overlay_window.destroy()
-                    return text
-                self.logger.warning("OCR returned empty text, retrying...")
-                sleep(0.3)
-            except Exception as e:
-                print(f"OCR failed, Exception: {e}, retrying...")
-                sleep(0.3)
+        try:
+            save_path = f"read_imgs/{self.app}/{self.chosen_feature[:-3]}.png"
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            screenshot = pyautogui.screenshot(region=bbox)
+            # Marcado só depois da captura, para que a borda não apareça na imagem lida
+            self.transparent_overlay.rectangle_overlay((pos[0], pos[1]), (pos[2], pos[3]))
+            screenshot.save(save_path)
+            print(f"Screenshot taken with bounding box: {bbox},\nsaved to {save_path}")
+            pending = OcrPool.shared().submit(screenshot, field, self.app, save_path.replace("read_imgs/", "treated_imgs/"))
+        except Exception as e:
+            self.logger.error(f"OCR failed, Exception: {e}")
+            return ""
+        return self.resolve_read(pending) if wait else pending
+
+    def resolve_read(self, pending: PendingRead) -> str:
+        """
+        Método responsável por esperar uma leitura enviada ao OcrPool e registrar seus logs e sua confiança.
+        """
+        try:
+            text, confidence, events = pending.result()
+        except Exception as e:
+            self.logger.error(f"OCR failed, Exception: {e}")
+            text, confidence, events = "", 0.0, []
+        for event in events:
+            log_event(self.logger, "ocr", event["message"], elapsed_ms=event["elapsed_ms"], result=event["result"])
+
+        if pending.field:
+            # A confiança exportada de um campo é a da sua pior leitura (listas são lidas linha a linha)
+            self.read_confidence[pending.field] = min(confidence, self.read_confidence.get(pending.field, 1.0))
+        if text:
+            self.logger.info(f"Extracted Text: {text}")
+        else:
+            self.logger.warning("Failed to extract text.")
+        return text
 
-        self.logger.warning("Failed to extract text after retries.")
-        overlay_window.destroy()
-        return ""
+    def resolve_reads(self, names: Optional[list[str]] = None) -> None:
+        """
+        Método responsável por trocar, nas variáveis da pergunta, as leituras ainda pendentes pelo texto lido.
+        Chamado só onde os valores são usados: comparações e escritas (só as variáveis usadas) e a exportação (todas).
+        """
+        for name, value in list(self.questions.attrs.items()):
+            if names is not None and name not in names:
+                continue
+            if isinstance(value, PendingRead):
+                self.questions.attrs[name] = self.resolve_read(value)
+            elif isinstance(value, list) and any(isinstance(v, PendingRead) for v in value):
+                self.questions.attrs[name] = [self.resolve_read(v) if isinstance(v, PendingRead) else v for v in value]
 
     def compare_action(self, value: tuple[str, str, str|relativeArea, str|relativeArea]) -> dict[str, Any]:
         """
@@ -329,9 +511,12 @@ class Robo:
         for idx, origem in enumerate(value[0].lower()): 
             if origem == 'r':
                 pos = value[2 + idx]
-                read_var = self.read_action(pos)
+                # A leitura usa o perfil de OCR da pergunta com que é comparada
+                other = value[3 - idx] if value[0].lower()[1 - idx] == 'q' else None
+                read_var = self.read_action(pos, field=other)
                 retorno.update({f"r{idx}": read_var})
             elif origem == 'q':
+                self.resolve_reads([value[2 + idx]])
                 var = getattr(self.questions, value[2 + idx], "")
                 retorno.update({f"q{idx}": var})
                 print(f"Question Variable: {var}")
@@ -363,49 +548,95 @@ class Robo:
             - value[3]: Posição de âncora às áreas extras\n
             - value[4]: Nome da variável a ser lida\n
             - value[5]: Área extra a ser lida (Relativo a <base_area>)\n
+            - value[6] (opcional): True se a lista está ordenada por data. Sem área extra, a linha procurada é
+              localizada por DateWindowSearch em vez de uma comparação por linha; com área extra, todas as linhas
+              da janela são lidas, mas a data só é comparada linha a linha na página em que a janela termina\n
         """
         var_base: str = value[0].lower().strip()
         scroll_pos: relativeArea = value[1]
         base_area: relativeArea = value[2]
         anchors: list[relativePosition] = value[3]
         extra_area = value[5]
+        date_ordered = len(value) > 6 and bool(value[6])
 
         abs_scroll = (self.window_manager.get_absolute_position(scroll_pos[0]), self.window_manager.get_absolute_position(scroll_pos[1]))
         self.logger.info(f"Scroll action with var_base: {var_base}, read_areas: {base_area}, scroll_pos: {scroll_pos}")
 
-        first_value = self.read_action(base_area)
-        print(f"Base Area: {base_area}")
-        last_value = ''
-        
-        anchors.reverse()
-        anchors.append(base_area[0])
-        anchors.reverse()
-
-        while first_value != last_value:
-            for i, anchor in enumerate(anchors):
-                next_area = ((base_area[0][0], anchor[1]), (base_area[1][0], base_area[1][1] - base_area[0][1] + anchor[1]))
-                if i == 0:
-                    first_value = self.read_action(next_area)
-                print(next_area)
-                #TODO: Add comp type in Command Detection
-                read_dict = self.compare_action(("QR", 'periodo', var_base[1:], next_area))
-                read_compare_var = read_dict[[k for k in read_dict if k.startswith('r')][0]]
-                if extra_area:
-                    read_save_var = self.read_action(area_add(next_area, extra_area))
-                    if not getattr(self.questions, value[4], None):
-                        self.questions.attrs[value[4]] = [read_save_var]
-                    else:
-                        self.questions.attrs[value[4]].append(read_save_var)
-                if self.questions.attrs.get("Ok", False):
-                    self.click_action(next_area, condition=None)
-                    break
+        # Listas longas são publicadas em pedaços enquanto a leitura continua (ResultStream)
+        stream = ResultStream(self.questions, self.webhook_dispatcher) \
+            if extra_area and ResultStream.enabled(getattr(self.questions, 'Action', None)) else None
+        rows = [((base_area[0][0], anchor[1]), (base_area[1][0], base_area[1][1] - base_area[0][1] + anchor[1]))
+                for anchor in [base_area[0]] + list(anchors or [])]
+
+        def passed_window() -> Optional[bool]:
+            for row in reversed(rows):
+                try:
+                    self.compare_action(("QR", 'periodo', var_base[1:], row))
+                    return bool(self.questions.attrs.get("Ok"))
+                except ValueError:
+                    continue
+            return None
+
+        # Em listas ordenadas por data, a última linha visível diz se a página inteira ainda está dentro da janela
+        page_inside: dict[int, bool] = {}
+
+        def process_row(next_area: relativeArea) -> bool:
+            if date_ordered and scanner.pages not in page_inside:
+                page_inside[scanner.pages] = passed_window() is False
+            if date_ordered and page_inside[scanner.pages]:
+                self.questions.attrs["Ok"] = False
             else:
-                pyautogui.moveTo(abs_scroll[0])
+                #TODO: Add comp type in Command Detection
+                self.compare_action(("QR", 'periodo', var_base[1:], next_area))
+            if extra_area:
+                # Sem stream, as linhas só são usadas na exportação: o OCR segue enquanto a lista rola
+                read_save_var = self.read_action(area_add(next_area, extra_area), field=value[4], wait=stream is not None)
+                if stream:
+                    stream.emit(read_save_var)
+                elif not getattr(self.questions, value[4], None):
+                    self.questions.attrs[value[4]] = [read_save_var]
+                else:
+                    self.questions.attrs[value[4]].append(read_save_var)
+            if self.questions.attrs.get("Ok", False):
+                self.click_action(next_area, condition=None)
+                return True
+            return False
+
+        def scroll(pages: int = 1) -> None:
+            start, end = abs_scroll if pages > 0 else abs_scroll[::-1]
+            for _ in range(abs(pages)):
+                pyautogui.moveTo(start)
                 pyautogui.mouseDown(button='left')
-                pyautogui.moveTo(abs_scroll[1], duration=0.75)
+                pyautogui.moveTo(end, duration=0.75)
                 pyautogui.sleep(0.3)
                 pyautogui.mouseUp(button='left')
 
+        # Só as linhas que entram na tela a cada rolagem são lidas; a leitura termina quando a lista para de rolar
+        scanner = TableScanner(self.window_manager, rows)
+
+        if date_ordered and not extra_area:
+            def scroll_pages(pages: int) -> bool:
+                before = scanner.capture()
+                scroll(pages)
+                return not TableScanner.unchanged(before, scanner.capture())
+
+            search = DateWindowSearch(passed_window, scroll_pages)
+            search.locate()
+            self.logger.info(f"Date window located after {search.position} scrolls and {search.probes} reads")
+
+        try:
+            found = scanner.scan(process_row, scroll)
+        except Exception:
+            if stream:
+                stream.close(status="failed")
+            raise
+        if stream:
+            # O que é exportado no fim é só a referência ao stream, com o total de linhas (e as não publicadas, se o Redis falhou)
+            self.questions.attrs[value[4]] = stream.close()
+        self.logger.info(f"Scroll finished after {scanner.pages} pages and {scanner.processed} rows (found: {found})")
+        if page_inside:
+            self.logger.info(f"{sum(page_inside.values())} of {len(page_inside)} pages were inside the date window, without per-row dates")
+
 
     def clear_action(self) -> None:
         """
@@ -417,13 +648,21 @@ class Robo:
 
     def export_action(self) -> None:
         """
-        Método responsável por exportar dados salvos pelo robô via webhook.
+        Método responsável por exportar dados salvos pelo robô via webhook e seguir para a próxima operação.
+        """
+        self.finish_operation()
+        self.close_operation()
+        self.next_operation()
+
+    def finish_operation(self) -> None:
+        """
+        Método responsável por juntar os dados da operação atual e enviá-los ao webhook.
+        Não mexe na fila de operações nem em janelas, por isso o RoboRuntime pode chamá-lo fora do executor de entrada.
         """
         self.commands = []
-        load_dotenv()
-        webhook_url = os.getenv("WEBHOOK_URL")
 
         data_to_export: dict[str, str] = {}
+        self.resolve_reads()
         self.logger.info(f"Gathering data for feature: {self.chosen_feature}")
         question_variable_names: list[str] = QuestionBuilder().get_possible_questions(featureToQuestion.get(self.chosen_feature, ""))
         self.logger.info(f"Exporting data for questions: {question_variable_names}")
@@ -432,26 +671,41 @@ class Robo:
             value = getattr(self.questions, question.capitalize(), None)
             if value:
                 data_to_export[question] = value
+        # Confiança (0 a 1) da leitura de cada campo exportado, para quem recebe decidir se confia no valor
+        read_confidence = {f.lower(): c for f, c in self.read_confidence.items()}
+        confidence = {q: round(read_confidence[q.lower()], 2) for q in data_to_export if q.lower() in read_confidence}
+        if confidence:
+            data_to_export["Confidence"] = confidence
+
+        # Ações de escrita tornam obsoletos os resultados guardados das consultas do mesmo app
+        self.result_cache.invalidate(self.questions)
 
         if data_to_export:
+            if self.result_cache.store(self.questions, data_to_export):
+                self.logger.info(f"Result cached for action: {self.questions.Action}")
             self.logger.info(f"Sending data to webhook: {data_to_export}")
             try:
-                # Send the data as a JSON POST request
-                response = requests.post(webhook_url, json=data_to_export, headers={'Content-Type': 'application/json'}) 
-                response.raise_for_status()  # Raises an exception for bad status codes (4xx or 5xx)
-                self.logger.info(f"Webhook sent successfully! Status code: {response.status_code}")
-
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Error sending webhook: {e}")
+                # O envio acontece em segundo plano; o robô segue para a próxima operação
+                delivery_id = self.webhook_dispatcher.submit(data_to_export)
+                self.logger.info(f"Webhook queued for delivery: {delivery_id}")
+            except Exception as e:
+                self.logger.error(f"Error queueing webhook: {e}")
         else:
             self.logger.warning("No data was collected to send to the webhook.")
-        
-        self.logger.info(f"Action finished, removing action: {self.command_list[0].question.attrs['Action']} from execution list.")
-        self.command_list.pop(0)
+
+    def close_operation(self) -> None:
+        """
+        Método responsável por retirar a operação concluída da fila e, se a fila esvaziou, deixar o robô em espera.
+        """
+        self.logger.info(f"Action finished, removing action: {self.command_list.current.question.attrs['Action']} from execution list.")
+        self.command_list.finish()
+        self.retries = 0
         if not self.command_list:
+            # No RoboRuntime, a reserva é preparada pelo próprio runtime, com a vez do executor de entrada
+            if self.runtime is None:
+                self.recovery_manager.start_standby()
             from task import manage_buffer_transfer
             manage_buffer_transfer.apply_async()
-        self.next_operation()
 
     def get_bbox(self, pos: tuple[int, int, int, int]) -> tuple:
         """
@@ -511,7 +765,6 @@ class Robo:
             self.logger.info(f"Updated {key} to {val}")
 
         self.logger.info(f"Updating operation with values: {value}")
-        logging.shutdown()
 
 
     def add_operation(self, cmd: Comando) -> None:
@@ -521,7 +774,7 @@ class Robo:
         :type cmd: Comando        
         """
         
-        self.command_list.append(cmd)
+        self.command_list.push(cmd)
         if not self.commands:
             self.logger.info(f"Adding starting operation: {cmd.question.attrs}")
             self.next_operation()
@@ -531,16 +784,29 @@ class Robo:
 
     def next_operation(self) -> None:
         """
-        Método responsável por adicionar uma operação a lista interna do robô.
+        Método responsável por adicionar uma operação a lista interna do robô e executá-la.
+        """
+        if self.prepare_operation():
+            self.run()
+
+    def prepare_operation(self) -> bool:
+        """
+        Método responsável por escolher a próxima operação da fila e montar a sua lista de comandos.
+
+        :return: False se não há operações na fila
         """
-        self.set_log_file()
         if not self.command_list:
             self.logger.info("No more commands in queue.")
-            return
-        cmd = self.command_list[0]
+            return False
+        # Ponto de preempção: a operação mais prioritária é escolhida aqui; uma operação sendo refeita é mantida
+        cmd = self.command_list.start(self.scheduler, abas[self.operations_list[-1]] if self.operations_list else None)
         params: dict[str, str] = {}
+        self.position_offset = (0, 0)
+        self.read_confidence = {}
+        self.operation_failed = False
 
         operation = getattr(cmd,'Action')
+        self.set_log_context(operation=operation)
         mode = actionToMode[operation]
         aba = abas[operation]
         questions = QuestionBuilder().get_possible_questions(featureToQuestion.get('Input', ''))
@@ -548,6 +814,8 @@ class Robo:
         for question in questions:
             params.update({question: getattr(cmd.question, question.capitalize(), '')})
         params.update({"chosen_feature": operation})
+        if getattr(cmd.question, 'Streamid', None):
+            params.update({"Streamid": cmd.question.Streamid})
         print(f"Params: {params}")
 
         print(aba, operation)
@@ -559,25 +827,26 @@ class Robo:
 
         finish_command = {"action": "webhook", "value": params}
         
-        if not self.operations_list:
+        info = self.window_manager.registry.get(self.app)
+        current = self.screen_state.classify(info)
+        # O reconhecimento pula o login e parte da navegação: só vale se a segunda captura confirmar a mesma aba
+        if current is not None and not self.screen_state.confirm(info, current):
+            self.logger.warning(f"Screen recognized as {current} but not confirmed, ignoring it.")
+            current = None
+        if current is not None:
+            self.logger.info(f"Screen recognized as: {current}")
+        elif self.operations_list:
+            current = abas[self.operations_list[-1]]
+        else:
             base_path = f"Mapeamentos/{self.app.lower().strip()}/Base/Base.txt"
             self.logger.info(f"Loading Base commands from {base_path}")
             self.commands.extend(self.file_manager.load_commands(action=base_path))
             self.logger.info(f"Loaded Base commands")
-            self.commands.extend(self.file_manager.load_commands(action=nav_path))
-            self.commands.extend(self.file_manager.load_commands(action=act_path))
-            self.logger.info(f"Loaded new commands")
-
-        elif aba != abas[self.operations_list[-1]]:
-            return_path = "Mapeamentos/" + f"{self.app.lower().strip()}/Ret/{abas[self.operations_list[-1]]}.txt"
-            self.commands.extend(self.file_manager.load_commands(action=return_path))
-            self.logger.info(f"Loaded return commands for {abas[self.operations_list[-1]]}")
-            self.commands.extend(self.file_manager.load_commands(action=nav_path))
-            self.commands.extend(self.file_manager.load_commands(action=act_path))
-            self.logger.info(f"Loaded new commands")
+            current = abas['base']
 
-        else:
-            self.commands.extend(self.file_manager.load_commands(action=act_path))
+        self.commands.extend(self.route_commands(current, aba, nav_path))
+        self.commands.extend(self.file_manager.load_commands(action=act_path))
+        self.logger.info(f"Loaded new commands")
 
         self.commands.extend([finish_command])
         if len(self.operations_list) >= 2:
@@ -587,7 +856,27 @@ class Robo:
             self.operations_list.append(operation)
 
         print(f"Command List: {self.commands}")
-        self.run()
+        return True
+
+    def route_commands(self, current: str, aba: str, nav_path: str) -> list[dict]:
+        """
+        Método responsável por montar os comandos que levam da aba atual até a aba da operação,
+        pela rota mais barata do grafo de navegação (NavigationGraph).
+        Sem rota conhecida, usa o caminho antigo: o Ret da aba atual seguido do Nav da aba da operação.
+        """
+        route = self.navigation_graph.route(current, aba)
+        if route is not None:
+            self.logger.info(f"Planned route from {current} to {aba} with {len(route)} steps")
+            return route
+        if current == aba:
+            return []
+        commands = []
+        if current != abas['base']:
+            return_path = f"Mapeamentos/{self.app.lower().strip()}/Ret/{current}.txt"
+            commands.extend(self.file_manager.load_commands(action=return_path))
+            self.logger.info(f"Loaded return commands for {current}")
+        commands.extend(self.file_manager.load_commands(action=nav_path))
+        return commands
 
     def on_overlay_closed(self):
         pass
@@ -596,9 +885,17 @@ class Robo:
         """
         Método responsável por invocar, para cada comando da lista de comandos, o método responsável pela a execução.
         """
-        for command in commands:
+        for step, command in enumerate(commands):
             action, position, value, condition = self.file_manager.read_command(command)
-            self.follow_command(position, action, value, condition)
+            edge = command.get('edge')
+            self.log_pipeline.set_context(step=step, edge=edge)
+            start = perf_counter()
+            failures = self.failure_count
+            self.follow_command(position, action, value, condition, command.get('verify'))
+            if self.failure_count != failures:
+                # O passo falhou e a fila já seguiu (nova tentativa ou próxima operação) dentro dele
+                return
+            self.navigation_graph.trace(edge, (perf_counter() - start) * 1000)
         if self.command_list:
             self.navigate(*self.commands)
             
@@ -606,7 +903,9 @@ class Robo:
         """
         Método responsável por invocar o método de navegação com os comandos passados como parâmetros.
         """
-        self.open_app()
+        if not self.open_app():
+            self.abort_operation(f"Could not open {self.app}")
+            return
         print("Starting Robot...")
         self.navigate(*self.commands)
         self.logger.info("Robot completed all operations. Exiting...")
@@ -0,0 +1,191 @@
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Any
+from datetime import datetime
+
+from Constants import LOG_DIR, LOG_BACKUP_DAYS, LOG_SAMPLE_EVERY
+
+# Campos estruturados copiados de cada registro para a linha JSON, quando presentes
+EVENT_FIELDS = ["app", "operation", "step", "edge", "event", "action", "elapsed_ms", "result", "polls", "suppressed"]
+
+
+class OperationContextFilter(logging.Filter):
+    """
+    Filtro responsável por anexar a cada registro o contexto da operação atual do robô (app, operação...).
+    O contexto é copiado para o registro no momento em que ele é criado, ainda na thread do robô,
+    então continua correto mesmo que a escrita aconteça depois, na thread do QueueListener.
+    """
+
+    def __init__(self, **context: Any):
+        super().__init__()
+        self.context: dict[str, Any] = dict(context)
+
+    def update(self, **context: Any) -> None:
+        self.context.update(context)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in self.context.items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Filtro responsável por amostrar eventos repetitivos (ex.: cada leitura de pixel enquanto se espera uma cor).
+    Registros com o atributo sample_key passam apenas na primeira ocorrência e depois uma a cada `every`;
+    o registro que passa leva em `suppressed` quantos foram descartados desde o anterior.
+    Registros sem sample_key não são afetados.
+    """
+
+    def __init__(self, every: int = LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = max(1, every)
+        self.counters: dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None:
+            return True
+        count = self.counters.get(key, 0)
+        self.counters[key] = count + 1
+        if count % self.every:
+            return False
+        record.suppressed = self.every - 1 if count else 0
+        return True
+
+    def reset(self) -> None:
+        self.counters.clear()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formatter responsável por escrever cada registro como uma linha JSON, com os campos de EVENT_FIELDS,
+    para que latências e resultados possam ser consultados direto do log, sem regex.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage()
+        }
+        for field in EVENT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        exception = getattr(record, "exception", None)
+        if exception is None and record.exc_info:
+            exception = self.formatException(record.exc_info)
+        if exception:
+            entry["exception"] = exception
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """
+    Formatter responsável pela saída de console: a mensagem e, se houver, o traceback guardado pelo RoboQueueHandler.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        exception = getattr(record, "exception", None)
+        return f"{text}\n{exception}" if exception else text
+
+
+class RoboQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler responsável por preparar o registro para a fila sem perder o traceback.
+    O QueueHandler padrão descarta exc_info (não serializável) e junta o traceback à mensagem; aqui o traceback
+    formatado vai para o atributo `exception`, e a mensagem fica só com o texto do registro.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exception = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
+
+
+def log_event(logger: logging.Logger, event: str, message: str = "", level: int = logging.INFO, **fields: Any) -> None:
+    """
+    Função responsável por registrar um evento estruturado (ex.: log_event(logger, "step", action="click", elapsed_ms=12)).
+    Passe sample_key para que o evento seja amostrado pelo SamplingFilter.
+    """
+    logger.log(level, message or event, extra={"event": event, **fields})
+
+
+class RoboLogPipeline:
+    """
+    Classe responsável por montar o pipeline de log assíncrono de um robô.
+
+    O logger do robô possui apenas um QueueHandler (RoboQueueHandler), que só enfileira o registro.
+    Um QueueListener, em uma thread própria, repassa os registros para o console e para um único
+    arquivo por robô, aberto uma vez e rotacionado à meia-noite. Nenhuma escrita em disco acontece na thread do robô.
+    O arquivo é escrito em JSON lines (JsonLinesFormatter); eventos repetitivos são amostrados antes mesmo de entrar na fila.
+    """
+
+    def __init__(self, app: str, logger_name: str, log_level: int = logging.INFO):
+        self.app = app
+        self.log_dir = os.path.join(LOG_DIR, app.capitalize())
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        self.context_filter = OperationContextFilter(app=app, operation="-")
+        self.sampling_filter = SamplingFilter()
+        self.queue: queue.Queue = queue.Queue(-1)
+
+        self.logger = logging.getLogger(logger_name)
+        self.logger.setLevel(log_level)
+        self.logger.propagate = False
+        if self.logger.hasHandlers():
+            self.logger.handlers.clear()
+        queue_handler = RoboQueueHandler(self.queue)
+        queue_handler.addFilter(self.sampling_filter)
+        queue_handler.addFilter(self.context_filter)
+        self.logger.addHandler(queue_handler)
+
+        # Console
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(log_level)
+        console_handler.setFormatter(ConsoleFormatter('%(message)s'))
+
+        # File
+        self.log_path = os.path.join(self.log_dir, f"{app.capitalize()}.jsonl")
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            self.log_path, when="midnight", backupCount=LOG_BACKUP_DAYS, encoding="utf-8", delay=True
+        )
+        file_handler.setLevel(log_level)
+        file_handler.setFormatter(JsonLinesFormatter())
+
+        self.listener = logging.handlers.QueueListener(self.queue, console_handler, file_handler, respect_handler_level=True)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+
+    def set_context(self, **context: Any) -> None:
+        """
+        Método responsável por atualizar os campos anexados aos próximos registros (ex.: operation="send_chips").
+        """
+        self.context_filter.update(**context)
+        if "operation" in context:
+            self.sampling_filter.reset()
+
+    def stop(self) -> None:
+        """
+        Método responsável por esvaziar a fila e encerrar a thread de escrita.
+        """
+        if self._running:
+            self._running = False
+            self.listener.stop()
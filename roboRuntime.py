@@ -0,0 +1,350 @@
+import json
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+import redis
+
+from ocrPool import PendingRead
+from roboLogging import log_event
+from Constants import RUNTIME_IO_WORKERS, RUNTIME_CONTROL_CHANNEL, STEP_SETTLE, COLOR_WAIT_POLLS, COLOR_POLL_INTERVAL
+
+# Mesmo Redis usado pelo broker do Celery
+REDIS_CLIENT = redis.Redis(host='localhost', port=6379, db=0)
+
+
+class RoboRuntime:
+    """
+    Classe responsável por conduzir os robôs de um processo em um loop asyncio, no lugar da cadeia síncrona
+    add_operation -> next_operation -> run -> export_action -> next_operation (RUNTIME_MODE = "async").
+
+    Tudo que usa mouse, teclado ou janelas roda no executor de entrada, uma única thread: os passos nunca se
+    misturam. Cada operação segura a vez do executor (gui_lease) do foco da janela até o último passo, inclusive
+    durante a espera pela cor de um passo 'color': o trabalho de GUI é totalmente serializado, uma operação por vez.
+    A espera pela cor, as leituras do OcrPool, o Redis e o envio ao webhook são awaitables que não ocupam a thread,
+    então o loop continua atendendo as mensagens de controle. Só a exportação roda fora da vez: enquanto um robô
+    exporta, outro robô do mesmo processo já segue com a sua operação (cada robô tem a sua Question); o fim da
+    exportação, que retira a operação da fila, espera a vez como os demais passos.
+
+    O loop também atende mensagens de controle ({"type": "pause" | "resume" | "stop" | "status", ...}), por post()
+    ou pelo canal Redis RUNTIME_CONTROL_CHANNEL, mesmo enquanto os robôs esperam a tela:
+        * pause: nenhum novo passo de entrada começa até o resume;
+        * resume: libera os passos; com "app", volta a conduzir um robô parado;
+        * stop: com "app", o robô para depois da operação atual (a fila é mantida);
+        * status: estado dos robôs e tamanho das filas.
+    Mensagens do canal Redis com "reply_to" recebem a resposta (JSON) nessa lista.
+    """
+
+    _shared: Optional["RoboRuntime"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, io_workers: int = RUNTIME_IO_WORKERS, client: Optional[redis.Redis] = None,
+                 channel: str = RUNTIME_CONTROL_CHANNEL):
+        self.loop = asyncio.new_event_loop()
+        self.gui_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="RoboRuntime-gui")
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="RoboRuntime-io")
+        self.client = client if client is not None else REDIS_CLIENT
+        self.channel = channel
+        self.robots: dict[str, Any] = {}
+        self.drivers: dict[str, asyncio.Task] = {}
+        self.standby_tasks: dict[str, asyncio.Task] = {}
+        self.stopped: set[str] = set()
+        self.incoming = 0  # Operações recebidas que ainda não entraram na fila do robô
+        self.handlers: dict[str, Callable[[dict], Any]] = {
+            "pause": self.pause, "resume": self.resume, "stop": self.stop_robot, "status": self.status}
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def shared(cls) -> "RoboRuntime":
+        """
+        Método responsável por devolver o runtime único do processo, iniciando o loop na primeira chamada.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+                cls._shared.start()
+            return cls._shared
+
+    def start(self) -> None:
+        """
+        Método responsável por iniciar a thread do loop asyncio.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="RoboRuntime", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.running = asyncio.Event()
+        self.running.set()
+        self.gui_lease = asyncio.Lock()
+        if self.channel:
+            self.loop.create_task(self._listen())
+        self._ready.set()
+        self.loop.run_forever()
+
+    def stop(self, timeout: float = 5) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread:
+            self._thread.join(timeout)
+        self.gui_executor.shutdown(wait=False, cancel_futures=True)
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+
+    # Awaitables
+
+    async def gui(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Método responsável por rodar um passo de entrada (mouse, teclado, janelas) no executor de entrada,
+        depois de esperar o fim de uma pausa.
+        """
+        await self.running.wait()
+        return await self.loop.run_in_executor(self.gui_executor, partial(fn, *args, **kwargs))
+
+    async def io(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Método responsável por rodar uma chamada bloqueante que não usa a entrada (captura de tela, Redis, HTTP).
+        """
+        return await self.loop.run_in_executor(self.io_executor, partial(fn, *args, **kwargs))
+
+    async def wait_for(self, check: Callable[[], bool], polls: int, interval: float) -> int:
+        """
+        Método responsável por conferir uma condição até `polls` vezes, com `interval` segundos entre as conferências.
+
+        :return: número da conferência em que a condição foi atendida, ou 0 se não foi
+        """
+        for poll in range(1, polls + 1):
+            if await self.io(check):
+                return poll
+            await asyncio.sleep(interval)
+        return 0
+
+    async def read(self, pending: PendingRead) -> tuple[str, float, list[dict]]:
+        """
+        Método responsável por esperar uma leitura do OcrPool sem bloquear o loop.
+        """
+        return await asyncio.wrap_future(pending.future)
+
+    # Condução dos robôs
+
+    def enqueue(self, robo, cmd) -> Future:
+        """
+        Método responsável por colocar uma operação na fila do robô e conduzi-lo, se ainda não estiver sendo conduzido.
+        Pode ser chamado de qualquer thread (ex.: a task da Celery); retorna assim que a operação entra na fila.
+        """
+        robo.runtime = self
+        return asyncio.run_coroutine_threadsafe(self._enqueue(robo, cmd), self.loop)
+
+    async def _enqueue(self, robo, cmd) -> None:
+        self.robots[robo.app] = robo
+        # A fila só é alterada no executor de entrada, junto com a escolha da próxima operação;
+        # enquanto isso, incoming interrompe a preparação de uma instância reserva que esteja ocupando o executor
+        self.incoming += 1
+        try:
+            await self.loop.run_in_executor(self.gui_executor, robo.command_list.push, cmd)
+        finally:
+            self.incoming -= 1
+        robo.logger.info(f"Adding operation: {cmd.question.attrs}")
+        self._ensure_driver(robo.app)
+
+    def _ensure_driver(self, app: str) -> None:
+        driver = self.drivers.get(app)
+        if app in self.robots and app not in self.stopped and (driver is None or driver.done()):
+            self.drivers[app] = self.loop.create_task(self.drive(self.robots[app]))
+
+    async def drive(self, robo) -> None:
+        """
+        Método responsável por executar as operações da fila do robô até ela esvaziar ou o robô ser parado.
+        Com a fila vazia, o robô ocioso prepara a sua instância reserva.
+        """
+        while robo.app not in self.stopped:
+            try:
+                async with self.gui_lease:
+                    await self.gui(self.focus, robo)
+                    robo.commands = []
+                    if not await self.gui(robo.prepare_operation):
+                        break
+                    if not await self.gui(robo.open_app):
+                        await self.gui(robo.abort_operation, f"Could not open {robo.app}")
+                        continue
+                    completed = await self.run_commands(robo)
+                if completed:
+                    await self.export(robo)
+            except Exception as e:
+                robo.logger.exception(f"Operation {robo.chosen_feature} failed: {e}")
+                await self.gui(robo.fail_operation)
+        if robo.app not in self.stopped:
+            # Em uma task à parte: uma operação que chegue durante a preparação ganha um novo condutor
+            self.standby_tasks[robo.app] = self.loop.create_task(self.prepare_standby(robo))
+
+    def busy(self) -> bool:
+        return self.incoming > 0 or any(robo.command_list for robo in self.robots.values())
+
+    async def prepare_standby(self, robo) -> None:
+        """
+        Método responsável por preparar a instância reserva do robô ocioso (RecoveryManager.prepare_standby).
+        O login usa mouse e teclado, então roda com a vez do executor de entrada; para não atrasar as operações,
+        só começa sem operações na fila e é interrompido, entre dois passos, assim que chega uma operação.
+        """
+        if not robo.recovery_manager.needs_standby() or self.busy():
+            return
+        async with self.gui_lease:
+            if self.busy():
+                return
+            try:
+                await self.gui(robo.recovery_manager.prepare_standby, self.busy)
+            except Exception as e:
+                robo.logger.error(f"Could not prepare standby instance: {e}")
+
+    def focus(self, robo) -> None:
+        """
+        Método responsável por trazer a janela do robô para frente e minimizar as dos outros robôs.
+        """
+        robo.window_manager.restore_n_focus_window()
+        for other in self.robots.values():
+            if other is not robo:
+                other.window_manager.minimize_window()
+
+    async def run_commands(self, robo) -> bool:
+        """
+        Método responsável por executar os passos da operação atual até o passo 'webhook'.
+
+        :return: False se a operação falhou (e já foi registrada por Robo.fail_operation)
+        """
+        for step, command in enumerate(list(robo.commands)):
+            action, position, value, condition = robo.file_manager.read_command(command)
+            if action == 'webhook':
+                return True
+            edge = command.get('edge')
+            robo.log_pipeline.set_context(step=step, edge=edge)
+            start = perf_counter()
+            if action == 'color':
+                found = await self.wait_color(robo, robo.step_position(position, action), value)
+                elapsed_ms = round((perf_counter() - start) * 1000, 1)
+                log_event(robo.logger, "step", f"Step {action} finished in {elapsed_ms} ms", action=action,
+                          elapsed_ms=elapsed_ms, result=found)
+                if not found:
+                    await self.gui(robo.fail_operation)
+                    return False
+            else:
+                await self.gui(robo.follow_command, position, action, value, condition, command.get('verify'), settle=False)
+                if robo.operation_failed:
+                    return False
+                await asyncio.sleep(STEP_SETTLE)
+            robo.navigation_graph.trace(edge, (perf_counter() - start) * 1000)
+        return True
+
+    async def wait_color(self, robo, position: tuple[int, int], expected_color: tuple[int, int, int]) -> bool:
+        """
+        Método responsável pela espera de um passo 'color': as leituras de cor rodam no executor de E/S e o
+        intervalo entre elas é um asyncio.sleep. A vez (gui_lease) continua com o robô, mas o loop segue atendendo
+        as mensagens de controle e as exportações em andamento.
+        """
+        robo.transparent_overlay.create_overlay(position[0], position[1], callback=robo.on_overlay_closed)
+        start = perf_counter()
+        poll = await self.wait_for(partial(robo.color_matches, position, expected_color), COLOR_WAIT_POLLS, COLOR_POLL_INTERVAL)
+        elapsed_ms = round((perf_counter() - start) * 1000, 1)
+        if poll:
+            log_event(robo.logger, "color_wait", f"Color detected within range after {poll} polls.",
+                      elapsed_ms=elapsed_ms, result=True, polls=poll)
+        else:
+            log_event(robo.logger, "color_wait", f"Color not detected within range after {COLOR_WAIT_POLLS} attempts.",
+                      level=logging.WARNING, elapsed_ms=elapsed_ms, result=False, polls=COLOR_WAIT_POLLS)
+        return bool(poll)
+
+    async def export(self, robo) -> None:
+        """
+        Método responsável por exportar a operação concluída fora da vez do executor de entrada:
+        espera as leituras pendentes do OcrPool, envia o resultado e só então retira a operação da fila.
+        A retirada (close_operation) volta a pedir a vez, pois pode mexer em janelas (instância reserva).
+        """
+        pending = [v for value in list(robo.questions.attrs.values())
+                   for v in (value if isinstance(value, list) else [value]) if isinstance(v, PendingRead)]
+        # Falhas de leitura são registradas por Robo.resolve_read dentro de finish_operation
+        await asyncio.gather(*(self.read(p) for p in pending), return_exceptions=True)
+        await self.io(robo.finish_operation)
+        async with self.gui_lease:
+            await self.gui(robo.close_operation)
+
+    # Mensagens de controle
+
+    def on(self, kind: str, handler: Callable[[dict], Any]) -> None:
+        """
+        Método responsável por registrar o tratamento de um tipo de mensagem de controle (pode ser uma corrotina).
+        """
+        self.handlers[kind] = handler
+
+    def post(self, message: dict) -> Future:
+        """
+        Método responsável por enviar uma mensagem de controle ao loop, de qualquer thread.
+
+        :return: Future com a resposta do tratamento da mensagem
+        """
+        return asyncio.run_coroutine_threadsafe(self.handle(message), self.loop)
+
+    async def handle(self, message: dict) -> Any:
+        handler = self.handlers.get(message.get("type"))
+        if handler is None:
+            raise ValueError(f"Mensagem de controle desconhecida: {message.get('type')}")
+        result = handler(message)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    def pause(self, message: dict) -> dict:
+        self.running.clear()
+        return self.status(message)
+
+    def resume(self, message: dict) -> dict:
+        app = message.get("app")
+        if app:
+            self.stopped.discard(app)
+            self._ensure_driver(app)
+        else:
+            self.running.set()
+        return self.status(message)
+
+    def stop_robot(self, message: dict) -> dict:
+        self.stopped.add(message["app"])
+        return self.status(message)
+
+    def status(self, message: dict) -> dict:
+        return {
+            "paused": not self.running.is_set(),
+            "robots": {app: {"driving": app in self.drivers and not self.drivers[app].done(),
+                             "stopped": app in self.stopped,
+                             "queued": len(robo.command_list)}
+                       for app, robo in self.robots.items()},
+        }
+
+    async def _listen(self) -> None:
+        """
+        Método responsável por atender as mensagens de controle publicadas no canal Redis.
+        A espera por mensagens ocupa uma das threads do executor de E/S.
+        """
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        while True:
+            try:
+                if not pubsub.subscribed:
+                    await self.io(pubsub.subscribe, self.channel)
+                raw = await self.io(pubsub.get_message, timeout=1.0)
+            except redis.RedisError as e:
+                print(f"Erro ao ler o canal de controle {self.channel}: {e}")
+                await asyncio.sleep(5)
+                continue
+            if raw is None:
+                continue
+            try:
+                message = json.loads(raw["data"])
+                result = await self.handle(message)
+            except Exception as e:
+                print(f"Mensagem de controle ignorada ({raw.get('data')}): {e}")
+                continue
+            if message.get("reply_to"):
+                await self.io(self.client.rpush, message["reply_to"], json.dumps(result, default=str))
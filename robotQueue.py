@@ -0,0 +1,173 @@
+import heapq
+import random
+import itertools
+import threading
+from time import monotonic
+from typing import Optional, Sequence
+
+from Constants import abas, actions_priorities, AFFINITY_WINDOW, AFFINITY_MAX_SKIPS, PRIORITY_AGING_SECONDS
+
+
+class AffinityScheduler:
+    """
+    Classe responsável por escolher a próxima operação da fila do robô levando em conta a aba atual.
+
+    A ordem da fila (CommandQueue) é mantida, com três exceções:
+    * só as AFFINITY_WINDOW primeiras operações podem ser adiantadas;
+    * dentro dessa janela, só concorrem as operações do mesmo nível de prioridade da primeira (actions_priorities);
+    * entre elas, a mais antiga que use a aba atual (Constants.abas) é escolhida, evitando um Ret + Nav.
+    Para não deixar operações esperando para sempre, uma operação passada para trás AFFINITY_MAX_SKIPS vezes
+    é escolhida na próxima vez, independente da aba.
+    """
+
+    def __init__(self, window: int = AFFINITY_WINDOW, max_skips: int = AFFINITY_MAX_SKIPS):
+        self.window = max(1, window)
+        self.max_skips = max_skips
+        self.skips: dict[int, int] = {}
+
+    @staticmethod
+    def action_of(cmd) -> str:
+        return getattr(cmd, 'Action')
+
+    def select(self, queue: Sequence, current_aba: Optional[str]) -> int:
+        """
+        Método responsável por dizer qual operação da fila deve ser executada agora.
+
+        :param queue: operações pendentes, na ordem da fila
+        :param current_aba: aba em que o robô está (None se desconhecida)
+        :return: índice da operação escolhida
+        """
+        if not queue:
+            raise IndexError("select() chamado com a fila vazia.")
+        self.skips = {id(cmd): self.skips.get(id(cmd), 0) for cmd in queue}
+        window = list(queue[:self.window])
+        level = actions_priorities.get(self.action_of(window[0]), 0)
+        candidates = [i for i, cmd in enumerate(window) if actions_priorities.get(self.action_of(cmd), 0) == level]
+
+        chosen = candidates[0]
+        starving = [i for i in candidates if self.skips[id(window[i])] >= self.max_skips]
+        if starving:
+            chosen = starving[0]
+        elif current_aba is not None:
+            chosen = next((i for i in candidates if abas.get(self.action_of(window[i])) == current_aba), chosen)
+
+        for cmd in window[:chosen]:
+            self.skips[id(cmd)] += 1
+        self.skips.pop(id(window[chosen]), None)
+        return chosen
+
+
+class CommandQueue:
+    """
+    Classe responsável pela fila de operações de um robô: um heap de prioridades com envelhecimento.
+
+    A prioridade de cada operação vem de actions_priorities (0 é a mais alta). Cada PRIORITY_AGING_SECONDS de espera
+    valem um nível de prioridade, então uma operação de baixa prioridade acaba passando à frente das mais novas.
+    Como todas envelhecem no mesmo ritmo, a ordem é fixa no momento da inserção: a chave do heap é
+    prioridade * PRIORITY_AGING_SECONDS + instante de chegada.
+
+    A operação em execução (current) fica fora do heap até terminar; a escolha da próxima só acontece entre
+    operações (start), que é o único ponto seguro de preempção: um send_chips urgente passa à frente das demais
+    operações pendentes, mas não interrompe uma operação já iniciada.
+    """
+
+    def __init__(self, aging_seconds: float = PRIORITY_AGING_SECONDS):
+        self.aging_seconds = aging_seconds
+        self.heap: list[tuple[float, int, object]] = []
+        self.current = None
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def push(self, cmd, priority: Optional[int] = None) -> None:
+        """
+        Método responsável por enfileirar uma operação.
+
+        :param priority: prioridade explícita; por padrão, a da ação em actions_priorities
+        """
+        if priority is None:
+            priority = actions_priorities.get(AffinityScheduler.action_of(cmd), 0)
+        with self.lock:
+            heapq.heappush(self.heap, (priority * self.aging_seconds + monotonic(), next(self.counter), cmd))
+
+    def ordered(self, limit: Optional[int] = None) -> list:
+        """
+        Método responsável por listar as operações pendentes na ordem em que seriam executadas.
+        """
+        with self.lock:
+            entries = heapq.nsmallest(limit, self.heap) if limit is not None else sorted(self.heap)
+        return [cmd for _, _, cmd in entries]
+
+    def start(self, scheduler: Optional[AffinityScheduler] = None, current_aba: Optional[str] = None):
+        """
+        Método responsável por escolher a próxima operação e marcá-la como a operação em execução.
+        Se já houver uma operação em execução (ex.: sendo refeita), ela é mantida.
+        Com um scheduler, a escolha considera a aba atual dentro da janela de reordenação.
+        """
+        if self.current is not None:
+            return self.current
+        window = self.ordered(scheduler.window if scheduler else 1)
+        if not window:
+            return None
+        cmd = window[scheduler.select(window, current_aba)] if scheduler else window[0]
+        with self.lock:
+            self.heap = [entry for entry in self.heap if entry[2] is not cmd]
+            heapq.heapify(self.heap)
+        self.current = cmd
+        return cmd
+
+    def finish(self):
+        """
+        Método responsável por encerrar a operação em execução (concluída ou abandonada) e devolvê-la.
+        """
+        cmd, self.current = self.current, None
+        return cmd
+
+    def __len__(self) -> int:
+        return len(self.heap) + (self.current is not None)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+class _SimulatedCommand:
+    def __init__(self, action: str):
+        self.Action = action
+
+
+def simulate(actions: list[str], app: str = "supremapoker", scheduler: Optional[AffinityScheduler] = None) -> dict[str, int]:
+    """
+    Função responsável por executar uma fila de operações sem o aplicativo, contando trocas de aba e passos de navegação.
+    As operações passam por uma CommandQueue, como no robô; sem scheduler, a ordem é apenas a da fila de prioridades.
+    Os passos são os das rotas do NavigationGraph do app; rotas sem mapeamento contam apenas como troca de aba.
+    """
+    from navigationGraph import NavigationGraph
+
+    graph = NavigationGraph(app)
+    queue = CommandQueue()
+    for action in actions:
+        queue.push(_SimulatedCommand(action))
+    current = abas['base']
+    switches = steps = 0
+    while queue:
+        target = abas[queue.start(scheduler, current).Action]
+        queue.finish()
+        if target != current:
+            switches += 1
+            steps += len(graph.route(current, target) or [])
+            current = target
+    return {"switches": switches, "navigation_steps": steps}
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    mixed = ['balance', 'send_chips', 'receive_chips', 'club_stats', 'transaction']
+    workloads = {
+        "alternating": ['balance', 'club_stats'] * 10,
+        "mixed": [random.choice(mixed) for _ in range(40)],
+        "queries": [random.choice(['balance', 'club_stats']) for _ in range(40)]
+    }
+    for name, actions in workloads.items():
+        fifo = simulate(actions)
+        affinity = simulate(actions, scheduler=AffinityScheduler())
+        print(f"{name}: FIFO {fifo} | afinidade {affinity} | "
+              f"passos economizados: {fifo['navigation_steps'] - affinity['navigation_steps']}")
@@ -0,0 +1,148 @@
+import threading
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import win32con
+import win32gui
+import win32ui
+
+from Constants import CAPTURE_GRID_SCALE
+
+region = tuple[int, int, int, int]  # (left, top, width, height), como em pyautogui.screenshot
+
+
+def _grab(box: region) -> np.ndarray:
+    """
+    Função responsável por copiar da tela só a região pedida (BitBlt do DC da tela para um bitmap do tamanho da região).
+    As coordenadas são as da área de trabalho virtual, então monitores à esquerda ou acima do principal também valem.
+    Sem CAPTUREBLT: as janelas em camadas (a sobreposição do robô) ficam de fora, como em pyautogui.pixel.
+
+    :return: pixels RGB da região, com forma (altura, largura, 3)
+    """
+    left, top, width, height = box
+    screen_dc = win32gui.GetWindowDC(0)
+    source = win32ui.CreateDCFromHandle(screen_dc)
+    memory = source.CreateCompatibleDC()
+    bitmap = win32ui.CreateBitmap()
+    try:
+        bitmap.CreateCompatibleBitmap(source, width, height)
+        memory.SelectObject(bitmap)
+        memory.BitBlt((0, 0), (width, height), source, (left, top), win32con.SRCCOPY)
+        bgra = np.frombuffer(bitmap.GetBitmapBits(True), dtype=np.uint8).reshape(height, width, 4)
+    finally:
+        memory.DeleteDC()
+        source.DeleteDC()
+        win32gui.ReleaseDC(0, screen_dc)
+        win32gui.DeleteObject(bitmap.GetHandle())
+    return bgra[:, :, 2::-1]
+
+
+class ScreenCapture:
+    """
+    Classe responsável por capturar apenas a parte da tela que um passo precisa (a área cliente da janela, a união
+    das regiões do passo ou a vizinhança de um pixel). No Windows, ImageGrab.grab e pyautogui.screenshot copiam a
+    área de trabalho inteira e depois recortam; aqui só a região é copiada da tela (_grab).
+
+    Os pixels capturados são copiados para um buffer NumPy que é reaproveitado entre as capturas e só cresce quando
+    uma região maior é pedida, então as consultas repetidas (polling de cor) não criam uma imagem PIL por vez.
+    As cores podem ser lidas do pixel exato ou de uma grade reduzida (média de blocos de scale x scale pixels), que
+    tolera deslocamentos de um pixel e ruído de renderização.
+    """
+
+    _shared: Optional["ScreenCapture"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, grab: Optional[Callable[[region], np.ndarray]] = None, scale: int = CAPTURE_GRID_SCALE):
+        self.grab = grab if grab is not None else _grab
+        self.scale = max(1, int(scale))
+        self.buffer = np.zeros((0, 0, 3), dtype=np.uint8)
+        self.box: region = (0, 0, 0, 0)
+        self._grid: Optional[np.ndarray] = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "ScreenCapture":
+        """
+        Método responsável por devolver a captura única do processo (um buffer para todos os robôs do worker).
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def union(boxes: Iterable[region]) -> Optional[region]:
+        """
+        Método responsável por calcular a menor região que contém todas as regiões recebidas.
+        """
+        boxes = [b for b in boxes if b[2] > 0 and b[3] > 0]
+        if not boxes:
+            return None
+        left, top = min(b[0] for b in boxes), min(b[1] for b in boxes)
+        right, bottom = max(b[0] + b[2] for b in boxes), max(b[1] + b[3] for b in boxes)
+        return left, top, right - left, bottom - top
+
+    def capture(self, box: region) -> np.ndarray:
+        """
+        Método responsável por capturar uma região da tela para o buffer.
+
+        :return: visão (sem cópia) do buffer com os pixels RGB da região; vale até a próxima captura
+        """
+        pixels = self.grab(box)
+        height, width = pixels.shape[:2]
+        if self.buffer.shape[0] < height or self.buffer.shape[1] < width:
+            self.buffer = np.zeros((max(height, self.buffer.shape[0]), max(width, self.buffer.shape[1]), 3), dtype=np.uint8)
+        frame = self.buffer[:height, :width]
+        np.copyto(frame, pixels[:, :, :3])
+        self.box = (box[0], box[1], width, height)
+        self._grid = None
+        return frame
+
+    def capture_regions(self, boxes: Iterable[region]) -> Optional[np.ndarray]:
+        box = self.union(boxes)
+        return self.capture(box) if box is not None else None
+
+    @property
+    def frame(self) -> np.ndarray:
+        return self.buffer[:self.box[3], :self.box[2]]
+
+    def grid(self) -> np.ndarray:
+        """
+        Método responsável por devolver a grade reduzida da última captura (média de cada bloco de scale x scale).
+        As bordas que não completam um bloco ficam de fora.
+        """
+        if self._grid is None:
+            s = self.scale
+            rows, cols = self.box[3] // s, self.box[2] // s
+            blocks = self.frame[:rows * s, :cols * s].reshape(rows, s, cols, s, 3)
+            self._grid = blocks.mean(axis=(1, 3))
+        return self._grid
+
+    def contains(self, position: tuple[int, int]) -> bool:
+        left, top, width, height = self.box
+        return left <= position[0] < left + width and top <= position[1] < top + height
+
+    def pixel(self, position: tuple[int, int], downscaled: bool = False) -> tuple[int, int, int]:
+        """
+        Método responsável por ler a cor de uma posição absoluta da última captura.
+
+        :param downscaled: lê a média do bloco da grade reduzida que contém a posição, no lugar do pixel exato
+        """
+        x, y = position[0] - self.box[0], position[1] - self.box[1]
+        if downscaled and self.scale > 1:
+            grid = self.grid()
+            if grid.size:
+                row = min(y // self.scale, grid.shape[0] - 1)
+                col = min(x // self.scale, grid.shape[1] - 1)
+                return tuple(int(round(v)) for v in grid[row, col])
+        return tuple(int(v) for v in self.frame[y, x])
+
+    def color(self, position: tuple[int, int]) -> tuple[int, int, int]:
+        """
+        Método responsável por capturar e ler a cor de um único ponto, substituindo pyautogui.pixel.
+        Com a grade reduzida ligada (scale > 1), captura só o bloco de scale x scale em volta do ponto e lê a média dele.
+        """
+        with self.lock:
+            s = self.scale
+            self.capture((position[0] - s // 2, position[1] - s // 2, s, s))
+            return self.pixel(position, downscaled=s > 1)
@@ -0,0 +1,113 @@
+import glob
+import time
+from typing import Optional
+
+from utils import FileManager, color_in_range
+from windowRegistry import WindowInfo
+from launchSupervisor import fingerprint
+from recoveryManager import RecoveryManager
+from screenCapture import ScreenCapture
+from Constants import screen_fingerprints, abas, SCREEN_FINGERPRINT_MIN_PIXELS, SCREEN_FINGERPRINT_POSITION_TOLERANCE, \
+    SCREEN_CONFIRM_DELAY
+
+
+class ScreenStateClassifier:
+    """
+    Classe responsável por identificar em qual aba o aplicativo está, a partir de uma única captura da janela.
+
+    Cada aba possui uma impressão digital (lista de pixels e cores esperadas), obtida de screen_fingerprints
+    (Constants.py) ou, na falta dela, dos próprios mapeamentos:
+    * a aba inicial (abas['base']) usa a impressão digital da tela inicial logada (RecoveryManager.home_fingerprint);
+    * as demais usam os passos 'color' que conferem a própria aba: os do início do Ret (antes do primeiro clique)
+      e os do fim do Nav (depois do último clique).
+    Pixels que também aparecem em outro mapeamento do app (mesma posição e cor, ex.: fundos pretos) são descartados,
+    e só abas com pelo menos SCREEN_FINGERPRINT_MIN_PIXELS pixels distintos são reconhecidas: um pixel isolado
+    reconheceria a aba errada e pularia o login ou a navegação necessária.
+    A captura cobre só a união dos pixels das impressões digitais, e não a janela inteira.
+    """
+
+    def __init__(self, app: str, capture: Optional[ScreenCapture] = None):
+        self.app = app
+        self.fingerprints: dict[str, fingerprint] = self.load_fingerprints(app)
+        self.capture = capture if capture is not None else ScreenCapture()
+
+    @staticmethod
+    def _colors(path: str) -> list[list[tuple[tuple, tuple]]]:
+        """
+        Método responsável por separar os passos 'color' de um mapeamento pelos cliques entre eles.
+
+        :return: um grupo de pixels por tela percorrida (o primeiro antes do primeiro clique, o último depois do último)
+        """
+        groups: list[list[tuple[tuple, tuple]]] = [[]]
+        for command in FileManager(path).load_commands(action=path):
+            if command.get('action') == 'color':
+                groups[-1].append((tuple(command['position']), tuple(command['value'])))
+            elif command.get('action') == 'click':
+                groups.append([])
+        return groups
+
+    @staticmethod
+    def _same_pixel(a: tuple[tuple, tuple], b: tuple[tuple, tuple]) -> bool:
+        return all(abs(a[0][i] - b[0][i]) <= SCREEN_FINGERPRINT_POSITION_TOLERANCE for i in range(2)) and \
+            color_in_range(a[1], b[1])
+
+    @classmethod
+    def load_fingerprints(cls, app: str) -> dict[str, fingerprint]:
+        """
+        Método responsável por montar a impressão digital de cada aba do aplicativo.
+        Abas sem pixels distintos suficientes ficam de fora e nunca são reconhecidas.
+        """
+        app_dir = f"Mapeamentos/{app.lower().strip()}"
+        home = abas['base']
+        result: dict[str, fingerprint] = {home: RecoveryManager.home_fingerprint(app)}
+        mappings = {path: cls._colors(path) for path in glob.glob(f"{app_dir}/*/*.txt")}
+        for aba in set(abas.values()) - {home}:
+            ret_path, nav_path = f"{app_dir}/Ret/{aba}.txt", f"{app_dir}/Nav/{aba}.txt"
+            ret_groups, nav_groups = mappings.get(ret_path) or [[]], mappings.get(nav_path) or [[]]
+            # Só depois do último clique do Nav a aba está aberta; um Nav sem cliques confere apenas a aba de origem
+            own = ret_groups[0] + (nav_groups[-1] if len(nav_groups) > 1 else [])
+            foreign = [pixel for path, groups in mappings.items() if path not in (ret_path, nav_path)
+                       for group in groups for pixel in group]
+            pixels: fingerprint = []
+            for pixel in own:
+                if any(cls._same_pixel(pixel, kept) for kept in pixels) or any(cls._same_pixel(pixel, f) for f in foreign):
+                    continue
+                pixels.append(pixel)
+            result[aba] = pixels
+        result.update(screen_fingerprints.get(app.lower(), {}))
+        return {aba: pixels for aba, pixels in result.items() if len(pixels) >= SCREEN_FINGERPRINT_MIN_PIXELS}
+
+    def classify(self, info: Optional[WindowInfo]) -> Optional[str]:
+        """
+        Método responsável por dizer em qual aba o aplicativo está.
+
+        :param info: janela do aplicativo (WindowRegistry.get)
+        :return: aba reconhecida ou None se nenhuma impressão digital corresponder (ou se a janela não estiver visível).
+            Se mais de uma aba corresponder, vence a que tiver mais pixels conferidos; empate é tratado como desconhecido.
+        """
+        if not info or not info.width or not info.height or not self.fingerprints:
+            return None
+        points = {position: self._absolute(info, position) for pixels in self.fingerprints.values() for position, _ in pixels}
+        self.capture.capture_regions((x, y, 1, 1) for x, y in points.values())
+        best, best_size, tied = None, 0, False
+        for aba, pixels in self.fingerprints.items():
+            if len(pixels) < best_size:
+                continue
+            if all(color_in_range(self.capture.pixel(points[position]), expected) for position, expected in pixels):
+                tied = len(pixels) == best_size
+                best, best_size = aba, len(pixels)
+        return None if tied else best
+
+    def confirm(self, info: Optional[WindowInfo], aba: str) -> bool:
+        """
+        Método responsável por conferir a aba reconhecida com uma segunda captura, antes de pular o login ou a navegação.
+        Uma tela em transição (animação, carregamento) raramente corresponde duas vezes à mesma impressão digital.
+        """
+        time.sleep(SCREEN_CONFIRM_DELAY)
+        return self.classify(info) == aba
+
+    @staticmethod
+    def _absolute(info: WindowInfo, position: tuple[float, float]) -> tuple[int, int]:
+        x = min(int(position[0] * info.width), info.width - 1)
+        y = min(int(position[1] * info.height), info.height - 1)
+        return info.client_left + x, info.client_top + y
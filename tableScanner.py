@@ -0,0 +1,116 @@
+import hashlib
+from typing import Optional, Callable
+
+import numpy as np
+import pyautogui
+
+from Constants import SCROLL_MAX_PAGES, SCROLL_UNCHANGED_THRESHOLD, SCROLL_ALIGN_THRESHOLD, relativeArea
+
+pixelArea = tuple[int, int, int, int]
+
+
+class TableScanner:
+    """
+    Classe responsável por percorrer uma lista rolável lendo cada linha uma única vez.
+
+    A cada página, a região da lista é capturada uma vez. O deslocamento entre a captura atual e a anterior é
+    estimado alinhando os perfis das linhas de pixels (média de cada linha em algumas faixas de colunas), então só
+    as linhas que entraram na tela são processadas; as que já estavam visíveis apenas subiram.
+    Além disso, cada linha é identificada pelo hash do seu conteúdo: uma linha nova igual a uma linha da página
+    anterior não é reprocessada, mesmo quando o alinhamento falha. A comparação é só com a página anterior, para que
+    linhas legitimamente iguais (ex.: duas transações idênticas) distantes na lista continuem sendo lidas.
+    A varredura termina quando uma rolagem não muda mais a captura (fim da lista).
+    """
+
+    def __init__(self, window_manager, rows: list[relativeArea], grab: Optional[Callable] = None,
+                 max_pages: int = SCROLL_MAX_PAGES):
+        """
+        :param window_manager: WindowManager do robô, usado para converter as posições relativas
+        :param rows: áreas das linhas visíveis da lista (a primeira e as âncoras), de cima para baixo
+        :param grab: função que captura uma região (x, y, largura, altura); por padrão, pyautogui.screenshot
+        """
+        self.rows = rows
+        self.max_pages = max_pages
+        self.grab = grab if grab is not None else (lambda region: pyautogui.screenshot(region=region))
+
+        boxes = []
+        for area in rows:
+            (x1, y1), (x2, y2) = (window_manager.get_absolute_position(p) for p in area)
+            boxes.append((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+        left, top = min(b[0] for b in boxes), min(b[1] for b in boxes)
+        right, bottom = max(b[2] for b in boxes), max(b[3] for b in boxes)
+        self.region = (left, top, max(1, right - left), max(1, bottom - top))
+        # Linhas em coordenadas da região capturada
+        self.row_boxes: list[pixelArea] = [(b[0] - left, b[1] - top, b[2] - left, b[3] - top) for b in boxes]
+        self.pages = 0
+        self.processed = 0
+
+    def capture(self) -> np.ndarray:
+        return np.asarray(self.grab(self.region).convert("L"), dtype=np.float32)
+
+    @staticmethod
+    def profile(frame: np.ndarray, strips: int = 16) -> np.ndarray:
+        """
+        Perfil vertical da captura: para cada linha de pixels, a média de cada faixa de colunas.
+        """
+        strips = max(1, min(strips, frame.shape[1]))
+        return np.stack([part.mean(axis=1) for part in np.array_split(frame, strips, axis=1)], axis=1)
+
+    @staticmethod
+    def unchanged(previous: np.ndarray, current: np.ndarray) -> bool:
+        return np.abs(previous - current).mean() < SCROLL_UNCHANGED_THRESHOLD
+
+    @classmethod
+    def offset(cls, previous: np.ndarray, current: np.ndarray) -> Optional[int]:
+        """
+        Método responsável por estimar quantos pixels o conteúdo subiu entre duas capturas.
+
+        :return: 0 se a captura não mudou; None se não houver sobreposição (conteúdo totalmente novo);
+            o deslocamento em pixels nos demais casos
+        """
+        if cls.unchanged(previous, current):
+            return 0
+        prev_profile, curr_profile = cls.profile(previous), cls.profile(current)
+        height = prev_profile.shape[0]
+        min_overlap = max(1, height // 8)
+        best_shift, best_error = None, SCROLL_ALIGN_THRESHOLD
+        for shift in range(1, height - min_overlap + 1):
+            error = np.abs(prev_profile[shift:] - curr_profile[:height - shift]).mean()
+            if error < best_error:
+                best_shift, best_error = shift, error
+        return best_shift
+
+    @staticmethod
+    def row_hash(frame: np.ndarray, box: pixelArea) -> str:
+        # Quantiza os tons para que pequenas variações de renderização não mudem o hash
+        crop = frame[box[1]:box[3], box[0]:box[2]].astype(np.uint8) >> 4
+        return hashlib.sha1(crop.tobytes()).hexdigest()
+
+    def scan(self, process_row: Callable[[relativeArea], bool], scroll: Callable[[], None]) -> bool:
+        """
+        Método responsável por percorrer a lista.
+
+        :param process_row: chamada para cada linha nova, com a área relativa da linha; retornar True encerra a varredura
+        :param scroll: rola a lista uma página
+        :return: True se process_row encerrou a varredura, False se a lista terminou
+        """
+        previous, previous_hashes = None, set()
+        for self.pages in range(1, self.max_pages + 1):
+            frame = self.capture()
+            shift = None
+            if previous is not None:
+                shift = self.offset(previous, frame)
+                if shift == 0:
+                    return False
+            # Conteúdo que já estava visível ocupa agora as linhas [0, altura - shift) da captura
+            visible_before = frame.shape[0] - shift if shift else 0
+            hashes = [self.row_hash(frame, box) for box in self.row_boxes]
+            for area, box, key in zip(self.rows, self.row_boxes, hashes):
+                if box[3] <= visible_before or key in previous_hashes:
+                    continue
+                self.processed += 1
+                if process_row(area):
+                    return True
+            scroll()
+            previous, previous_hashes = frame, set(hashes)
+        return False
@@ -1,8 +1,9 @@
 from celery import Celery
 from kombu import Queue
 from utils import Comando
-from Constants import NUMERO_DE_FILAS_DE_PRIORIDADE_POR_ROBO, id_app_correspondence
+from Constants import NUMERO_DE_FILAS_DE_PRIORIDADE_POR_ROBO, id_app_correspondence, RUNTIME_MODE
 from robo import Robo
+from roboRuntime import RoboRuntime
 from dotenv import load_dotenv
 import os
 
@@ -53,6 +54,13 @@ def process_command(jsoned_comando: str) -> str:
     if not current_robo:
         return f"Erro: Aplicativo '{app_name}' não reconhecido."
 
+    bot_id = getattr(comando.question, 'BotId', 'BotId not found')
+
+    if RUNTIME_MODE == "async":
+        # O RoboRuntime foca a janela a cada operação; a task retorna assim que a operação entra na fila
+        RoboRuntime.shared().enqueue(current_robo, comando).result()
+        return f"Comando enfileirado para o app: {app_name} no bot: {bot_id}"
+
     ROBOS_POR_APP[app_name].window_manager.restore_n_focus_window()
     for robo in ROBOS_POR_APP.values():
         if robo != current_robo:
@@ -60,8 +68,6 @@ def process_command(jsoned_comando: str) -> str:
 
     current_robo.add_operation(comando)
 
-    bot_id = getattr(comando.question, 'BotId', 'BotId not found')
-
     return f"Processando o comando para o app: {app_name} no bot: {bot_id}"
 
 if __name__ == '__main__':
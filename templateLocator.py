@@ -0,0 +1,112 @@
+import os
+from typing import Optional
+
+import numpy as np
+import pyautogui
+from PIL import Image
+
+from Constants import LOCATE_SEARCH_RADIUS, LOCATE_MIN_SCORE, absolutePosition
+
+offset = tuple[int, int]
+
+
+def ncc(image: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """
+    Função responsável por calcular a correlação cruzada normalizada (NCC) do template em cada posição da imagem.
+    Retorna um mapa (altura - th + 1, largura - tw + 1) com valores entre -1 e 1; 1 é uma correspondência perfeita.
+    """
+    th, tw = template.shape
+    t = template - template.mean()
+    t_norm = np.sqrt((t ** 2).sum())
+    windows = np.lib.stride_tricks.sliding_window_view(image, (th, tw))
+    # Como t tem média zero, somar (janela * t) equivale a somar ((janela - média da janela) * t)
+    numerator = np.einsum('ijkl,kl->ij', windows, t)
+
+    # Soma e soma dos quadrados de cada janela por imagens integrais
+    def window_sums(values: np.ndarray) -> np.ndarray:
+        integral = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+        return integral[th:, tw:] - integral[:-th, tw:] - integral[th:, :-tw] + integral[:-th, :-tw]
+
+    n = th * tw
+    sums, squares = window_sums(image), window_sums(image ** 2)
+    variance = np.maximum(squares - sums ** 2 / n, 0)
+    denominator = np.sqrt(variance) * t_norm
+    return np.where(denominator > 1e-6, numerator / np.maximum(denominator, 1e-6), 0.0)
+
+
+class TemplateLocator:
+    """
+    Classe responsável por encontrar um elemento da interface que pode ter se deslocado alguns pixels.
+
+    O elemento é uma pequena imagem de referência em Mapeamentos/<app>/Tpl/<nome>.png. A busca acontece só em uma
+    janela de LOCATE_SEARCH_RADIUS pixels em volta da posição esperada, usando correlação cruzada normalizada,
+    o que a torna rápida e insensível a variações de brilho.
+    O deslocamento encontrado fica guardado por template (cada template pertence a uma tela): na próxima vez, a posição
+    já deslocada é conferida primeiro, e a busca na janela só é refeita se o elemento não estiver mais lá.
+    """
+
+    def __init__(self, app: str):
+        self.app = app
+        self.template_dir = f"Mapeamentos/{app.lower().strip()}/Tpl"
+        self.templates: dict[str, np.ndarray] = {}
+        self.offsets: dict[str, offset] = {}
+
+    @staticmethod
+    def _gray(image: Image.Image) -> np.ndarray:
+        return np.asarray(image.convert("L"), dtype=np.float64)
+
+    def template(self, name: str) -> Optional[np.ndarray]:
+        if name not in self.templates:
+            path = os.path.join(self.template_dir, f"{name}.png")
+            if not os.path.isfile(path):
+                return None
+            self.templates[name] = self._gray(Image.open(path))
+        return self.templates[name]
+
+    def save_template(self, name: str, center: absolutePosition, size: tuple[int, int]) -> str:
+        """
+        Método responsável por gravar, a partir da tela atual, a imagem de referência de um elemento (uso no mapeamento).
+        """
+        width, height = size
+        image = pyautogui.screenshot(region=(center[0] - width // 2, center[1] - height // 2, width, height))
+        os.makedirs(self.template_dir, exist_ok=True)
+        path = os.path.join(self.template_dir, f"{name}.png")
+        image.save(path)
+        self.templates[name] = self._gray(image)
+        return path
+
+    def _search(self, template: np.ndarray, center: absolutePosition, radius: int) -> tuple[float, offset]:
+        th, tw = template.shape
+        left, top = center[0] - tw // 2 - radius, center[1] - th // 2 - radius
+        window = self._gray(pyautogui.screenshot(region=(left, top, tw + 2 * radius, th + 2 * radius)))
+        scores = ncc(window, template)
+        y, x = np.unravel_index(np.argmax(scores), scores.shape)
+        return float(scores[y, x]), (int(x) - radius, int(y) - radius)
+
+    def locate(self, name: str, expected: absolutePosition, radius: int = LOCATE_SEARCH_RADIUS) -> Optional[offset]:
+        """
+        Método responsável por encontrar o elemento perto da posição esperada.
+
+        :param name: nome do template (Mapeamentos/<app>/Tpl/<nome>.png)
+        :param expected: posição absoluta em que o centro do elemento deveria estar
+        :return: deslocamento (dx, dy) entre a posição encontrada e a esperada, ou None se o elemento não foi encontrado
+        """
+        template = self.template(name)
+        if template is None:
+            return None
+
+        cached = self.offsets.get(name)
+        if cached is not None:
+            # Confere só a posição já conhecida (com 1 px de folga), sem varrer a janela inteira
+            score, delta = self._search(template, (expected[0] + cached[0], expected[1] + cached[1]), 1)
+            if score >= LOCATE_MIN_SCORE:
+                found = (cached[0] + delta[0], cached[1] + delta[1])
+                self.offsets[name] = found
+                return found
+
+        score, found = self._search(template, expected, radius)
+        if score < LOCATE_MIN_SCORE:
+            self.offsets.pop(name, None)
+            return None
+        self.offsets[name] = found
+        return found
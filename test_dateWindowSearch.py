@@ -0,0 +1,66 @@
+"""
+Testes da busca por data em listas ordenadas (dateWindowSearch.py) usando uma lista simulada.
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+sys.modules.setdefault('pynput', MagicMock())
+
+from dateWindowSearch import DateWindowSearch
+
+
+class FakeList:
+    """Lista de `pages` páginas em que a janela de datas termina na página `boundary`"""
+
+    def __init__(self, pages, boundary):
+        self.pages = pages
+        self.boundary = boundary
+        self.page = 0
+        self.scrolls = 0
+
+    def probe(self):
+        return self.page >= self.boundary
+
+    def scroll(self, pages):
+        self.scrolls += abs(pages)
+        target = max(0, min(self.page + pages, self.pages - 1))
+        moved = target != self.page
+        self.page = target
+        return moved
+
+
+class TestDateWindowSearch(TestCase):
+    """Testes para a busca exponencial seguida de busca binária"""
+
+    def test_finds_first_page_outside_window(self):
+        """A lista fica na primeira página em que a data passou da janela, com poucas leituras"""
+        for boundary in (1, 2, 5, 37, 100, 199):
+            fake = FakeList(pages=200, boundary=boundary)
+            search = DateWindowSearch(fake.probe, fake.scroll)
+            search.locate()
+            self.assertEqual(fake.page, boundary)
+            self.assertLessEqual(search.probes, 25)
+
+    def test_window_ends_on_first_page(self):
+        """Se a primeira página já passou da janela, nada é rolado"""
+        fake = FakeList(pages=10, boundary=0)
+        search = DateWindowSearch(fake.probe, fake.scroll)
+        self.assertEqual(search.locate(), 0)
+        self.assertEqual((fake.scrolls, search.probes), (0, 1))
+
+    def test_stops_at_end_of_list(self):
+        """Se a janela não termina na lista, a busca para no fim dela"""
+        fake = FakeList(pages=10, boundary=50)
+        DateWindowSearch(fake.probe, fake.scroll).locate()
+        self.assertEqual(fake.page, 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
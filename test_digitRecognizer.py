@@ -0,0 +1,75 @@
+"""
+Testes do reconhecimento de campos numéricos por templates de caracteres (digitRecognizer.py),
+usando áreas desenhadas em memória com a fonte padrão do Pillow.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pytesseract'):
+    sys.modules.setdefault(module, MagicMock())
+
+from digitRecognizer import DigitRecognizer
+from ocrProfiles import AMOUNT_CHARS
+
+
+def field(text):
+    """Campo no tema escuro dos apps, com moldura e texto claro; os caracteres têm um espaço entre si, como nos apps"""
+    image = Image.new("RGB", (130, 24), (0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 129, 23), outline=(30, 160, 60))
+    x = 10
+    for char in text:
+        draw.text((x, 6), char, fill=(235, 235, 235))
+        x += draw.textlength(char) + 2
+    return image
+
+
+TRAINING = ["1,234.50", "6,789.00", "-10.25", "3,456.78", "-9.01"]
+
+
+class TestDigitRecognizer(TestCase):
+    """Testes para o treino, a leitura e a recusa por confiança baixa"""
+
+    def setUp(self):
+        self.recognizer = DigitRecognizer("pppoker", path=os.path.join(tempfile.mkdtemp(), "glyphs.npz"))
+        self.recognizer.train((field(text), text) for text in TRAINING)
+
+    def test_reads_unseen_amounts(self):
+        """Valores que não estavam no treino são lidos com os templates de cada caractere"""
+        self.assertTrue(self.recognizer.covers(AMOUNT_CHARS))
+        for text in ("870.00", "1,591.00", "-1.00", "52,346.19"):
+            read, confidence = self.recognizer.recognize(field(text))
+            self.assertEqual(read, text)
+            self.assertGreaterEqual(confidence, 0.85)
+
+    def test_rejects_unknown_characters(self):
+        """Caracteres sem template baixam a confiança e a leitura é recusada (fica para o Tesseract)"""
+        read, confidence = self.recognizer.recognize(field("12:AB"))
+        self.assertIsNone(read)
+        self.assertLess(confidence, 0.85)
+        self.assertFalse(self.recognizer.covers("0123456789/-:"))
+
+    def test_save_and_load(self):
+        """Os templates salvos são carregados por um novo reconhecedor do mesmo app"""
+        self.recognizer.save()
+        loaded = DigitRecognizer("pppoker", path=self.recognizer.path)
+        self.assertEqual(loaded.chars, self.recognizer.chars)
+        self.assertEqual(loaded.recognize(field("4,321.00"))[0], "4,321.00")
+
+    def test_blank_field(self):
+        """Campo vazio não é lido"""
+        self.assertEqual(self.recognizer.recognize(Image.new("RGB", (60, 20)))[0], None)
+
+
+if __name__ == "__main__":
+    unittest.main()
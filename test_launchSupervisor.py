@@ -0,0 +1,119 @@
+"""
+Testes da abertura de aplicativos (launchSupervisor.py) com um provedor de janelas em memória e um processo falso.
+"""
+
+import os
+import sys
+import types
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+
+# Mock das dependências antes de importar
+fake_psutil_module = types.ModuleType('psutil')
+fake_psutil_module.Error = type('Error', (Exception,), {})
+fake_psutil_module.Process = MagicMock()
+sys.modules.setdefault('psutil', fake_psutil_module)
+for module in ('pynput', 'pygetwindow', 'win32gui', 'win32process', 'win32ui', 'win32con', 'pyautogui'):
+    sys.modules.setdefault(module, MagicMock())
+
+import launchSupervisor
+from launchSupervisor import LaunchSupervisor
+from windowRegistry import WindowRegistry
+from mock_windowRegistry import MockWindow, MockWindowProvider
+
+GREEN = (30, 92, 65)
+EXPECTED = [((0.5, 0.5), GREEN)]
+
+
+class FakeProcess:
+    def __init__(self, pid):
+        self.pid = pid
+        self.running = True
+        self.terminated = False
+
+    def is_running(self):
+        return self.running
+
+    def terminate(self):
+        self.terminated = True
+
+
+class TestLaunchSupervisor(TestCase):
+    """Testes para a abertura da instância ativa e da instância reserva"""
+
+    def setUp(self):
+        self.provider = MockWindowProvider()
+        self.active = self.provider.add(MockWindow("PPPoker", hwnd=10, rect=(100, 50, 500, 850)))
+        self.registry = WindowRegistry(provider=self.provider)
+        self.pixel = (0, 0, 0)
+        self.supervisor = LaunchSupervisor(registry=self.registry, pixel_reader=lambda x, y: self.pixel)
+        self.processes = {}
+        patchers = [
+            patch.object(launchSupervisor.psutil, 'Process', side_effect=self.process),
+            patch.object(launchSupervisor, 'LAUNCH_POLL_INTERVAL', 0.01),
+            patch.object(launchSupervisor.os.path, 'exists', return_value=True),
+            patch.object(launchSupervisor.subprocess, 'Popen', side_effect=self.open_standby),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def process(self, pid):
+        return self.processes.setdefault(pid, FakeProcess(pid))
+
+    def open_standby(self, *args, **kwargs):
+        self.standby = self.provider.add(MockWindow("PPPoker", hwnd=20, rect=(0, 0, 400, 800)))
+        self.standby.close = MagicMock()
+
+    def test_open_app_is_watched(self):
+        """Com o app já aberto, a janela registrada é devolvida e o seu processo passa a ser acompanhado"""
+        info = self.supervisor.launch("pppoker.lnk", "pppoker", expected=EXPECTED)
+        self.assertEqual(info.hwnd, 10)
+        self.assertEqual(self.supervisor.process.pid, self.active.pid)
+        self.assertTrue(self.supervisor.is_alive())
+        launchSupervisor.subprocess.Popen.assert_not_called()
+
+    def test_new_instance_keeps_the_active_process(self):
+        """A reserva pronta fica fora das consultas por título e não substitui o processo acompanhado"""
+        self.supervisor.launch("pppoker.lnk", "pppoker", expected=EXPECTED)
+        self.pixel = GREEN
+        info = self.supervisor.launch("pppoker.lnk", "pppoker", expected=EXPECTED, new_instance=True)
+        self.assertEqual(info.hwnd, 20)
+        self.assertIn(20, self.registry.reserved)
+        self.assertEqual(self.registry.get("pppoker").hwnd, 10)
+        self.assertEqual(self.supervisor.process.pid, self.active.pid)
+
+    def test_new_instance_timeout_closes_it(self):
+        """Se a reserva não chega à tela inicial, a janela é fechada, o processo encerrado e o handle liberado"""
+        self.supervisor.launch("pppoker.lnk", "pppoker", expected=EXPECTED)
+        with self.assertRaises(TimeoutError):
+            self.supervisor.launch("pppoker.lnk", "pppoker", expected=EXPECTED, timeout=0.1, new_instance=True)
+        self.standby.close.assert_called_once()
+        self.assertTrue(self.processes[self.standby.pid].terminated)
+        self.assertFalse(self.processes[self.active.pid].terminated)
+        self.assertNotIn(20, self.registry.reserved)
+
+    def test_cancelled_launch_closes_new_instance(self):
+        """Cancelada depois de a janela aparecer, a abertura fecha a instância nova"""
+        checks = []
+        with self.assertRaises(InterruptedError):
+            self.supervisor.launch("pppoker.lnk", "pppoker", expected=EXPECTED, new_instance=True,
+                                   cancelled=lambda: checks.append(1) or len(checks) > 3)
+        self.standby.close.assert_called_once()
+        self.assertNotIn(20, self.registry.reserved)
+
+    def test_process_exit_during_launch(self):
+        """Se o processo da reserva termina durante a espera, o handle é liberado e o erro é reportado"""
+        self.processes[2000] = FakeProcess(2000)
+        self.processes[2000].running = False
+        with self.assertRaises(RuntimeError):
+            self.supervisor.launch("pppoker.lnk", "pppoker", expected=EXPECTED, timeout=1, new_instance=True)
+        self.assertNotIn(20, self.registry.reserved)
+
+
+if __name__ == "__main__":
+    unittest.main()
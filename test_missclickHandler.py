@@ -0,0 +1,79 @@
+"""
+Testes da detecção de mudança de tela (missclickHandler.py) usando imagens geradas em memória.
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pyautogui', 'win32gui', 'win32ui', 'win32con'):
+    sys.modules.setdefault(module, MagicMock())
+
+from missclickHandler import MissclickHandler
+from screenCapture import ScreenCapture
+
+
+def button(pressed=False, noise=False):
+    image = Image.new("RGB", (60, 60), (40, 40, 40))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((10, 20, 50, 40), fill=(200, 60, 60) if pressed else (60, 200, 60))
+    if noise:
+        image.putpixel((5, 5), (45, 41, 40))
+    return image
+
+
+class TestMissclickHandler(TestCase):
+    """Testes para os modos de comparação"""
+
+    def test_exact_mode_sees_any_pixel(self):
+        """No modo exato, um único pixel diferente conta como mudança"""
+        handler = MissclickHandler(mode="exact")
+        self.assertTrue(handler.has_changed(button(), button(noise=True)))
+        self.assertFalse(handler.has_changed(button(), button()))
+        self.assertEqual(handler.raw_hash(button()), handler.raw_hash(button()))
+
+    def test_threshold_mode_ignores_noise(self):
+        """No modo com tolerância, ruído não é mudança, mas o botão pressionado é"""
+        handler = MissclickHandler(mode="threshold", pixel_tolerance=24, change_ratio=0.02)
+        self.assertFalse(handler.has_changed(button(), button(noise=True)))
+        self.assertTrue(handler.has_changed(button(), button(pressed=True)))
+
+    def test_perceptual_mode(self):
+        """No modo perceptual, só mudanças de estrutura alteram o hash"""
+        handler = MissclickHandler(mode="perceptual")
+        self.assertFalse(handler.has_changed(button(), button(noise=True)))
+        moved = Image.new("RGB", (60, 60), (40, 40, 40))
+        ImageDraw.Draw(moved).rectangle((0, 0, 25, 59), fill=(200, 200, 200))
+        self.assertTrue(handler.has_changed(button(), moved))
+
+    def test_wait_for_change(self):
+        """A espera termina na primeira captura diferente, ou após o timeout"""
+        handler = MissclickHandler(mode="threshold")
+        frames = iter([button(), button(pressed=True)])
+        with patch.object(handler, 'capture', side_effect=lambda region: next(frames)):
+            self.assertTrue(handler.wait_for_change((0, 0, 60, 60), button(), timeout=1, interval=0))
+        with patch.object(handler, 'capture', return_value=button()):
+            self.assertFalse(handler.wait_for_change((0, 0, 60, 60), button(), timeout=0.05, interval=0.01))
+
+    def test_capture_uses_shared_screen_capture(self):
+        """A captura copia só a região pela ScreenCapture do processo e não muda com as capturas seguintes"""
+        screen = ScreenCapture(grab=lambda box: np.asarray(button(pressed=box[0] > 0)), scale=1)
+        handler = MissclickHandler()
+        with patch('missclickHandler.ScreenCapture.shared', return_value=screen):
+            before = handler.capture((0, 0, 60, 60))
+            after = handler.capture((10, 0, 60, 60))
+        self.assertEqual(before.size, (60, 60))
+        self.assertEqual(handler.raw_hash(before), handler.raw_hash(button()))
+        self.assertTrue(handler.has_changed(before, after))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Testes do planejador de navegação (navigationGraph.py) usando mapeamentos gravados em uma pasta temporária.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pygetwindow', 'win32gui', 'win32process', 'pyautogui', 'psutil'):
+    sys.modules.setdefault(module, MagicMock())
+
+from navigationGraph import NavigationGraph
+
+
+def step(x):
+    return {"action": "click", "position": [x, x], "condition": None}
+
+
+class TestNavigationGraph(TestCase):
+    """Testes para a montagem do grafo e a escolha da rota"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.write("Nav/contador.txt", [step(0.1), step(0.2)])
+        self.write("Nav/membros.txt", [step(0.3), step(0.4)])
+        self.write("Ret/contador.txt", [step(0.5), step(0.6)])
+        self.write("Ret/membros.txt", [step(0.7)])
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, commands):
+        path = os.path.join("Mapeamentos", "pppoker", name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(commands, file)
+
+    def test_routes_through_home(self):
+        """Sem transição direta, a rota passa pela aba inicial"""
+        graph = NavigationGraph("PPPOKER")
+        route = graph.route("contador", "membros")
+        self.assertEqual([c["position"][0] for c in route], [0.5, 0.6, 0.3, 0.4])
+        self.assertEqual([c["edge"] for c in route], ["contador>clube"] * 2 + ["clube>membros"] * 2)
+
+    def test_same_tab_and_unreachable(self):
+        """Mesma aba não precisa de comandos; aba sem mapeamento não tem rota"""
+        graph = NavigationGraph("pppoker")
+        self.assertEqual(graph.route("contador", "contador"), [])
+        self.assertIsNone(graph.route("contador", "transacoes"))
+
+    def test_direct_transition_is_used(self):
+        """Uma transição gravada em Tra/ é usada quando é mais barata"""
+        self.write("Tra/contador_membros.txt", [step(0.9)])
+        graph = NavigationGraph("pppoker")
+        self.assertEqual([c["edge"] for c in graph.route("contador", "membros")], ["contador>membros"])
+
+    def test_measured_costs_change_the_route(self):
+        """O tempo medido nos logs substitui a estimativa e pode tornar a rota pela aba inicial mais barata"""
+        self.write("Tra/contador_membros.txt", [step(0.9)])
+        log_path = os.path.join(self.tmp, "Pppoker.jsonl")
+        events = [{"event": "step", "edge": "contador>membros", "elapsed_ms": 5000},
+                  {"event": "step", "elapsed_ms": 10},
+                  {"event": "step", "edge": "contador>clube", "elapsed_ms": 100},
+                  {"event": "step", "edge": "contador>clube", "elapsed_ms": 100},
+                  {"event": "step", "edge": "clube>membros", "elapsed_ms": 300}]
+        with open(log_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(json.dumps(event) for event in events))
+        graph = NavigationGraph("pppoker")
+        graph.load_traces(log_path)
+        self.assertEqual(graph.costs, {"contador>membros": 5000, "contador>clube": 200, "clube>membros": 300})
+        self.assertEqual(graph.shortest_path("contador", "membros"), ["contador", "clube", "membros"])
+
+    def test_failed_traversals_are_skipped(self):
+        """Travessias com um passo que falhou (cor que não apareceu, recuperação) não entram no custo da aresta"""
+        log_path = os.path.join(self.tmp, "Pppoker.jsonl")
+        events = [{"event": "step", "edge": "clube>membros", "elapsed_ms": 300, "level": "INFO"},
+                  {"event": "step", "edge": "clube>membros", "elapsed_ms": 200, "level": "INFO"},
+                  {"event": "step", "elapsed_ms": 10, "level": "INFO"},
+                  {"event": "step", "edge": "clube>membros", "elapsed_ms": 100, "level": "INFO"},
+                  {"event": "color_wait", "edge": "clube>membros", "elapsed_ms": 6000, "result": False, "level": "WARNING"},
+                  {"event": "step", "edge": "clube>membros", "elapsed_ms": 6000, "result": False, "level": "INFO"},
+                  {"message": "Retrying operation", "level": "WARNING"},
+                  {"event": "recovery", "elapsed_ms": 3000, "level": "INFO"},
+                  {"event": "step", "edge": "contador>clube", "elapsed_ms": 150, "level": "INFO"}]
+        with open(log_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(json.dumps(event) for event in events))
+        graph = NavigationGraph("pppoker")
+        graph.load_traces(log_path)
+        self.assertEqual(graph.costs, {"clube>membros": 500, "contador>clube": 150})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Testes da leitura com confiança e releitura (ocrPool.recognize) e das leituras pendentes do OcrPool,
+com o Tesseract simulado.
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pytesseract'):
+    sys.modules.setdefault(module, MagicMock())
+
+import ocrPool
+from ocrPool import OcrPool, recognize
+
+
+def tesseract_data(*reads):
+    """Respostas de image_to_data, uma por chamada: (texto, confiança de 0 a 100)"""
+    return [{"text": [text], "conf": [conf], "block_num": [1], "par_num": [1], "line_num": [1]} for text, conf in reads]
+
+
+class TestRecognize(TestCase):
+    """Testes para a política de releitura só com confiança baixa"""
+
+    def setUp(self):
+        self.image = Image.new("RGB", (60, 20))
+        ocrPool._recognizers["pppoker"] = MagicMock(covers=MagicMock(return_value=False))
+
+    def test_confident_read_is_not_repeated(self):
+        """Leitura com confiança alta é aceita sem releitura"""
+        with patch('ocrProfiles.pytesseract.image_to_data', side_effect=tesseract_data(("870.00", 93))) as data:
+            text, confidence, events = recognize(self.image, "Saldo", "pppoker")
+        self.assertEqual((text, confidence, data.call_count, len(events)), ("870.00", 0.93, 1, 1))
+
+    def test_low_confidence_is_reread(self):
+        """Com confiança baixa, a área é relida com o perfil alternativo e vale a leitura mais confiável"""
+        with patch('ocrProfiles.pytesseract.image_to_data', side_effect=tesseract_data(("87O.00", 31), ("870.00", 88))) as data:
+            text, confidence, events = recognize(self.image, "Saldo", "pppoker")
+        self.assertEqual((text, confidence, data.call_count), ("870.00", 0.88, 2))
+        self.assertIn("amount_alt", events[-1]["message"])
+
+        with patch('ocrProfiles.pytesseract.image_to_data', side_effect=tesseract_data(("870.00", 40), ("", -1))):
+            self.assertEqual(recognize(self.image, "Saldo", "pppoker")[:2], ("870.00", 0.40))
+
+    def test_glyph_templates_skip_tesseract(self):
+        """Campos numéricos lidos pelos templates não passam pelo Tesseract"""
+        ocrPool._recognizers["pppoker"] = MagicMock(covers=MagicMock(return_value=True),
+                                                   recognize=MagicMock(return_value=("1,591.00", 0.97)))
+        with patch('ocrProfiles.pytesseract.image_to_data') as data:
+            self.assertEqual(recognize(self.image, "Saldo", "pppoker")[:2], ("1,591.00", 0.97))
+        data.assert_not_called()
+
+
+class TestOcrPool(TestCase):
+    """Testes para as leituras pendentes"""
+
+    def test_inline_pool_returns_resolved_read(self):
+        """Sem processos, a leitura é feita na hora e o PendingRead já volta resolvido, inclusive com erro"""
+        pool = OcrPool(workers=0)
+        with patch.object(ocrPool, 'recognize', return_value=("12", 0.9, [])):
+            pending = pool.submit(Image.new("RGB", (10, 10)), "Id", "pppoker")
+        self.assertTrue(pending.future.done())
+        self.assertEqual((pending.field, pending.result()), ("Id", ("12", 0.9, [])))
+
+        with patch.object(ocrPool, 'recognize', side_effect=RuntimeError("tesseract")):
+            pending = pool.submit(Image.new("RGB", (10, 10)), "Id", "pppoker")
+        self.assertRaises(RuntimeError, pending.result)
+
+    def test_processes_start_on_first_submit(self):
+        """O pool não cria processos ao ser criado; o executor nasce na primeira leitura e é reaproveitado"""
+        with patch.object(ocrPool, 'ProcessPoolExecutor') as executor:
+            pool = OcrPool(workers=2)
+            executor.assert_not_called()
+            for _ in range(2):
+                pool.submit(Image.new("RGB", (10, 10)), "Id", "pppoker")
+        executor.assert_called_once_with(max_workers=2)
+        self.assertEqual(executor.return_value.submit.call_count, 2)
+
+    def test_broken_pool_is_recreated(self):
+        """Se um processo morreu, o executor quebrado é descartado e a leitura vai para um executor novo"""
+        broken, fresh = MagicMock(), MagicMock()
+        broken.submit.side_effect = BrokenProcessPool("worker died")
+        with patch.object(ocrPool, 'ProcessPoolExecutor', side_effect=[broken, fresh]) as executor:
+            pool = OcrPool(workers=2)
+            pending = pool.submit(Image.new("RGB", (10, 10)), "Id", "pppoker")
+            pool.submit(Image.new("RGB", (10, 10)), "Id", "pppoker")
+        self.assertEqual(executor.call_count, 2)
+        broken.shutdown.assert_called_once()
+        self.assertIs(pool.executor, fresh)
+        self.assertIs(pending.future, fresh.submit.return_value)
+        self.assertEqual(fresh.submit.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
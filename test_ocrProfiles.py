@@ -0,0 +1,93 @@
+"""
+Testes dos perfis de OCR por tipo de campo (ocrProfiles.py) usando imagens geradas em memória.
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pytesseract'):
+    sys.modules.setdefault(module, MagicMock())
+
+import ocrProfiles
+from ocrProfiles import PROFILES, profile_for, strip_frame
+
+
+def dark_field():
+    """Campo no tema escuro dos apps: moldura verde e texto claro sobre fundo preto"""
+    image = Image.new("RGB", (60, 20), (0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 59, 19), outline=(30, 160, 60))
+    draw.text((8, 4), "870.00", fill=(230, 230, 230))
+    return image
+
+
+class TestOcrProfiles(TestCase):
+    """Testes para a escolha do perfil e o tratamento da imagem"""
+
+    def test_profile_for_field(self):
+        """O perfil vem do nome da pergunta; campos desconhecidos mantêm o tratamento original"""
+        self.assertEqual(profile_for("Saldo").name, "amount")
+        self.assertEqual(profile_for(".Timenow").name, "date")
+        self.assertEqual(profile_for("Listids").name, "id_list")
+        self.assertEqual(profile_for("Membros").name, "block")
+        self.assertEqual(profile_for(None).name, "block")
+
+    def test_config(self):
+        """Campos de uma linha usam --psm 7 e a lista de caracteres aceitos"""
+        self.assertEqual(PROFILES["id"].config, "--psm 7 -c tessedit_char_whitelist=0123456789")
+        self.assertEqual(PROFILES["block"].config, "--psm 6")
+
+    def test_prepare_binarizes_dark_theme(self):
+        """Texto claro sobre fundo escuro vira texto preto sobre fundo branco, ampliado e sem a moldura"""
+        prepared = np.asarray(PROFILES["amount"].prepare(dark_field()))
+        self.assertEqual(prepared.shape, (20 * 3 + 20, 60 * 3 + 20))
+        self.assertEqual(set(np.unique(prepared)), {0, 255})
+        self.assertLess((prepared == 0).mean(), 0.5)
+        # Margem e antiga moldura brancas: o texto fica só no meio
+        self.assertTrue((prepared[:13] == 255).all() and (prepared[:, :13] == 255).all())
+
+    def test_recognize_with_confidence(self):
+        """O texto é montado por linha a partir das palavras, e a confiança é a da palavra menos confiável"""
+        data = {"text": ["", "1,591.00", "", "12", "34"], "conf": ["-1", "91.5", "-1", 62, 88],
+                "block_num": [1, 1, 1, 1, 1], "par_num": [1, 1, 1, 1, 1], "line_num": [0, 1, 1, 2, 2]}
+        with patch.object(ocrProfiles.pytesseract, 'image_to_data', return_value=data) as image_to_data:
+            text, confidence = PROFILES["block"].recognize(Image.new("L", (10, 10)))
+        self.assertEqual(text, "1,591.00\n12 34")
+        self.assertAlmostEqual(confidence, 0.62)
+        self.assertEqual(image_to_data.call_args.kwargs["config"], "--psm 6")
+
+    def test_empty_read_has_no_confidence(self):
+        """Nada lido tem confiança zero, o que leva à releitura"""
+        data = {"text": [""], "conf": [-1], "block_num": [1], "par_num": [1], "line_num": [0]}
+        with patch.object(ocrProfiles.pytesseract, 'image_to_data', return_value=data):
+            self.assertEqual(PROFILES["amount"].read(dark_field()), ("", 0.0))
+
+    def test_alternate_profile(self):
+        """A releitura usa o mesmo campo (psm e caracteres) com o outro tratamento"""
+        alternate = PROFILES["amount"].alternate
+        self.assertEqual((alternate.name, alternate.config), ("amount_alt", PROFILES["amount"].config))
+        self.assertFalse(alternate.binarize)
+        self.assertTrue(PROFILES["block"].alternate.binarize)
+        self.assertIs(PROFILES["amount"].alternate, alternate)
+
+    def test_strip_frame_keeps_text(self):
+        """Só as bordas totalmente preenchidas são apagadas"""
+        text = np.zeros((10, 20), dtype=bool)
+        text[0], text[-1], text[:, 0], text[:, -1] = True, True, True, True
+        text[4:6, 5:15] = True
+        stripped = strip_frame(text)
+        self.assertFalse(stripped[0].any() or stripped[:, 0].any())
+        self.assertEqual(int(stripped.sum()), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
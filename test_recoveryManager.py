@@ -0,0 +1,143 @@
+"""
+Testes da instância reserva do RecoveryManager (recoveryManager.py) com um robô e um LaunchSupervisor falsos.
+"""
+
+import os
+import sys
+import time
+import types
+import unittest
+from unittest import TestCase
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+
+# Mock das dependências antes de importar
+fake_psutil_module = types.ModuleType('psutil')
+fake_psutil_module.Error = type('Error', (Exception,), {})
+fake_psutil_module.Process = MagicMock()
+sys.modules.setdefault('psutil', fake_psutil_module)
+for module in ('pynput', 'pygetwindow', 'win32gui', 'win32process', 'win32ui', 'win32con', 'pyautogui'):
+    sys.modules.setdefault(module, MagicMock())
+
+import recoveryManager
+from recoveryManager import RecoveryManager
+from windowRegistry import WindowRegistry
+from mock_windowRegistry import MockWindow, MockWindowProvider
+
+
+class TestStandby(TestCase):
+    """Testes para a preparação, a interrupção e a troca pela instância reserva"""
+
+    def setUp(self):
+        self.provider = MockWindowProvider()
+        self.provider.add(MockWindow("PPPoker", hwnd=10, rect=(100, 50, 500, 850)))
+        self.standby_window = self.provider.add(MockWindow("PPPoker", hwnd=20, rect=(0, 0, 400, 800)))
+        self.standby_window.minimize = MagicMock()
+        self.standby_window.activate = MagicMock()
+        self.standby_window.restore = MagicMock()
+        self.registry = WindowRegistry(provider=self.provider)
+        self.registry.reserve(20)
+        self.standby = self.registry._store("pppoker:standby", self.standby_window)
+        self.registry.invalidate("pppoker:standby")
+
+        self.supervisor = MagicMock()
+        self.supervisor.launch.return_value = self.standby
+        self.robo = SimpleNamespace(app="pppoker", logger=MagicMock(), launch_supervisor=self.supervisor,
+                                    window_manager=MagicMock(registry=self.registry))
+        self.manager = RecoveryManager(self.robo)
+        patchers = [patch.object(recoveryManager, 'STANDBY_INSTANCES', {"pppoker": True}),
+                    patch.object(recoveryManager, 'FileManager')]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ready_standby_is_kept_minimized(self):
+        """Logada, a reserva fica minimizada e a geometria do robô volta para a janela ativa"""
+        with patch.object(self.manager, 'run_mapping', return_value=True), \
+                patch.object(self.manager, 'at_home', return_value=True):
+            self.assertTrue(self.manager.prepare_standby())
+        self.assertIs(self.manager.standby, self.standby)
+        self.standby_window.minimize.assert_called_once()
+        self.supervisor.discard.assert_not_called()
+        self.assertEqual(self.robo.window_manager.apply_window_info.call_args.args[0].hwnd, 10)
+        self.assertFalse(self.manager.needs_standby())
+
+    def test_failed_login_discards_standby(self):
+        """Se o login falha, a instância é descartada (janela, processo e handle reservado)"""
+        with patch.object(self.manager, 'run_mapping', return_value=False):
+            self.assertFalse(self.manager.prepare_standby())
+        self.supervisor.discard.assert_called_once_with(self.standby)
+        self.assertIsNone(self.manager.standby)
+
+    def test_launch_failure_is_reported(self):
+        """Um tempo esgotado na abertura não escapa de prepare_standby"""
+        self.supervisor.launch.side_effect = TimeoutError("pppoker não ficou pronto")
+        self.assertFalse(self.manager.prepare_standby())
+        self.assertIsNone(self.manager.standby)
+
+    def test_background_preparation_is_interrupted(self):
+        """A preparação em segundo plano não segura a próxima operação: stop_standby a interrompe no passo atual"""
+        steps = []
+
+        def run_mapping(commands, cancelled=None):
+            while not cancelled():
+                steps.append(1)
+                time.sleep(0.01)
+            return False
+
+        with patch.object(self.manager, 'run_mapping', side_effect=run_mapping):
+            self.manager.start_standby()
+            time.sleep(0.05)
+            start = time.monotonic()
+            RecoveryManager.stop_standby()
+            self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(RecoveryManager._preparation.is_alive())
+        self.assertTrue(steps)
+        self.supervisor.discard.assert_called_once_with(self.standby)
+
+    def test_swap_watches_standby(self):
+        """A troca registra o handle da reserva e passa a acompanhar o processo dela"""
+        self.manager.standby = self.standby
+        with patch.object(self.manager, 'at_home', return_value=True):
+            self.assertTrue(self.manager.swap_to_standby())
+        info = self.registry.get("pppoker")
+        self.assertEqual((info.hwnd, info.pid), (20, 2000))
+        self.assertEqual(self.supervisor.watch.call_args.args[0].hwnd, 20)
+        self.robo.window_manager.closeapp.assert_called_once()
+
+
+class TestRecover(TestCase):
+    """Testes para a escolha da estratégia de recuperação"""
+
+    def setUp(self):
+        self.supervisor = MagicMock()
+        self.robo = SimpleNamespace(app="pppoker", logger=MagicMock(), launch_supervisor=self.supervisor,
+                                    window_manager=MagicMock())
+        self.manager = RecoveryManager(self.robo)
+        patchers = [patch.object(self.manager, 'renavigate', return_value=True),
+                    patch.object(self.manager, 'swap_to_standby', return_value=False),
+                    patch.object(self.manager, 'restart')]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_live_process_is_renavigated(self):
+        """Com o processo em execução, a primeira tentativa volta à aba pelo mapeamento Ret"""
+        self.supervisor.is_alive.return_value = True
+        self.assertTrue(self.manager.recover(1, "Membros"))
+        self.manager.renavigate.assert_called_once_with("Membros")
+        self.manager.restart.assert_not_called()
+
+    def test_dead_process_skips_renavigation(self):
+        """Com o processo encerrado, a renavegação é pulada e o app é reiniciado"""
+        self.supervisor.is_alive.return_value = False
+        self.assertFalse(self.manager.recover(1, "Membros"))
+        self.manager.renavigate.assert_not_called()
+        self.manager.restart.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Testes do cache de resultados (resultCache.py).
+Usa um Redis falso em memória, então não é necessário ter o Redis rodando.
+"""
+
+import os
+import sys
+import types
+import unittest
+import fnmatch
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+fake_redis_module = types.ModuleType('redis')
+fake_redis_module.RedisError = type('RedisError', (Exception,), {})
+fake_redis_module.Redis = MagicMock()
+sys.modules.setdefault('redis', fake_redis_module)
+for module in ('pynput', 'pygetwindow', 'win32gui', 'win32process', 'pyautogui', 'psutil'):
+    sys.modules.setdefault(module, MagicMock())
+
+from resultCache import ResultCache, CACHE_PREFIX
+from utils import Question
+
+
+class FakeRedis:
+    """Implementa apenas os comandos do Redis usados pelo cache"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    def scan_iter(self, match):
+        return [k for k in self.data if fnmatch.fnmatch(k, match)]
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.data.pop(key, None) is not None
+        return removed
+
+
+class TestResultCache(TestCase):
+    """Testes para o cache de resultados das ações passivas"""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.cache = ResultCache(client=self.redis)
+
+    def test_same_inputs_generate_same_key(self):
+        """Pedidos equivalentes devem gerar a mesma chave, independente de caixa e da ordem"""
+        q1 = Question({"App": "PPPoker ", "Action": "balance", "Id": "123", "Club": "1"})
+        q2 = Question({"Club": "1", "Id": "123", "Action": "Balance", "App": "pppoker"})
+        self.assertEqual(self.cache.make_key(q1), self.cache.make_key(q2))
+        self.assertTrue(self.cache.make_key(q1).startswith(f"{CACHE_PREFIX}:pppoker:balance:"))
+
+    def test_different_inputs_generate_different_keys(self):
+        """Entradas diferentes não podem compartilhar resultado"""
+        q1 = Question({"App": "pppoker", "Action": "balance", "Id": "123"})
+        q2 = Question({"App": "pppoker", "Action": "balance", "Id": "456"})
+        self.assertNotEqual(self.cache.make_key(q1), self.cache.make_key(q2))
+
+    def test_store_and_get(self):
+        """Resultado guardado deve ser devolvido com o TTL da ação"""
+        q = Question({"App": "pppoker", "Action": "balance", "Id": "123"})
+        self.assertIsNone(self.cache.get(q))
+        self.assertTrue(self.cache.store(q, {"Saldo": ["100"]}))
+        self.assertEqual(self.cache.get(q), {"Saldo": ["100"]})
+        self.assertEqual(self.redis.ttls[self.cache.make_key(q)], 15)
+
+    def test_write_actions_are_not_cached(self):
+        """Ações de escrita nunca devem ser respondidas pelo cache"""
+        q = Question({"App": "pppoker", "Action": "send_chips", "Id": "123", "Chipamount": "10"})
+        self.assertFalse(self.cache.store(q, {"Ok": True}))
+        self.assertIsNone(self.cache.get(q))
+
+    def test_write_action_invalidates_related_keys(self):
+        """Envio de fichas deve apagar saldos do mesmo app, mas não de outros apps"""
+        balance = Question({"App": "pppoker", "Action": "balance", "Id": "123"})
+        other_app = Question({"App": "supremapoker", "Action": "balance", "Id": "123"})
+        self.cache.store(balance, {"Saldo": ["100"]})
+        self.cache.store(other_app, {"Saldo": ["50"]})
+
+        removed = self.cache.invalidate(Question({"App": "pppoker", "Action": "send_chips"}))
+
+        self.assertEqual(removed, 1)
+        self.assertIsNone(self.cache.get(balance))
+        self.assertEqual(self.cache.get(other_app), {"Saldo": ["50"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Testes do envio em pedaços das linhas de listas longas (resultStream.py).
+Usa um Redis falso em memória, então não é necessário ter o Redis rodando.
+"""
+
+import os
+import sys
+import types
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+fake_redis_module = types.ModuleType('redis')
+fake_redis_module.RedisError = type('RedisError', (Exception,), {})
+fake_redis_module.Redis = MagicMock()
+sys.modules.setdefault('redis', fake_redis_module)
+sys.modules.setdefault('pynput', MagicMock())
+
+import resultStream
+from resultStream import ResultStream
+
+
+class FakeRedis:
+    """Implementa apenas os comandos de stream do Redis usados pelo ResultStream"""
+
+    def __init__(self):
+        self.streams = {}
+        self.ttls = {}
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        entries = self.streams.setdefault(key, [])
+        entry_id = f"1-{len(entries)}"
+        entries.append((entry_id, {k: str(v) for k, v in fields.items()}))
+        return entry_id
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def xrange(self, key, min="-", max="+"):
+        entries = self.streams.get(key, [])
+        if min.startswith("("):
+            ids = [entry_id for entry_id, _ in entries]
+            return entries[ids.index(min[1:]) + 1:]
+        return entries
+
+
+class Question:
+    App = "pppoker"
+    Action = "transaction"
+    Id = "42"
+    Streamid = "abc"
+
+
+class TestResultStream(TestCase):
+    """Testes para a publicação em pedaços e o marcador final"""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.dispatcher = MagicMock()
+
+    def test_rows_are_published_in_chunks(self):
+        """As linhas aparecem no stream antes do fim da leitura, e o fim é marcado"""
+        stream = ResultStream(Question(), client=self.redis, mode="redis")
+        for i in range(resultStream.RESULT_STREAM_CHUNK_SIZE + 3):
+            stream.emit(f"linha {i}")
+        entries = ResultStream.read("abc", client=self.redis)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0][1]["rows"][0], "linha 0")
+
+        summary = stream.close()
+        self.assertEqual(summary, {"stream": "result_stream:abc", "rows": 13, "status": "completed"})
+        later = ResultStream.read("abc", last_id=entries[0][0], client=self.redis)
+        self.assertEqual([fields["type"] for _, fields in later], ["chunk", "end"])
+        self.assertEqual(later[0][1]["rows"], ["linha 10", "linha 11", "linha 12"])
+        self.assertIn("result_stream:abc", self.redis.ttls)
+
+    def test_webhook_mode(self):
+        """No modo webhook, cada pedaço e o marcador final viram um envio do WebhookDispatcher"""
+        stream = ResultStream(Question(), dispatcher=self.dispatcher, client=self.redis, mode="webhook")
+        stream.emit("linha")
+        stream.close(status="failed")
+        payloads = [c.args[0] for c in self.dispatcher.submit.call_args_list]
+        self.assertEqual([(p["seq"], p["done"]) for p in payloads], [(0, False), (1, True)])
+        self.assertEqual(payloads[0]["rows"], ["linha"])
+        self.assertEqual((payloads[1]["total"], payloads[1]["status"], payloads[1]["Action"]), (1, "failed", "transaction"))
+        self.assertEqual(self.redis.streams, {})
+
+    def test_redis_failure_turns_streaming_off(self):
+        """Com o Redis fora do ar, a leitura continua: o stream é desligado e as linhas voltam no resumo"""
+        failing = MagicMock()
+        failing.xadd.side_effect = resultStream.redis.RedisError("Connection refused")
+        stream = ResultStream(Question(), client=failing, mode="redis")
+        for i in range(resultStream.RESULT_STREAM_CHUNK_SIZE + 3):
+            stream.emit(f"linha {i}")
+        self.assertFalse(stream.active)
+
+        summary = stream.close(status="failed")
+        self.assertEqual(failing.xadd.call_count, 1)
+        self.assertEqual((summary["rows"], summary["status"]), (13, "failed"))
+        self.assertEqual(summary["unsent"], [f"linha {i}" for i in range(13)])
+
+    def test_redis_failure_keeps_webhook(self):
+        """No modo both, uma falha do Redis deixa só o webhook, sem perder o pedaço que falhou"""
+        failing = MagicMock()
+        failing.xadd.side_effect = resultStream.redis.RedisError("Connection refused")
+        stream = ResultStream(Question(), dispatcher=self.dispatcher, client=failing, mode="both")
+        stream.emit("linha")
+        summary = stream.close()
+        self.assertEqual(stream.mode, "webhook")
+        self.assertEqual([c.args[0]["seq"] for c in self.dispatcher.submit.call_args_list], [0, 1])
+        self.assertNotIn("unsent", summary)
+
+    def test_enabled_actions(self):
+        """Só as ações de RESULT_STREAM_ACTIONS são publicadas em pedaços, e só com RESULT_STREAM_MODE ligado"""
+        self.assertFalse(ResultStream.enabled("Transaction"))
+        with patch.object(resultStream, 'RESULT_STREAM_MODE', "redis"):
+            self.assertTrue(ResultStream.enabled("Transaction"))
+            self.assertFalse(ResultStream.enabled("balance"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Testes do pipeline de log assíncrono dos robôs (roboLogging.RoboLogPipeline) escrevendo em um diretório temporário.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+import unittest
+import logging.handlers
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+sys.modules.setdefault('pynput', MagicMock())
+
+import roboLogging
+from roboLogging import RoboLogPipeline, SamplingFilter, JsonLinesFormatter, log_event
+
+
+class TestRoboLogPipeline(TestCase):
+    """Testes para a escrita pela thread do QueueListener"""
+
+    def setUp(self):
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        patcher = patch.object(roboLogging, 'LOG_DIR', log_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pipeline = RoboLogPipeline("pppoker", f"test_roboLogging.{self.id()}")
+        self.addCleanup(self.pipeline.stop)
+
+    def lines(self):
+        with open(self.pipeline.log_path, encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_records_reach_the_file(self):
+        """Os registros enfileirados pelo robô chegam ao arquivo, escritos pela thread do listener"""
+        writers = []
+        emit = logging.handlers.TimedRotatingFileHandler.emit
+
+        def record_writer(handler, record):
+            writers.append(threading.current_thread())
+            emit(handler, record)
+
+        with patch.object(logging.handlers.TimedRotatingFileHandler, 'emit', record_writer):
+            self.pipeline.set_context(operation="send_chips")
+            log_event(self.pipeline.logger, "step", "Step click finished in 12 ms", action="click", elapsed_ms=12)
+            self.pipeline.logger.info("Operation finished")
+            self.pipeline.stop()
+
+        first, second = self.lines()
+        self.assertEqual((first["message"], first["event"], first["elapsed_ms"]), ("Step click finished in 12 ms", "step", 12))
+        self.assertEqual((second["message"], second["app"], second["operation"]), ("Operation finished", "pppoker", "send_chips"))
+        self.assertTrue(writers)
+        self.assertNotIn(threading.current_thread(), writers)
+
+    def test_stop_drains_and_ends_listener(self):
+        """stop esvazia a fila, encerra a thread de escrita e pode ser chamado mais de uma vez (ex.: pelo atexit)"""
+        thread = self.pipeline.listener._thread
+        for i in range(50):
+            self.pipeline.logger.info(f"record {i}")
+        self.pipeline.stop()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.pipeline.listener._thread)
+        self.assertTrue(self.pipeline.queue.empty())
+        self.assertEqual(len(self.lines()), 50)
+        self.pipeline.stop()
+
+    def test_exception_is_written(self):
+        """O traceback de logger.exception chega ao campo "exception" do JSON, fora da mensagem"""
+        try:
+            raise ValueError("saldo ilegível")
+        except ValueError:
+            self.pipeline.logger.exception("OCR failed")
+        self.pipeline.stop()
+
+        entry, = self.lines()
+        self.assertEqual(entry["message"], "OCR failed")
+        self.assertIn("Traceback", entry["exception"])
+        self.assertIn("ValueError: saldo ilegível", entry["exception"])
+
+
+class TestSamplingFilter(TestCase):
+    """Testes para a amostragem de eventos repetitivos"""
+
+    @staticmethod
+    def record(sample_key=None):
+        record = logging.LogRecord("robo", logging.INFO, __file__, 0, "poll", None, None)
+        if sample_key is not None:
+            record.sample_key = sample_key
+        return record
+
+    def test_one_in_every_passes(self):
+        """Passa a primeira ocorrência e depois uma a cada `every`, com a contagem dos descartados"""
+        sampling = SamplingFilter(every=3)
+        records = [self.record("color_poll:(10, 20)") for _ in range(7)]
+        passed = [record for record in records if sampling.filter(record)]
+        self.assertEqual([records.index(record) for record in passed], [0, 3, 6])
+        self.assertEqual([record.suppressed for record in passed], [0, 2, 2])
+
+    def test_keys_are_counted_apart(self):
+        """Cada sample_key tem a sua contagem; registros sem chave sempre passam e reset recomeça a amostragem"""
+        sampling = SamplingFilter(every=10)
+        self.assertTrue(sampling.filter(self.record("a")))
+        self.assertTrue(sampling.filter(self.record("b")))
+        self.assertFalse(sampling.filter(self.record("a")))
+        self.assertTrue(all(sampling.filter(self.record()) for _ in range(5)))
+        sampling.reset()
+        self.assertTrue(sampling.filter(self.record("a")))
+
+
+class TestJsonLinesFormatter(TestCase):
+    """Testes para os campos da linha JSON"""
+
+    def test_event_fields(self):
+        """Os campos estruturados presentes são copiados; os ausentes ou None ficam de fora"""
+        record = logging.LogRecord("robo", logging.WARNING, __file__, 0, "Step %s finished", ("click",), None)
+        record.event, record.action, record.elapsed_ms, record.result = "step", "click", 12.5, None
+        entry = json.loads(JsonLinesFormatter().format(record))
+        self.assertEqual(set(entry), {"ts", "level", "message", "event", "action", "elapsed_ms"})
+        self.assertEqual((entry["level"], entry["message"], entry["elapsed_ms"]), ("WARNING", "Step click finished", 12.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+Testes do núcleo assíncrono (roboRuntime.py) com robôs falsos, que registram em que thread cada passo rodou.
+"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+from unittest import TestCase
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pytesseract', 'redis', 'pygetwindow', 'win32gui', 'win32process', 'pyautogui', 'psutil'):
+    sys.modules.setdefault(module, MagicMock())
+
+import roboRuntime
+from roboRuntime import RoboRuntime
+from utils import Question
+
+
+class FakeQueue(list):
+    """Fila de operações na ordem de chegada"""
+    push = list.append
+
+
+def operation(*steps):
+    """Comando falso: a pergunta e os passos (action, value) da operação"""
+    return SimpleNamespace(question=SimpleNamespace(attrs={}), steps=list(steps))
+
+
+class FakeRecovery:
+    """Preparação da reserva que ocupa o executor de entrada até ser cancelada (ou por no máximo 2 s)"""
+
+    def __init__(self, wanted):
+        self.wanted = wanted
+        self.prepared = []
+
+    def needs_standby(self):
+        return self.wanted
+
+    def prepare_standby(self, cancelled):
+        deadline = time.monotonic() + 2
+        while not cancelled() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.wanted = False
+        self.prepared.append(("cancelled" if cancelled() else "ready", threading.current_thread().name))
+        return not cancelled()
+
+
+class FakeRobo:
+    """Robô com a interface usada pelo runtime; os passos de entrada e a exportação ficam registrados no journal"""
+
+    def __init__(self, app, journal, export_delay=0.0, matches=True, opens=True, standby=False):
+        self.app = app
+        self.journal = journal
+        self.export_delay = export_delay
+        self.matches = matches
+        self.opens = opens
+        self.runtime = None
+        self.commands = []
+        self.command_list = FakeQueue()
+        self.current = None
+        self.chosen_feature = app
+        self.operation_failed = False
+        self.failures = 0
+        self.exported = []
+        self.closed_at = []
+        self.questions = Question()
+        self.logger = MagicMock()
+        self.log_pipeline = MagicMock()
+        self.navigation_graph = MagicMock()
+        self.recovery_manager = FakeRecovery(standby)
+        self.transparent_overlay = MagicMock()
+        self.window_manager = MagicMock()
+        self.file_manager = MagicMock(read_command=lambda c: (c["action"], (0, 0), c.get("value"), None))
+
+    def record(self, event):
+        self.journal.append((self.app, event, threading.current_thread().name))
+
+    def prepare_operation(self):
+        if not self.command_list:
+            return False
+        self.current = self.command_list[0]
+        self.operation_failed = False
+        self.commands = [{"action": a, "value": v} for a, v in self.current.steps] + [{"action": "webhook"}]
+        return True
+
+    def open_app(self):
+        return self.opens
+
+    def abort_operation(self, reason):
+        self.record(reason)
+        self.command_list.pop(0)
+        self.commands = []
+
+    def step_position(self, position, action):
+        return position
+
+    def color_matches(self, position, expected):
+        return self.matches
+
+    def follow_command(self, position, action, value, condition, verify=None, settle=True):
+        if action == 'param':
+            self.questions.attrs.update(value)
+        else:
+            self.record(value)
+        time.sleep(0.01)
+
+    def fail_operation(self):
+        self.failures += 1
+        self.command_list.pop(0)
+        return False
+
+    def finish_operation(self):
+        time.sleep(self.export_delay)
+        self.exported.append(dict(self.questions.attrs))
+        self.record("export")
+
+    def close_operation(self):
+        self.closed_at.append(len(self.journal))
+        self.command_list.pop(0)
+
+    def on_overlay_closed(self):
+        pass
+
+
+class TestRoboRuntime(TestCase):
+    """Testes para a serialização da entrada, a sobreposição das exportações e as mensagens de controle"""
+
+    def setUp(self):
+        patcher = patch.multiple(roboRuntime, STEP_SETTLE=0, COLOR_POLL_INTERVAL=0.01, COLOR_WAIT_POLLS=5)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.runtime = RoboRuntime(io_workers=2, channel="")
+        self.runtime.start()
+        self.addCleanup(self.runtime.stop)
+        self.journal = []
+
+    def wait_idle(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            status = self.runtime.post({"type": "status"}).result(1)
+            if status["robots"] and not any(r["driving"] or r["queued"] for r in status["robots"].values()):
+                return
+            time.sleep(0.02)
+        self.fail("runtime não terminou as operações")
+
+    def test_input_steps_are_serialized(self):
+        """Os passos de entrada rodam todos na mesma thread e as operações de robôs diferentes não se misturam"""
+        robots = [FakeRobo(app, self.journal) for app in ("pppoker", "supremapoker")]
+        for robo in robots:
+            for op in range(2):
+                self.runtime.enqueue(robo, operation(*[("click", f"{robo.app}:{op}:{step}") for step in range(3)])).result(1)
+        self.wait_idle()
+
+        steps = [(app, value, thread) for app, value, thread in self.journal if value != "export"]
+        self.assertEqual(len(steps), 12)
+        self.assertEqual({thread for _, _, thread in steps}, {"RoboRuntime-gui_0"})
+        for i in range(0, 12, 3):
+            current = {value.rsplit(":", 1)[0] for _, value, _ in steps[i:i + 3]}
+            self.assertEqual(len(current), 1)
+        self.assertIs(robots[0].runtime, self.runtime)
+
+    def test_export_overlaps_other_robot(self):
+        """Enquanto um robô exporta fora do executor de entrada, o outro já segue com os seus passos"""
+        slow = FakeRobo("pppoker", self.journal, export_delay=0.3)
+        fast = FakeRobo("pokerbros", self.journal)
+        self.runtime.enqueue(slow, operation(("click", "slow"))).result(1)
+        self.runtime.enqueue(fast, operation(("click", "fast"))).result(1)
+        self.wait_idle()
+
+        events = [(app, value) for app, value, _ in self.journal]
+        self.assertLess(events.index(("pokerbros", "fast")), events.index(("pppoker", "export")))
+        export_thread = next(thread for app, value, thread in self.journal if value == "export")
+        self.assertTrue(export_thread.startswith("RoboRuntime-io"))
+
+    def test_interleaved_robots_keep_their_answers(self):
+        """Um robô que muda a sua pergunta enquanto outro exporta não altera o resultado exportado pelo outro"""
+        slow = FakeRobo("pppoker", self.journal, export_delay=0.2)
+        fast = FakeRobo("pokerbros", self.journal)
+        for robo in (slow, fast):
+            for op in range(2):
+                self.runtime.enqueue(robo, operation(("param", {"Id": f"{robo.app}:{op}"}), ("click", "go"))).result(1)
+        self.wait_idle()
+
+        events = [(app, value) for app, value, _ in self.journal]
+        self.assertLess(events.index(("pokerbros", "export")), events.index(("pppoker", "export")))
+        self.assertEqual([answers["Id"] for answers in slow.exported], ["pppoker:0", "pppoker:1"])
+        self.assertEqual([answers["Id"] for answers in fast.exported], ["pokerbros:0", "pokerbros:1"])
+        self.assertIsNot(slow.questions.attrs, fast.questions.attrs)
+
+    def test_close_waits_for_the_lease(self):
+        """A retirada da operação exportada não acontece no meio da operação de outro robô"""
+        first = FakeRobo("pppoker", self.journal, export_delay=0.03)
+        second = FakeRobo("pokerbros", self.journal)
+        self.runtime.enqueue(first, operation(("click", "first"))).result(1)
+        self.runtime.enqueue(second, operation(*[("click", f"second:{step}") for step in range(8)])).result(1)
+        self.wait_idle()
+
+        steps = [i for i, (app, value, _) in enumerate(self.journal) if app == "pokerbros" and value != "export"]
+        self.assertEqual(len(steps), 8)
+        self.assertFalse(steps[0] < first.closed_at[0] <= steps[-1])
+
+    def test_standby_preparation_yields_to_operations(self):
+        """O robô ocioso prepara a reserva no executor de entrada; uma operação nova interrompe a preparação"""
+        idle = FakeRobo("pppoker", self.journal, standby=True)
+        busy = FakeRobo("pokerbros", self.journal)
+        self.runtime.enqueue(idle, operation(("click", "first"))).result(1)
+        deadline = time.monotonic() + 1
+        while "pppoker" not in self.runtime.standby_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # A preparação já ocupa o executor de entrada
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        self.runtime.enqueue(busy, operation(("click", "second"))).result(1)
+        self.wait_idle()
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(idle.recovery_manager.prepared, [("cancelled", "RoboRuntime-gui_0")])
+        self.assertEqual([value for _, value, _ in self.journal], ["first", "export", "second", "export"])
+
+    def test_pause_and_resume(self):
+        """Pausado, nenhum passo de entrada começa; o resume libera a fila"""
+        robo = FakeRobo("pppoker", self.journal)
+        self.assertTrue(self.runtime.post({"type": "pause"}).result(1)["paused"])
+        self.runtime.enqueue(robo, operation(("click", "a"))).result(1)
+        time.sleep(0.1)
+        self.assertEqual(self.journal, [])
+        self.assertEqual(self.runtime.post({"type": "status"}).result(1)["robots"]["pppoker"]["queued"], 1)
+
+        self.runtime.post({"type": "resume"}).result(1)
+        self.wait_idle()
+        self.assertEqual([value for _, value, _ in self.journal], ["a", "export"])
+
+    def test_color_wait_fails_operation_and_stays_responsive(self):
+        """Cor não encontrada registra a falha; durante a espera o loop continua atendendo mensagens"""
+        robo = FakeRobo("pppoker", self.journal, matches=False)
+        self.runtime.enqueue(robo, operation(("color", (1, 2, 3)), ("click", "never"))).result(1)
+        self.runtime.enqueue(robo, operation(("click", "next"))).result(1)
+        start = time.monotonic()
+        self.assertTrue(self.runtime.post({"type": "status"}).result(1)["robots"]["pppoker"]["driving"])
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.wait_idle()
+
+        self.assertEqual(robo.failures, 1)
+        self.assertEqual([value for _, value, _ in self.journal], ["next", "export"])
+
+    def test_app_that_does_not_open_aborts_operation(self):
+        """Se o app não abre, a operação é encerrada com a falha e o robô segue para a próxima"""
+        robo = FakeRobo("pppoker", self.journal, opens=False)
+        self.runtime.enqueue(robo, operation(("click", "never"))).result(1)
+        self.runtime.enqueue(robo, operation(("click", "never"))).result(1)
+        self.wait_idle()
+        self.assertEqual([value for _, value, _ in self.journal], ["Could not open pppoker"] * 2)
+        self.assertEqual(robo.commands, [])
+
+    def test_unknown_control_message(self):
+        """Tipos de mensagem sem tratamento são recusados; on() registra novos tipos"""
+        with self.assertRaises(ValueError):
+            self.runtime.post({"type": "reboot"}).result(1)
+        self.runtime.on("ping", lambda message: "pong")
+        self.assertEqual(self.runtime.post({"type": "ping"}).result(1), "pong")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Testes da reordenação da fila do robô por afinidade de aba (robotQueue.py).
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+sys.modules.setdefault('pynput', MagicMock())
+
+import robotQueue
+from robotQueue import AffinityScheduler, CommandQueue, _SimulatedCommand as Cmd
+
+
+class TestAffinityScheduler(TestCase):
+    """Testes para a escolha da próxima operação"""
+
+    def run_queue(self, actions, current, scheduler):
+        queue = [Cmd(action) for action in actions]
+        order = []
+        while queue:
+            cmd = queue.pop(scheduler.select(queue, current))
+            order.append(cmd.Action)
+            current = robotQueue.abas[cmd.Action]
+        return order
+
+    def test_groups_by_current_tab(self):
+        """Operações da aba atual são adiantadas"""
+        order = self.run_queue(['club_stats', 'balance', 'club_stats', 'balance'], 'contador', AffinityScheduler(max_skips=5))
+        self.assertEqual(order, ['balance', 'balance', 'club_stats', 'club_stats'])
+
+    def test_unknown_tab_keeps_fifo(self):
+        """Sem aba conhecida, a fila é FIFO"""
+        scheduler = AffinityScheduler()
+        queue = [Cmd('club_stats'), Cmd('balance')]
+        self.assertEqual(scheduler.select(queue, None), 0)
+
+    def test_window_limits_reordering(self):
+        """Operações fora da janela não são adiantadas"""
+        queue = [Cmd('club_stats'), Cmd('club_stats'), Cmd('balance')]
+        self.assertEqual(AffinityScheduler(window=2).select(queue, 'contador'), 0)
+
+    def test_starvation_protection(self):
+        """Uma operação passada para trás max_skips vezes é executada"""
+        order = self.run_queue(['club_stats'] + ['balance'] * 5, 'contador', AffinityScheduler(max_skips=2))
+        self.assertEqual(order.index('club_stats'), 2)
+
+    def test_higher_priority_is_not_delayed(self):
+        """A afinidade só vale dentro do nível de prioridade da primeira operação da fila"""
+        with patch.dict(robotQueue.actions_priorities, {'club_stats': 0, 'balance': 1}):
+            queue = [Cmd('club_stats'), Cmd('balance'), Cmd('balance')]
+            self.assertEqual(AffinityScheduler().select(queue, 'contador'), 0)
+
+
+class TestCommandQueue(TestCase):
+    """Testes para a fila de prioridades com envelhecimento"""
+
+    def setUp(self):
+        self.now = 0.0
+        patcher = patch.object(robotQueue, 'monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue = CommandQueue(aging_seconds=30)
+
+    def push(self, action, at):
+        self.now = at
+        self.queue.push(Cmd(action))
+
+    def test_urgent_operation_jumps_ahead(self):
+        """send_chips passa à frente de um transaction que chegou antes"""
+        self.push('transaction', 0)
+        self.push('balance', 1)
+        self.push('send_chips', 2)
+        self.assertEqual([c.Action for c in self.queue.ordered()], ['send_chips', 'balance', 'transaction'])
+
+    def test_aging_prevents_starvation(self):
+        """Depois de esperar o bastante, uma operação de baixa prioridade passa à frente das mais novas"""
+        self.push('transaction', 0)
+        self.push('send_chips', 61)
+        self.assertEqual(self.queue.ordered(1)[0].Action, 'transaction')
+
+    def test_running_operation_is_not_preempted(self):
+        """A operação em execução só é trocada depois de finish()"""
+        self.push('transaction', 0)
+        self.assertEqual(self.queue.start().Action, 'transaction')
+        self.push('send_chips', 1)
+        self.assertEqual(self.queue.start().Action, 'transaction')
+        self.assertEqual(len(self.queue), 2)
+        self.queue.finish()
+        self.assertEqual(self.queue.start().Action, 'send_chips')
+        self.queue.finish()
+        self.assertFalse(self.queue)
+        self.assertIsNone(self.queue.start())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Testes da captura restrita a regiões (screenCapture.py) usando uma tela gerada em memória.
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'win32gui', 'win32ui', 'win32con'):
+    sys.modules.setdefault(module, MagicMock())
+
+import screenCapture
+from screenCapture import ScreenCapture
+
+
+class FakeScreen:
+    """Tela de 200x100 em que cada pixel tem a cor (x, y, 50), registrando as regiões capturadas"""
+
+    def __init__(self):
+        y, x = np.mgrid[0:100, 0:200]
+        self.pixels = np.dstack([x, y, np.full_like(x, 50)]).astype(np.uint8)
+        self.regions = []
+
+    def grab(self, region):
+        left, top, width, height = region
+        self.regions.append(region)
+        return self.pixels[top:top + height, left:left + width]
+
+
+class TestScreenCapture(TestCase):
+    """Testes para a captura por região, o buffer reaproveitado e a grade reduzida"""
+
+    def setUp(self):
+        self.screen = FakeScreen()
+
+    def test_union_of_regions(self):
+        """Só a menor região que contém todas as regiões do passo é capturada"""
+        capture = ScreenCapture(grab=self.screen.grab)
+        frame = capture.capture_regions([(10, 20, 5, 5), (40, 8, 1, 1), (0, 0, 0, 0)])
+        self.assertEqual(self.screen.regions, [(10, 8, 31, 17)])
+        self.assertEqual(frame.shape, (17, 31, 3))
+        self.assertEqual(capture.pixel((40, 8)), (40, 8, 50))
+        self.assertIsNone(ScreenCapture.union([]))
+
+    def test_buffer_is_reused(self):
+        """Capturas menores que o buffer não alocam um buffer novo"""
+        capture = ScreenCapture(grab=self.screen.grab)
+        capture.capture((0, 0, 60, 40))
+        buffer = capture.buffer
+        for i in range(5):
+            self.assertEqual(capture.color((i * 10, i)), (i * 10, i, 50))
+        self.assertIs(capture.buffer, buffer)
+        self.assertEqual(self.screen.regions[1:], [(i * 10, i, 1, 1) for i in range(5)])
+
+    def test_downscaled_grid(self):
+        """A grade reduzida devolve a média de cada bloco"""
+        capture = ScreenCapture(grab=self.screen.grab, scale=4)
+        capture.capture((0, 0, 18, 9))
+        self.assertEqual(capture.grid().shape, (2, 4, 3))
+        self.assertEqual(capture.pixel((5, 6), downscaled=True), (6, 6, 50))
+        self.assertEqual(capture.pixel((5, 6)), (5, 6, 50))
+        self.assertEqual(capture.color((100, 50)), (100, 50, 50))
+        self.assertEqual(self.screen.regions[-1], (98, 48, 4, 4))
+
+    def test_grab_copies_only_the_region(self):
+        """O bitmap e o BitBlt têm o tamanho da região pedida, e não o da tela; BGRA vira RGB"""
+        width, height = 7, 3
+        bitmap = MagicMock()
+        bitmap.GetBitmapBits.return_value = bytes([10, 20, 30, 0]) * (width * height)
+        with patch.object(screenCapture.win32ui, 'CreateBitmap', return_value=bitmap), \
+                patch.object(screenCapture.win32ui, 'CreateDCFromHandle') as create_dc:
+            pixels = screenCapture._grab((-100, 50, width, height))
+        source = create_dc.return_value
+        memory = source.CreateCompatibleDC.return_value
+        bitmap.CreateCompatibleBitmap.assert_called_once_with(source, width, height)
+        memory.BitBlt.assert_called_once_with((0, 0), (width, height), source, (-100, 50), screenCapture.win32con.SRCCOPY)
+        memory.DeleteDC.assert_called_once()
+        self.assertEqual(pixels.shape, (height, width, 3))
+        self.assertEqual(tuple(pixels[2, 6]), (30, 20, 10))
+
+        capture = ScreenCapture(grab=lambda box: pixels)
+        self.assertEqual(capture.capture((-100, 50, width, height)).shape, (height, width, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Testes do reconhecimento de aba (screenState.py) usando uma captura de tela em memória.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pygetwindow', 'win32gui', 'win32process', 'win32ui', 'win32con', 'pyautogui', 'psutil'):
+    sys.modules.setdefault(module, MagicMock())
+
+from screenState import ScreenStateClassifier
+from windowRegistry import WindowInfo
+
+
+class FakeScreen:
+    """Tela em que todos os pixels são pretos, exceto os definidos em `pixels` (posições absolutas)"""
+
+    def __init__(self, pixels):
+        self.pixels = pixels
+        self.regions = []
+
+    def grab(self, region):
+        left, top, width, height = region
+        self.regions.append(region)
+        image = Image.new("RGB", (width, height))
+        for (x, y), rgb in self.pixels.items():
+            if left <= x < left + width and top <= y < top + height:
+                image.putpixel((x - left, y - top), rgb)
+        return np.asarray(image)
+
+
+class TestScreenStateClassifier(TestCase):
+    """Testes para a identificação da aba atual"""
+
+    def setUp(self):
+        self.info = WindowInfo(None, 1, (0, 0, 100, 200), 10, 20, 100, 200)
+        with patch.object(ScreenStateClassifier, 'load_fingerprints', return_value={
+            'clube': [((0.1, 0.1), (200, 200, 200))],
+            'contador': [((0.5, 0.5), (30, 92, 65))],
+            'membros': [((0.5, 0.5), (30, 92, 65)), ((0.2, 0.9), (255, 0, 0))]
+        }):
+            self.classifier = ScreenStateClassifier("pppoker")
+
+    def classify(self, pixels):
+        screen = FakeScreen(pixels)
+        self.classifier.capture.grab = screen.grab
+        result = self.classifier.classify(self.info)
+        # Só a união dos pixels das impressões digitais é capturada, e não a janela inteira
+        self.assertEqual(screen.regions, [(20, 40, 41, 161)])
+        return result
+
+    def test_recognizes_tab(self):
+        """Pixel dentro da tolerância identifica a aba"""
+        self.assertEqual(self.classify({(60, 120): (33, 90, 60)}), 'contador')
+
+    def test_prefers_most_specific_fingerprint(self):
+        """Quando duas abas correspondem, vence a que conferiu mais pixels"""
+        self.assertEqual(self.classify({(60, 120): (30, 92, 65), (30, 200): (255, 0, 0)}), 'membros')
+
+    def test_unknown_screen(self):
+        """Nenhuma impressão digital correspondendo retorna None"""
+        self.assertIsNone(self.classify({}))
+
+    def test_hidden_window_is_not_captured(self):
+        """Janela sem área cliente (minimizada ou não encontrada) não é capturada"""
+        self.assertIsNone(self.classifier.classify(None))
+        self.assertIsNone(self.classifier.classify(WindowInfo(None, 1, (0, 0, 0, 0), 0, 0, 0, 0)))
+
+    def test_tie_is_unknown(self):
+        """Duas abas com o mesmo número de pixels conferidos são ambíguas: nenhuma é reconhecida"""
+        self.classifier.fingerprints['clube'] = [((0.5, 0.5), (30, 92, 65))]
+        screen = FakeScreen({(60, 120): (30, 92, 65)})
+        self.classifier.capture.grab = screen.grab
+        self.assertIsNone(self.classifier.classify(self.info))
+
+    def test_confirm_needs_second_match(self):
+        """A aba só é confirmada se a segunda captura reconhecer a mesma aba"""
+        screens = iter([FakeScreen({(60, 120): (30, 92, 65)}), FakeScreen({})])
+        self.classifier.capture.grab = lambda region: next(screens).grab(region)
+        with patch('screenState.time.sleep'):
+            self.assertEqual(self.classifier.classify(self.info), 'contador')
+            self.assertFalse(self.classifier.confirm(self.info, 'contador'))
+
+
+class TestLoadFingerprints(TestCase):
+    """Testes para a montagem das impressões digitais a partir dos mapeamentos"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.addCleanup(os.chdir, self.cwd)
+
+    def write(self, root, path, steps):
+        full = os.path.join(root, "Mapeamentos", "pppoker", path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as file:
+            json.dump([{"action": a, "position": list(p), "value": list(v) if v else None} for a, p, v in steps], file)
+
+    def test_single_shipped_pixel_is_not_enough(self):
+        """O pixel preto do Ret/contador do supremapoker, repetido em outros mapeamentos, não reconhece a aba"""
+        self.assertNotIn('contador', ScreenStateClassifier.load_fingerprints("supremapoker"))
+
+    def test_distinct_pixels_from_ret_and_nav(self):
+        """Pixels do início do Ret e do fim do Nav formam a impressão digital; os repetidos em outro mapeamento saem"""
+        root = tempfile.mkdtemp()
+        self.write(root, "Ret/contador.txt", [("color", (0.3, 0.13), (0, 0, 0)), ("color", (0.7, 0.2), (239, 161, 68)),
+                                              ("click", (0.9, 0.08), None), ("color", (0.5, 0.5), (1, 2, 3))])
+        self.write(root, "Nav/contador.txt", [("color", (0.1, 0.3), (200, 200, 200)), ("click", (0.5, 0.95), None),
+                                              ("color", (0.4, 0.6), (30, 92, 65))])
+        self.write(root, "Act/send_chips.txt", [("color", (0.301, 0.134), (0, 0, 0))])
+        os.chdir(root)
+        with patch('recoveryManager.RecoveryManager.home_fingerprint', return_value=[]):
+            fingerprints = ScreenStateClassifier.load_fingerprints("pppoker")
+        self.assertEqual(fingerprints, {'contador': [((0.7, 0.2), (239, 161, 68)), ((0.4, 0.6), (30, 92, 65))]})
+
+
+if __name__ == "__main__":
+    unittest.main()
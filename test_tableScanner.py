@@ -0,0 +1,95 @@
+"""
+Testes da leitura incremental de listas roláveis (tableScanner.py) usando uma lista desenhada em memória.
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pyautogui'):
+    sys.modules.setdefault(module, MagicMock())
+
+from tableScanner import TableScanner
+
+ROW_HEIGHT = 20
+VISIBLE_ROWS = 5
+TOTAL_ROWS = 23
+SCROLL_ROWS = 3
+
+
+class PixelWindow:
+    """Janela de 100x100 px em (0, 0): posições relativas viram pixels"""
+
+    def get_absolute_position(self, position):
+        return int(position[0] * 100), int(position[1] * 100)
+
+
+class FakeList:
+    """Lista de TOTAL_ROWS linhas, cada uma com um padrão único, da qual VISIBLE_ROWS aparecem por vez"""
+
+    def __init__(self):
+        rng = np.random.default_rng(7)
+        rows = [np.repeat(rng.integers(0, 256, (1, 100)), ROW_HEIGHT, axis=0) for _ in range(TOTAL_ROWS)]
+        self.content = np.concatenate(rows).astype(np.uint8)
+        self.top = 0
+        self.grabs = 0
+
+    def grab(self, region):
+        self.grabs += 1
+        x, y, w, h = region
+        return Image.fromarray(self.content[self.top + y:self.top + y + h, x:x + w])
+
+    def scroll(self):
+        self.top = min(self.top + SCROLL_ROWS * ROW_HEIGHT, len(self.content) - VISIBLE_ROWS * ROW_HEIGHT)
+
+    def row_at(self, area):
+        return (self.top + int(area[0][1] * 100)) // ROW_HEIGHT
+
+
+class TestTableScanner(TestCase):
+    """Testes para a varredura incremental"""
+
+    def setUp(self):
+        self.list = FakeList()
+        rows = [((0.0, i * 0.2), (1.0, (i + 1) * 0.2)) for i in range(VISIBLE_ROWS)]
+        self.scanner = TableScanner(PixelWindow(), rows, grab=self.list.grab)
+        self.read = []
+
+    def process(self, area):
+        self.read.append(self.list.row_at(area))
+        return False
+
+    def test_each_row_is_read_once(self):
+        """Cada linha da lista é processada uma única vez, e a varredura para no fim da lista"""
+        found = self.scanner.scan(self.process, self.list.scroll)
+        self.assertFalse(found)
+        self.assertEqual(self.read, list(range(TOTAL_ROWS)))
+        self.assertEqual(self.scanner.pages, 8)
+
+    def test_stops_when_row_is_found(self):
+        """Retornar True em process_row encerra a varredura"""
+        def process(area):
+            self.read.append(self.list.row_at(area))
+            return self.read[-1] == 9
+
+        self.assertTrue(self.scanner.scan(process, self.list.scroll))
+        self.assertEqual(self.read, list(range(10)))
+
+    def test_offset_estimation(self):
+        """O deslocamento entre duas capturas é medido em pixels"""
+        previous = self.scanner.capture()
+        self.list.top = 37
+        self.assertEqual(TableScanner.offset(previous, self.scanner.capture()), 37)
+        self.assertEqual(TableScanner.offset(previous, previous), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Testes da localização de elementos por template (templateLocator.py) usando uma tela gerada em memória.
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+for module in ('pynput', 'pyautogui'):
+    sys.modules.setdefault(module, MagicMock())
+
+import templateLocator
+from templateLocator import TemplateLocator, ncc
+
+
+class FakeScreen:
+    """Tela com ruído aleatório em que o botão (template) pode ser movido"""
+
+    def __init__(self):
+        rng = np.random.default_rng(7)
+        self.pixels = (rng.random((400, 600)) * 255).astype(np.uint8)
+        self.button = self.pixels[200:216, 300:324].copy()
+        self.grabs = []
+
+    def move_button(self, dx, dy):
+        rng = np.random.default_rng(11)
+        self.pixels[200:216, 300:324] = (rng.random((16, 24)) * 255).astype(np.uint8)
+        self.pixels[200 + dy:216 + dy, 300 + dx:324 + dx] = self.button
+
+    def screenshot(self, region):
+        left, top, width, height = region
+        self.grabs.append(region)
+        return Image.fromarray(self.pixels[top:top + height, left:left + width])
+
+
+class TestTemplateLocator(TestCase):
+    """Testes para a busca na janela e o reaproveitamento do deslocamento"""
+
+    def setUp(self):
+        self.screen = FakeScreen()
+        self.locator = TemplateLocator("pppoker")
+        self.locator.templates["send"] = self.screen.button.astype(np.float64)
+        patcher = patch.object(templateLocator.pyautogui, 'screenshot', side_effect=self.screen.screenshot)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ncc_ignores_brightness(self):
+        """A correlação normalizada encontra o template mesmo com brilho e contraste diferentes"""
+        image = self.screen.pixels.astype(np.float64)[150:260, 250:380]
+        scores = ncc(image * 0.5 + 40, self.screen.button.astype(np.float64))
+        self.assertEqual(np.unravel_index(np.argmax(scores), scores.shape), (50, 50))
+        self.assertAlmostEqual(float(scores.max()), 1.0, places=6)
+
+    def test_finds_moved_element(self):
+        """O deslocamento do elemento é encontrado dentro da janela de busca"""
+        self.screen.move_button(13, -9)
+        self.assertEqual(self.locator.locate("send", (312, 208)), (13, -9))
+
+    def test_cached_offset_is_checked_first(self):
+        """Com o deslocamento já conhecido, só uma região do tamanho do template é capturada"""
+        self.screen.move_button(5, 3)
+        self.locator.locate("send", (312, 208))
+        self.screen.grabs.clear()
+        self.assertEqual(self.locator.locate("send", (312, 208)), (5, 3))
+        self.assertEqual([(w, h) for _, _, w, h in self.screen.grabs], [(26, 18)])
+
+    def test_missing_element(self):
+        """Sem o elemento na janela, nenhum deslocamento é devolvido nem guardado"""
+        self.screen.pixels[200:216, 300:324] = 128
+        self.assertIsNone(self.locator.locate("send", (312, 208)))
+        self.assertNotIn("send", self.locator.offsets)
+        self.assertIsNone(self.locator.locate("unknown", (312, 208)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Testes das novas tentativas, da fila de falhas e da devolução de itens abandonados do WebhookDispatcher.
+Usa um Redis e uma sessão HTTP falsos, então não é necessário ter o Redis nem o receptor rodando.
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Mock das dependências antes de importar
+fake_redis_module = types.ModuleType('redis')
+fake_redis_module.RedisError = type('RedisError', (Exception,), {})
+fake_redis_module.Redis = MagicMock()
+sys.modules.setdefault('redis', fake_redis_module)
+
+
+class RequestException(Exception):
+    def __init__(self, *args, response=None):
+        super().__init__(*args)
+        self.response = response
+
+
+fake_requests_module = types.ModuleType('requests')
+fake_requests_module.exceptions = types.SimpleNamespace(RequestException=RequestException,
+                                                        HTTPError=type('HTTPError', (RequestException,), {}))
+fake_requests_module.Session = MagicMock
+fake_requests_module.Response = object
+fake_requests_module.adapters = types.SimpleNamespace(HTTPAdapter=MagicMock())
+sys.modules.setdefault('requests', fake_requests_module)
+sys.modules.setdefault('requests.adapters', fake_requests_module.adapters)
+sys.modules.setdefault('dotenv', MagicMock())
+sys.modules.setdefault('pynput', MagicMock())
+
+import redis
+import requests
+import webhookDispatcher
+from webhookDispatcher import WebhookDispatcher, OUTBOX_KEY, INFLIGHT_KEY, DEAD_LETTER_KEY
+
+
+class FakeRedis:
+    """Implementa apenas os comandos de sorted set, hash e lista usados pelo WebhookDispatcher"""
+
+    def __init__(self):
+        self.zsets, self.hashes, self.lists = {}, {}, {}
+        self.fail_next: set[str] = set()
+
+    def _check(self, command):
+        if command in self.fail_next:
+            self.fail_next.discard(command)
+            raise redis.RedisError(f"{command} falhou")
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        return self.zsets.get(key, {}).pop(member, None) is not None
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zcount(self, key, low, high):
+        return sum(low <= score <= high for score in self.zsets.get(key, {}).values())
+
+    def zrangebyscore(self, key, low, high, start=0, num=None, withscores=False):
+        items = sorted((score, member) for member, score in self.zsets.get(key, {}).items() if low <= score <= high)
+        items = items[start:start + num if num is not None else None]
+        return [(member, score) for score, member in items] if withscores else [member for _, member in items]
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self.hashes.setdefault(key, {}).update(mapping or {field: value})
+
+    def hdel(self, key, field):
+        self._check("hdel")
+        return 1 if self.hashes.get(key, {}).pop(field, None) is not None else 0
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+
+def response(status):
+    """Resposta falsa: raise_for_status falha para status de erro, como no requests"""
+    fake = MagicMock(status_code=status)
+    fake.json.return_value = {}
+    if status >= 400:
+        fake.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status}", response=fake)
+    return fake
+
+
+class TestWebhookDispatcher(TestCase):
+    """Testes para as novas tentativas, a fila de falhas e os itens em envio abandonados"""
+
+    def setUp(self):
+        self.client = FakeRedis()
+        self.dispatcher = WebhookDispatcher(url="http://receptor/webhook", client=self.client, batch_mode=False)
+        self.dispatcher.session = MagicMock()
+
+    def outbox(self):
+        return [(json.loads(raw), score) for raw, score in self.client.zsets.get(OUTBOX_KEY, {}).items()]
+
+    def test_server_error_is_retried_with_backoff(self):
+        """Erros 5xx e 429 voltam para a fila com espera exponencial"""
+        for status in (500, 429):
+            self.dispatcher.session.post.return_value = response(status)
+            self.dispatcher.submit({"Saldo": "870.00"})
+            self.dispatcher._send_due()
+        retried = self.outbox()
+        self.assertEqual(len(retried), 2)
+        self.assertTrue(all(item["attempts"] == 1 and score > time.time() for item, score in retried))
+        self.assertEqual(self.client.hlen(INFLIGHT_KEY), 0)
+        self.assertNotIn(DEAD_LETTER_KEY, self.client.lists)
+
+    def test_client_error_goes_to_dead_letter(self):
+        """Um 4xx (exceto 408 e 429) vai direto para a fila de falhas, sem novas tentativas"""
+        self.dispatcher.session.post.return_value = response(422)
+        self.dispatcher.submit({"Saldo": "870.00"})
+        self.dispatcher._send_due()
+        self.assertEqual(self.outbox(), [])
+        self.assertEqual(len(self.client.lists[DEAD_LETTER_KEY]), 1)
+        self.assertEqual(self.dispatcher.session.post.call_count, 1)
+
+    def test_attempts_exhausted_go_to_dead_letter(self):
+        """Após WEBHOOK_MAX_ATTEMPTS falhas o item vai para a fila de falhas"""
+        self.dispatcher.session.post.return_value = response(503)
+        self.dispatcher.submit({"Saldo": "870.00"})
+        with patch.object(webhookDispatcher, 'WEBHOOK_MAX_ATTEMPTS', 2):
+            for _ in range(2):
+                for raw in list(self.client.zsets[OUTBOX_KEY]):
+                    self.client.zsets[OUTBOX_KEY][raw] = 0
+                self.dispatcher._send_due()
+        self.assertEqual(self.outbox(), [])
+        self.assertEqual(json.loads(self.client.lists[DEAD_LETTER_KEY][0])["attempts"], 2)
+
+    def test_only_stale_inflight_items_are_requeued(self):
+        """Itens em envio por outro processo vivo ficam onde estão; só os abandonados voltam para a fila"""
+        now = time.time()
+        items = {name: json.dumps({"id": name, "url": "http://receptor", "payload": {}, "attempts": 0, "created": now})
+                 for name in ("active", "stale", "legacy")}
+        self.client.hset(INFLIGHT_KEY, "active", json.dumps({"claimed": now, "item": items["active"]}))
+        self.client.hset(INFLIGHT_KEY, "stale", json.dumps({"claimed": now - 120, "item": items["stale"]}))
+        self.client.hset(INFLIGHT_KEY, "legacy", items["legacy"])
+
+        self.assertEqual(self.dispatcher._requeue_inflight(), 2)
+        self.assertEqual({item["id"] for item, _ in self.outbox()}, {"stale", "legacy"})
+        self.assertEqual(list(self.client.hgetall(INFLIGHT_KEY)), ["active"])
+
+    def test_slow_endpoint_does_not_expire_waiting_claims(self):
+        """Com um receptor lento, os itens do fim da passada continuam reservados e outro processo não os reenvia"""
+        other = WebhookDispatcher(url="http://receptor/webhook", client=self.client, batch_mode=False)
+        requeued = []
+
+        def slow_post(*args, **kwargs):
+            time.sleep(0.06)
+            requeued.append(other._requeue_inflight())
+            return response(200)
+
+        self.dispatcher.session.post.side_effect = slow_post
+        with patch.object(webhookDispatcher, 'WEBHOOK_INFLIGHT_STALE', 0.1):
+            for i in range(5):
+                self.dispatcher.submit({"Saldo": f"{i}.00"})
+            self.assertEqual(self.dispatcher._send_due(), 5)
+        self.assertEqual(requeued, [0] * 5)
+        self.assertEqual(self.dispatcher.session.post.call_count, 5)
+        self.assertEqual(self.dispatcher.pending(), 0)
+
+    def test_worker_survives_redis_errors(self):
+        """Um erro do Redis durante o envio não derruba a thread; o item volta para a fila e é entregue"""
+        self.dispatcher.session.post.return_value = response(200)
+        self.client.fail_next.add("hdel")
+        with patch.multiple(webhookDispatcher, WEBHOOK_POLL_INTERVAL=0.01, WEBHOOK_INFLIGHT_STALE=0):
+            self.dispatcher.submit({"Saldo": "870.00"})
+            self.dispatcher.start()
+            deadline = time.monotonic() + 2
+            while self.dispatcher.pending() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(self.dispatcher._thread.is_alive())
+            self.dispatcher.stop()
+        self.assertEqual(self.dispatcher.pending(), 0)
+        self.assertEqual(self.dispatcher.session.post.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
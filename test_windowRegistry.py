@@ -0,0 +1,102 @@
+"""
+Testes do registro de janelas (windowRegistry.py) usando um provedor de janelas em memória.
+"""
+
+import os
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+
+# Mock das dependências antes de importar
+for module in ('pygetwindow', 'win32gui', 'win32process'):
+    sys.modules.setdefault(module, MagicMock())
+
+from windowRegistry import WindowRegistry
+from mock_windowRegistry import MockWindow, MockWindowProvider
+
+
+class TestWindowRegistry(TestCase):
+    """Testes para o cache de handles e geometria das janelas"""
+
+    def setUp(self):
+        self.provider = MockWindowProvider()
+        self.window = self.provider.add(MockWindow("PPPoker", hwnd=10, rect=(100, 50, 500, 850)))
+        self.registry = WindowRegistry(provider=self.provider)
+
+    def test_repeated_lookups_enumerate_once(self):
+        """Consultas seguidas devem reaproveitar o handle sem enumerar as janelas de novo"""
+        for _ in range(5):
+            info = self.registry.get("pppoker")
+        self.assertEqual(self.provider.find_calls, 1)
+        self.assertEqual(self.provider.geometry_calls, 1)
+        self.assertEqual((info.client_left, info.client_top, info.width, info.height), (108, 81, 384, 761))
+
+    def test_moved_window_refreshes_geometry_only(self):
+        """Mover a janela recalcula a geometria, mas não enumera as janelas"""
+        self.registry.get("pppoker")
+        self.window.move(20, 10)
+        info = self.registry.get("pppoker")
+        self.assertEqual(self.provider.find_calls, 1)
+        self.assertEqual((info.client_left, info.client_top), (128, 91))
+
+    def test_minimized_window_keeps_last_geometry(self):
+        """Janela minimizada não deve sobrescrever a geometria válida"""
+        self.registry.get("pppoker")
+        self.window.isMinimized = True
+        self.window.rect = (-32000, -32000, -31840, -31972)
+        info = self.registry.get("pppoker")
+        self.assertEqual((info.client_left, info.width), (108, 384))
+
+    def test_closed_window_is_found_again(self):
+        """Handle inválido força uma nova enumeração"""
+        self.registry.get("pppoker")
+        self.provider.close(10)
+        self.assertIsNone(self.registry.get("pppoker"))
+        self.provider.add(MockWindow("PPPoker", hwnd=11, rect=(0, 0, 400, 800)))
+        info = self.registry.get("pppoker")
+        self.assertEqual(info.hwnd, 11)
+        self.assertEqual(self.provider.find_calls, 3)
+
+    def test_invalidate_forces_lookup(self):
+        """invalidate() descarta o handle guardado"""
+        self.registry.get("pppoker")
+        self.registry.invalidate("PPPOKER")
+        self.registry.get("pppoker")
+        self.assertEqual(self.provider.find_calls, 2)
+
+    def test_reserved_window_is_not_found_by_title(self):
+        """A instância reserva, com o mesmo título, nunca é devolvida por título, mesmo se vier antes na enumeração"""
+        provider = MockWindowProvider()
+        standby = provider.add(MockWindow("PPPoker", hwnd=5, rect=(0, 0, 400, 800)))
+        provider.add(MockWindow("PPPoker", hwnd=10, rect=(100, 50, 500, 850)))
+        registry = WindowRegistry(provider=provider)
+        registry.reserve(standby._hWnd)
+        self.assertEqual(registry.get("pppoker").hwnd, 10)
+
+    def test_lookup_prefers_recorded_pid(self):
+        """Quando o handle guardado some, a nova busca prefere a janela do mesmo processo"""
+        info = self.registry.get("pppoker")
+        self.assertEqual(info.pid, 1000)
+        self.provider.add(MockWindow("PPPoker", hwnd=3, rect=(0, 0, 400, 800)))
+        self.provider.close(10)
+        self.provider.add(MockWindow("PPPoker", hwnd=11, rect=(0, 0, 400, 800), pid=1000))
+        self.assertEqual(self.registry.get("pppoker").hwnd, 11)
+
+    def test_register_switches_to_standby(self):
+        """register() troca o handle e o PID do app pela reserva e a libera das consultas"""
+        standby = self.provider.add(MockWindow("PPPoker", hwnd=20, rect=(0, 0, 400, 800)))
+        self.registry.get("pppoker")
+        self.registry.reserve(20)
+        info = self.registry.register("pppoker", standby)
+        self.assertEqual((info.hwnd, info.pid), (20, 2000))
+        self.provider.close(10)
+        self.assertEqual(self.registry.get("pppoker").hwnd, 20)
+        self.assertNotIn(20, self.registry.reserved)
+
+
+if __name__ == "__main__":
+    unittest.main()
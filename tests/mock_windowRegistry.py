@@ -0,0 +1,64 @@
+class MockWindow:
+    def __init__(self, title, hwnd, rect, client_offset=(8, 31), pid=None):
+        self.title = title
+        self._hWnd = hwnd
+        self.pid = pid if pid is not None else hwnd * 100
+        self.rect = rect
+        self.client_offset = client_offset
+        self.isMinimized = False
+
+    def move(self, dx, dy):
+        left, top, right, bottom = self.rect
+        self.rect = (left + dx, top + dy, right + dx, bottom + dy)
+
+
+class MockWindowProvider:
+    """
+    Provedor de janelas em memória, com a mesma interface do Win32WindowProvider.
+    Conta quantas enumerações (find) e consultas de geometria foram feitas.
+    """
+
+    def __init__(self):
+        self.windows = {}
+        self.find_calls = 0
+        self.geometry_calls = 0
+
+    def add(self, window):
+        self.windows[window._hWnd] = window
+        return window
+
+    def close(self, hwnd):
+        self.windows.pop(hwnd, None)
+
+    def find(self, title):
+        self.find_calls += 1
+        for window in self.windows.values():
+            if title.upper() in window.title.upper():
+                return window
+        return None
+
+    def find_all(self, title):
+        self.find_calls += 1
+        return [window for window in self.windows.values() if title.upper() in window.title.upper()]
+
+    def handle(self, window):
+        return window._hWnd
+
+    def is_valid(self, hwnd):
+        return hwnd in self.windows
+
+    def pid(self, hwnd):
+        return self.windows[hwnd].pid
+
+    def is_minimized(self, hwnd):
+        return self.windows[hwnd].isMinimized
+
+    def window_rect(self, hwnd):
+        return self.windows[hwnd].rect
+
+    def client_geometry(self, hwnd):
+        self.geometry_calls += 1
+        window = self.windows[hwnd]
+        left, top, right, bottom = window.rect
+        dx, dy = window.client_offset
+        return left + dx, top + dy, right - left - 2 * dx, bottom - top - dy - dx
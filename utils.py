@@ -1,4 +1,3 @@
-import subprocess
 import time
 import json
 import os
@@ -7,13 +6,13 @@ import pygetwindow as gw
 import win32gui
 import pyautogui
 
-import psutil
 import re
 from types import MethodType
 from typing import Optional, Callable
 from typing_extensions import Self
 from datetime import datetime as Datetime
 from Constants import question_variable_names, variables_to_questions, absolutePosition, relativePosition, relativeArea
+from windowRegistry import WindowRegistry, WindowInfo, window_registry
 import argparse
 
 def verificaVarEnv(var: str) -> bool:
@@ -28,74 +27,36 @@ class WindowManager:
     Classe incumbida de realizar todo o gerenciamento de janelas.
     Seu construtor inicializa os atributos com valores padrão e recebe como parâmetro o nome do aplicativo inicializado.
     """
-    def __init__(self, app: str):
+    def __init__(self, app: str, registry: Optional[WindowRegistry] = None):
         self.screen_height = 0
         self.screen_width = 0
         self.app = app
-        try:
-            self.app_window: gw.Window = gw.getWindowsWithTitle(app)[0]
-        except IndexError:
-            self.app_window = None
+        self.registry = registry if registry is not None else window_registry
+        info = self.registry.get(app) if app else None
+        self.app_window: gw.Window = info.window if info else None
         self.window_position = None
         self.client_left = 0
         self.client_top = 0
 
+    def apply_window_info(self, info: WindowInfo) -> None:
+        """
+        Método responsável por copiar a janela e a geometria da área cliente guardadas no registro.
+        """
+        self.app_window = info.window
+        self.client_left = info.client_left
+        self.client_top = info.client_top
+        self.screen_width = info.width
+        self.screen_height = info.height
+        self.window_position = (info.client_left, info.client_top)
 
-    def wait_for_process(self, proc_name:str, proc_title:str="") -> psutil.Process:
-        """
-        Método responsável por aguardar a abertura do aplicativo especificado.
-        Recebe como parâmetro:
-        * proc_name: string que armazena o nome do aplicativo em formato .exe;
-        * proc_title: string que armazena o título que aparece quando se inicializa o aplicativo.
-        """
-        if not proc_title:
-            proc_title=proc_name
-
-        proc = None
-        while not proc:
-            for p in psutil.process_iter(attrs=['name']):
-                if proc_name.lower() in p.info['name'].lower():
-                    proc = p
-                    break
-            time.sleep(0.5)
-
-        while not self.app_window:
-            for win in gw.getWindowsWithTitle(""):
-                if proc_name.lower() in win.title.lower():
-                    self.app_window = win
-                    self.screen_width = win.width
-                    self.screen_height = win.height
-                    print(f"Janela detectada na posição: ({win.left}, {win.top}) Dimensões: {self.screen_width}x{self.screen_height}")
-                    break
-            time.sleep(0.5)
-        return proc
-
-    def openapp(self, app_path:str, app_title:str="") -> None:
-        """
-        Método responsável por abrir o aplicativo especificado.
-        Recebe como parâmetros:
-        * app_path: string que armazena o nome do aplicativo em formato .exe;
-        * app_title: string que armazena o título que aparece quando se inicializa o aplicativo.
-        """
-        if not app_title:
-            app_title = app_path
-        app_name = app_title if app_title else self.app.lower().strip()
-        try:
-            window = gw.getWindowsWithTitle(app_name)[0]
-            self.app_window = window
-        except:
-            subprocess.Popen([app_path], shell=True)
-            print(f"Aguardando o processo do {self.app} iniciar...")
-            self.wait_for_process(self.app)
-        
-        # self.wait_for_process(f"{self.app.split('\\')[-1]}.exe", app_title)
-    
     def closeapp(self) -> None:
         """
         Método responsável por fechar o aplicativo especificado.
         """
         if self.app_window:
             self.app_window.close()
+            self.registry.invalidate(self.app)
+            self.app_window = None
             time.sleep(1)
             print(f"Janela do {self.app} fechada.")
         else:
@@ -108,13 +69,19 @@ class WindowManager:
         """
         x, y = position
 
-        if not self.app:
-            for win in gw.getWindowsWithTitle(""):
-                if win.left <= x <= win.right and win.top <= y <= win.bottom:
-                    
-                    break
-        else:
-            win = gw.getWindowsWithTitle(self.app)[0]
+        if self.app:
+            info = self.registry.get(self.app)
+            if info:
+                self.apply_window_info(info)
+                print(f"Janela detectada na posição: ({self.client_left}, {self.client_top}) Dimensões: {self.screen_width}x{self.screen_height}")
+            else:
+                print(f"Window {self.app} position not detected.")
+            return
+
+        for win in gw.getWindowsWithTitle(""):
+            if win.left <= x <= win.right and win.top <= y <= win.bottom:
+                
+                break
         
         self.app_window = win
         
@@ -143,11 +110,10 @@ class WindowManager:
         Recebe como parâmetro o nome do aplicativo a ter sua janela detectada.
         """
         app_name = app if app else self.app.lower().strip()
-        try:
-            window = gw.getWindowsWithTitle(app_name)[0]
-            print(window.left)
-            self.set_app_window((window.left, window.top))
-        except IndexError:
+        info = self.registry.get(app_name)
+        if info:
+            self.apply_window_info(info)
+        else:
             self.window_position = None
             print(f"Window {app_name} position not detected.")
 
@@ -199,10 +165,10 @@ class WindowManager:
 
     def restore_n_focus_window(self) -> None:
         if self.app_window:
-            self.detect_window_position()
-            self.app_window.restore()
+            if self.app_window.isMinimized:
+                self.app_window.restore()
+                time.sleep(0.5)
             self.app_window.activate() # foco na janela
-            time.sleep(0.5)
             self.detect_window_position(app=self.app)
         else:
             print(f"Nao pude focar na janela")
@@ -272,8 +238,9 @@ class Question:
     Todos os atributos são escritos com letra minúscula e sem underline.
     """
 
-    def __init__(self, attrs: dict[str, str|int|list[str]] = {}):
-        self.attrs = attrs
+    def __init__(self, attrs: Optional[dict[str, str|int|list[str]]] = None):
+        # Cada pergunta tem o seu dicionário: um padrão {} seria compartilhado por todos os robôs do processo
+        self.attrs = attrs if attrs is not None else {}
 
     def __getattr__(self, name: str):
         if name.lower() == "timenow":
@@ -407,6 +374,14 @@ def area_subtract(area1: relativeArea, area2: relativeArea) -> relativeArea:
     pos2: relativePosition = (area1[1][0] - area2[1][0], area1[1][1] - area2[1][1])
     return (pos1, pos2)
 
+def color_in_range(detected: tuple, expected: tuple, specific_range: int = 10, total_range: int = 20) -> bool:
+    """
+    Verifica se a cor detectada está próxima da esperada: cada canal dentro de specific_range
+    e a soma das diferenças dentro de total_range.
+    """
+    return all(abs(detected[i] - expected[i]) <= specific_range for i in range(3)) and \
+        sum(abs(detected[i] - expected[i]) for i in range(3)) <= total_range
+
 def parse_date(x):
     if isinstance(x, Datetime):
         return x
@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import defaultdict
+from typing import Optional
+
+import redis
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from Constants import WEBHOOK_TIMEOUT, WEBHOOK_POOL_SIZE, WEBHOOK_MAX_ATTEMPTS, WEBHOOK_BACKOFF_BASE, \
+    WEBHOOK_BACKOFF_MAX, WEBHOOK_POLL_INTERVAL, WEBHOOK_BATCH_MODE, WEBHOOK_BATCH_SIZE, WEBHOOK_BATCH_MAX_WAIT, \
+    WEBHOOK_INFLIGHT_STALE
+
+# Mesmo Redis usado pelo broker do Celery
+REDIS_CLIENT = redis.Redis(host='localhost', port=6379, db=0)
+OUTBOX_KEY = "webhook_outbox"  # sorted set: score = horário da próxima tentativa
+INFLIGHT_KEY = "webhook_outbox:inflight"  # hash com os itens sendo enviados no momento: {"claimed", "item"}
+DEAD_LETTER_KEY = "webhook_outbox:failed"  # lista com os itens que esgotaram as tentativas
+OUTBOX_BATCH = 50  # Itens retirados da fila a cada passada
+
+
+class WebhookDispatcher:
+    """
+    Classe responsável por entregar os resultados dos robôs via webhook, fora do caminho crítico do robô.
+
+    O robô apenas entrega o resultado com submit(), que o grava em uma fila durável no Redis (outbox).
+    Uma thread em segundo plano retira os itens vencidos da fila, agrupa-os por destino e os envia
+    reaproveitando as conexões de uma requests.Session. Falhas voltam para a fila com espera exponencial.
+
+    No modo em lote (WEBHOOK_BATCH_MODE), vários resultados do mesmo destino vão em uma única requisição:
+        {"batch_id": "...", "items": [{"id": "...", "created": 0.0, "payload": {...}}, ...]}
+    O lote é enviado quando atinge WEBHOOK_BATCH_SIZE itens ou quando o mais antigo espera WEBHOOK_BATCH_MAX_WAIT.
+    O receptor pode confirmar parcialmente respondendo {"acknowledged": [ids]}; os demais voltam para a fila.
+
+    Respostas 4xx (exceto 408 e 429) não melhoram com novas tentativas: o item vai direto para a fila de falhas.
+    Vários processos (worker da Celery e Flask) podem ter um despachante; cada item em envio guarda o horário da
+    última atividade e só volta para a fila quando fica WEBHOOK_INFLIGHT_STALE segundos sem atividade. Antes de cada
+    requisição, o horário de todos os itens da passada que ainda esperam é renovado, então basta que uma única
+    requisição (WEBHOOK_TIMEOUT) dure menos que WEBHOOK_INFLIGHT_STALE.
+    """
+
+    _shared: Optional["WebhookDispatcher"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, url: Optional[str] = None, client: Optional[redis.Redis] = None, batch_mode: Optional[bool] = None):
+        load_dotenv()
+        self.default_url = url or os.getenv("WEBHOOK_URL")
+        if batch_mode is None:
+            batch_mode = os.getenv("WEBHOOK_BATCH_MODE", str(WEBHOOK_BATCH_MODE)).strip().lower() in ("1", "true", "yes")
+        self.batch_mode = batch_mode
+        self.client = client if client is not None else REDIS_CLIENT
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=WEBHOOK_POOL_SIZE, pool_maxsize=WEBHOOK_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def shared(cls) -> "WebhookDispatcher":
+        """
+        Método responsável por devolver o despachante único do processo, iniciando-o na primeira chamada.
+        Todos os robôs de um worker compartilham a mesma thread de envio e o mesmo pool de conexões.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+                cls._shared.start()
+            return cls._shared
+
+    def start(self) -> None:
+        """
+        Método responsável por iniciar a thread de envio.
+        Itens abandonados por um processo que caiu no meio do envio voltam para a fila pela própria thread.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._worker, name="WebhookDispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def submit(self, payload: dict, url: Optional[str] = None) -> str:
+        """
+        Método responsável por colocar um resultado na fila de envio e retornar imediatamente.
+        Retorna o id do item, que também é enviado no cabeçalho X-Delivery-Id.
+        """
+        destination = url or self.default_url
+        if not destination:
+            raise ValueError("WEBHOOK_URL não configurada.")
+        item = {
+            "id": uuid.uuid4().hex,
+            "url": destination,
+            "payload": payload,
+            "attempts": 0,
+            "created": time.time()
+        }
+        self.client.zadd(OUTBOX_KEY, {json.dumps(item, default=str): time.time()})
+        self._wake.set()
+        return item["id"]
+
+    def pending(self) -> int:
+        return self.client.zcard(OUTBOX_KEY) + self.client.hlen(INFLIGHT_KEY)
+
+    def backoff(self, attempts: int) -> float:
+        return min(WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1), WEBHOOK_BACKOFF_MAX)
+
+    def _requeue_inflight(self) -> int:
+        """
+        Método responsável por devolver à fila os itens em envio sem atividade há WEBHOOK_INFLIGHT_STALE segundos.
+        Itens ainda sendo enviados por outro processo vivo não são tocados; o HDEL garante que só um processo os devolva.
+        """
+        requeued = 0
+        now = time.time()
+        for item_id, raw in self.client.hgetall(INFLIGHT_KEY).items():
+            entry = json.loads(raw)
+            # Entradas antigas guardavam só o item, sem o horário: tratadas como abandonadas
+            claimed = entry.get("claimed", 0) if "item" in entry else 0
+            if now - claimed < WEBHOOK_INFLIGHT_STALE:
+                continue
+            if self.client.hdel(INFLIGHT_KEY, item_id):
+                self.client.zadd(OUTBOX_KEY, {entry.get("item", raw): now})
+                requeued += 1
+        return requeued
+
+    def _mark_inflight(self, item: dict, raw: str) -> None:
+        self.client.hset(INFLIGHT_KEY, item["id"], json.dumps({"claimed": time.time(), "item": raw}))
+
+    def _refresh_claims(self, waiting: dict[str, dict]) -> None:
+        """
+        Método responsável por renovar, com um único HSET, o horário dos itens retirados da fila e ainda não resolvidos,
+        para que os últimos itens de uma passada lenta não sejam devolvidos à fila por outro processo.
+        """
+        if waiting:
+            now = time.time()
+            self.client.hset(INFLIGHT_KEY, mapping={
+                item_id: json.dumps({"claimed": now, "item": json.dumps(item, default=str)}) for item_id, item in waiting.items()})
+
+    def _batch_ready(self) -> float:
+        """
+        Método responsável por decidir se o lote deve ser enviado agora.
+        Retorna 0 quando o lote está pronto, ou quantos segundos ainda faltam para o item mais antigo vencer.
+        """
+        now = time.time()
+        if self.client.zcount(OUTBOX_KEY, 0, now) >= WEBHOOK_BATCH_SIZE:
+            return 0
+        oldest = self.client.zrangebyscore(OUTBOX_KEY, 0, now, start=0, num=1, withscores=True)
+        if not oldest:
+            return WEBHOOK_POLL_INTERVAL
+        return max(0, oldest[0][1] + WEBHOOK_BATCH_MAX_WAIT - now)
+
+    def _claim_due(self) -> list[dict]:
+        """
+        Método responsável por retirar da fila os itens cuja próxima tentativa já venceu.
+        O ZREM garante que cada item seja enviado por apenas um processo.
+        """
+        claimed = []
+        for raw in self.client.zrangebyscore(OUTBOX_KEY, 0, time.time(), start=0, num=OUTBOX_BATCH):
+            if self.client.zrem(OUTBOX_KEY, raw):
+                item = json.loads(raw)
+                self._mark_inflight(item, raw)
+                claimed.append(item)
+        return claimed
+
+    def _worker(self) -> None:
+        next_requeue = 0.0
+        while not self._stop.is_set():
+            # Qualquer erro (Redis fora do ar, resposta inesperada) é registrado e a thread segue drenando a fila
+            try:
+                if time.monotonic() >= next_requeue:
+                    self._requeue_inflight()
+                    next_requeue = time.monotonic() + WEBHOOK_INFLIGHT_STALE / 2
+                wait = self._batch_ready() if self.batch_mode else 0
+                if wait:
+                    self._wake.wait(min(wait, WEBHOOK_POLL_INTERVAL))
+                    self._wake.clear()
+                    continue
+                if not self._send_due():
+                    self._wake.wait(WEBHOOK_POLL_INTERVAL)
+                    self._wake.clear()
+            except redis.RedisError as e:
+                print(f"Erro ao acessar a fila de webhooks: {e}")
+                self._wake.wait(WEBHOOK_POLL_INTERVAL)
+            except Exception as e:
+                print(f"Erro inesperado no envio de webhooks: {e!r}")
+                self._wake.wait(WEBHOOK_POLL_INTERVAL)
+
+    def _send_due(self) -> int:
+        """
+        Método responsável por uma passada de envio: retira os itens vencidos e os envia, agrupados por destino.
+
+        :return: número de itens retirados da fila
+        """
+        due = self._claim_due()
+        # Itens da passada ainda não resolvidos, cujo horário é renovado antes de cada requisição
+        waiting = {item["id"]: item for item in due}
+        by_destination: dict[str, list[dict]] = defaultdict(list)
+        for item in due:
+            by_destination[item["url"]].append(item)
+        for url, items in by_destination.items():
+            if self.batch_mode:
+                self._deliver_batch(url, items, waiting)
+            else:
+                self._deliver(url, items, waiting)
+        return len(due)
+
+    def _deliver(self, url: str, items: list[dict], waiting: dict[str, dict]) -> None:
+        """
+        Método responsável por enviar os itens de um mesmo destino pela conexão reaproveitada da sessão.
+        """
+        for item in items:
+            self._refresh_claims(waiting)
+            waiting.pop(item["id"], None)
+            try:
+                headers = {'X-Delivery-Id': item["id"], 'X-Created': str(item["created"])}
+                response = self.session.post(url, json=item["payload"], headers=headers, timeout=WEBHOOK_TIMEOUT)
+                response.raise_for_status()
+                self.client.hdel(INFLIGHT_KEY, item["id"])
+            except requests.exceptions.RequestException as e:
+                self._reschedule(item, e)
+
+    def _deliver_batch(self, url: str, items: list[dict], waiting: dict[str, dict]) -> None:
+        """
+        Método responsável por enviar os itens de um mesmo destino agrupados em lotes de WEBHOOK_BATCH_SIZE.
+        Se a resposta não listar os ids confirmados, um status 2xx confirma o lote inteiro.
+        """
+        for start in range(0, len(items), WEBHOOK_BATCH_SIZE):
+            batch = items[start:start + WEBHOOK_BATCH_SIZE]
+            body = {
+                "batch_id": uuid.uuid4().hex,
+                "items": [{"id": item["id"], "created": item["created"], "payload": item["payload"]} for item in batch]
+            }
+            self._refresh_claims(waiting)
+            for item in batch:
+                waiting.pop(item["id"], None)
+            try:
+                response = self.session.post(url, json=body, headers={'X-Batch-Id': body["batch_id"]},
+                                             timeout=WEBHOOK_TIMEOUT)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                for item in batch:
+                    self._reschedule(item, e)
+                continue
+
+            acknowledged = self._acknowledged_ids(response, batch)
+            for item in batch:
+                if item["id"] in acknowledged:
+                    self.client.hdel(INFLIGHT_KEY, item["id"])
+                else:
+                    self._reschedule(item, ValueError("item não confirmado pelo receptor"))
+
+    @staticmethod
+    def _acknowledged_ids(response: requests.Response, batch: list[dict]) -> set[str]:
+        try:
+            acknowledged = response.json().get("acknowledged")
+        except (ValueError, AttributeError):
+            acknowledged = None
+        if acknowledged is None:
+            return {item["id"] for item in batch}
+        return set(acknowledged)
+
+    @staticmethod
+    def _is_permanent(error: Exception) -> bool:
+        """
+        Método responsável por identificar falhas que não mudam com novas tentativas (4xx, exceto 408 e 429).
+        """
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        return isinstance(status, int) and 400 <= status < 500 and status not in (408, 429)
+
+    def _reschedule(self, item: dict, error: Exception) -> None:
+        item["attempts"] += 1
+        self.client.hdel(INFLIGHT_KEY, item["id"])
+        if self._is_permanent(error):
+            print(f"Webhook {item['id']} recusado pelo receptor, sem novas tentativas: {error}")
+            self.client.rpush(DEAD_LETTER_KEY, json.dumps(item, default=str))
+            return
+        if item["attempts"] >= WEBHOOK_MAX_ATTEMPTS:
+            print(f"Webhook {item['id']} descartado após {item['attempts']} tentativas: {error}")
+            self.client.rpush(DEAD_LETTER_KEY, json.dumps(item, default=str))
+            return
+        wait = self.backoff(item["attempts"])
+        print(f"Falha ao enviar webhook {item['id']} ({item['attempts']}ª tentativa): {error}. Nova tentativa em {wait}s")
+        self.client.zadd(OUTBOX_KEY, {json.dumps(item, default=str): time.time() + wait})
@@ -1,9 +1,56 @@
 # webhook_receiver.py
+import os
+import time
+import random
+import threading
 from flask import Flask, request, jsonify
 
 # Create a new Flask application
 app = Flask(__name__)
 
+# Simulate a slow or unreliable receiver to exercise the dispatcher's timeouts and retries
+RECEIVER_DELAY = float(os.getenv("RECEIVER_DELAY", 0))  # seconds to wait before answering
+RECEIVER_FAIL_RATE = float(os.getenv("RECEIVER_FAIL_RATE", 0))  # fraction of requests (or batch items) rejected
+
+# Delivery counters used to measure end-to-end throughput
+stats_lock = threading.Lock()
+stats = {"requests": 0, "delivered": 0, "rejected": 0, "first": None, "last": None, "latency_total": 0.0}
+
+
+def record_delivery(created=None):
+    """
+    Counts one delivered result and, when the sender tells us when it was created, its end-to-end latency.
+    """
+    now = time.time()
+    with stats_lock:
+        stats["delivered"] += 1
+        stats["first"] = stats["first"] or now
+        stats["last"] = now
+        if created:
+            stats["latency_total"] += now - float(created)
+
+
+def handle_batch(data):
+    """
+    Handles the batch format sent by WebhookDispatcher in batch mode:
+        {"batch_id": "...", "items": [{"id": "...", "created": 0.0, "payload": {...}}, ...]}
+    Each item is acknowledged on its own, so the sender only retries the rejected ones.
+    """
+    acknowledged, rejected = [], []
+    for item in data.get("items", []):
+        if not isinstance(item, dict) or "id" not in item or random.random() < RECEIVER_FAIL_RATE:
+            rejected.append(item.get("id") if isinstance(item, dict) else None)
+            continue
+        print(f"Item {item['id']}: {item.get('payload')}")
+        record_delivery(item.get("created"))
+        acknowledged.append(item["id"])
+
+    with stats_lock:
+        stats["rejected"] += len(rejected)
+    print(f"Batch {data.get('batch_id')}: {len(acknowledged)} acknowledged, {len(rejected)} rejected")
+    return jsonify({"status": "success", "batch_id": data.get("batch_id"),
+                    "acknowledged": acknowledged, "rejected": rejected}), 200
+
 # Define an endpoint that accepts POST requests at the /webhook URL
 @app.route('/webhook', methods=['POST'])
 def webhook_listener():
@@ -11,19 +58,50 @@ def webhook_listener():
     This function waits for incoming webhooks.
     """
     print("\n--- Webhook Received! ---")
+    with stats_lock:
+        stats["requests"] += 1
+
+    if RECEIVER_DELAY:
+        time.sleep(RECEIVER_DELAY)
     
     # Check if the incoming request has JSON data
     if request.is_json:
         data = request.get_json()
+        if isinstance(data, dict) and isinstance(data.get("items"), list):
+            return handle_batch(data)
+
+        print(f"Delivery id: {request.headers.get('X-Delivery-Id')}")
+        if random.random() < RECEIVER_FAIL_RATE:
+            print("Simulated failure.")
+            return jsonify({"status": "error", "message": "Simulated failure"}), 503
         print("Data received:")
         print(data)
+        record_delivery(request.headers.get('X-Created'))
         return jsonify({"status": "success", "data_received": data}), 200
     else:
         print("Error: Request was not in JSON format.")
         return jsonify({"status": "error", "message": "Request must be JSON"}), 400
 
+@app.route('/webhook/stats', methods=['GET'])
+def webhook_stats():
+    """
+    Returns how many results were delivered and the delivered results per second since the first one.
+    """
+    with stats_lock:
+        snapshot = dict(stats)
+    elapsed = (snapshot["last"] - snapshot["first"]) if snapshot["first"] else 0
+    delivered = snapshot["delivered"]
+    return jsonify({
+        "requests": snapshot["requests"],
+        "delivered": delivered,
+        "rejected": snapshot["rejected"],
+        "elapsed_s": elapsed,
+        "results_per_second": delivered / elapsed if elapsed else None,
+        "mean_latency_ms": 1000 * snapshot["latency_total"] / delivered if delivered else None
+    }), 200
+
 if __name__ == '__main__':
     # Run the app on a different port to avoid conflicts with your main API.
     # Port 5005 is a good choice.
     print("Local webhook receiver is running on http://localhost:5005")
-    app.run(port=5005, host='0.0.0.0', debug=True)
\ No newline at end of file
+    app.run(port=5005, host='0.0.0.0', debug=True)
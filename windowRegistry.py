@@ -0,0 +1,175 @@
+import threading
+from typing import Optional, Any
+
+import pygetwindow as gw
+import win32gui
+import win32process
+
+windowRect = tuple[int, int, int, int]
+
+
+class WindowInfo:
+    """
+    Classe que armazena o handle, o PID e a geometria da área cliente de uma janela de aplicativo.
+    """
+
+    def __init__(self, window: Any, hwnd: int, window_rect: windowRect,
+                 client_left: int, client_top: int, width: int, height: int, pid: Optional[int] = None):
+        self.window = window
+        self.hwnd = hwnd
+        self.pid = pid
+        self.window_rect = window_rect
+        self.client_left = client_left
+        self.client_top = client_top
+        self.width = width
+        self.height = height
+
+    def __repr__(self) -> str:
+        return (f"WindowInfo(hwnd={self.hwnd}, client=({self.client_left}, {self.client_top}), "
+                f"size={self.width}x{self.height})")
+
+
+class Win32WindowProvider:
+    """
+    Classe responsável por consultar o sistema de janelas do Windows.
+    Apenas find() enumera as janelas; os demais métodos consultam um único handle e são baratos.
+    """
+
+    def find(self, title: str) -> Optional[Any]:
+        windows = gw.getWindowsWithTitle(title)
+        return windows[0] if windows else None
+
+    def find_all(self, title: str) -> list[Any]:
+        return list(gw.getWindowsWithTitle(title))
+
+    def handle(self, window: Any) -> int:
+        return window._hWnd
+
+    def is_valid(self, hwnd: int) -> bool:
+        return bool(win32gui.IsWindow(hwnd))
+
+    def pid(self, hwnd: int) -> int:
+        return win32process.GetWindowThreadProcessId(hwnd)[1]
+
+    def is_minimized(self, hwnd: int) -> bool:
+        return bool(win32gui.IsIconic(hwnd))
+
+    def window_rect(self, hwnd: int) -> windowRect:
+        return tuple(win32gui.GetWindowRect(hwnd))
+
+    def client_geometry(self, hwnd: int) -> tuple[int, int, int, int]:
+        """
+        Retorna (esquerda, topo, largura, altura) da área cliente em coordenadas de tela.
+        """
+        client_rect = win32gui.GetClientRect(hwnd)
+        client_left, client_top = win32gui.ClientToScreen(hwnd, (0, 0))
+        return client_left, client_top, client_rect[2] - client_rect[0], client_rect[3] - client_rect[1]
+
+
+class WindowRegistry:
+    """
+    Classe responsável por guardar, por aplicativo, o handle e a geometria da janela.
+
+    Uma consulta ao registro não enumera as janelas: o handle guardado é validado (IsWindow) e
+    seu retângulo é comparado com o guardado. A geometria da área cliente só é recalculada quando o
+    retângulo muda, e a enumeração (find) só acontece quando o handle deixa de existir ou após invalidate().
+
+    A instância reserva de um app tem o mesmo título da ativa. Por isso as janelas reservadas (reserve()) nunca são
+    devolvidas por título, e a busca prefere a janela do processo (PID) registrado para o app; a troca para a
+    reserva é feita explicitamente com register().
+    """
+
+    def __init__(self, provider: Optional[Any] = None):
+        self.provider = provider if provider is not None else Win32WindowProvider()
+        self.windows: dict[str, WindowInfo] = {}
+        self.pids: dict[str, int] = {}
+        self.reserved: set[int] = set()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(title: str) -> str:
+        return title.strip().lower()
+
+    def get(self, title: str) -> Optional[WindowInfo]:
+        """
+        Método responsável por devolver a janela do aplicativo, reaproveitando o handle guardado sempre que possível.
+        Retorna None se nenhuma janela com o título existir.
+        """
+        key = self._key(title)
+        with self.lock:
+            info = self.windows.get(key)
+            if info and self.provider.is_valid(info.hwnd):
+                rect = self.provider.window_rect(info.hwnd)
+                if rect != info.window_rect and not self.provider.is_minimized(info.hwnd):
+                    self._update_geometry(info, rect)
+                return info
+
+            window = self._find(key, title)
+            if window is None:
+                self.windows.pop(key, None)
+                return None
+            return self._store(key, window)
+
+    def _find(self, key: str, title: str) -> Optional[Any]:
+        """
+        Método responsável por escolher, entre as janelas com o título, a do app: nunca uma reservada e, se houver,
+        a do PID registrado para o app.
+        """
+        candidates = [w for w in self.provider.find_all(title) if self.provider.handle(w) not in self.reserved]
+        pid = self.pids.get(key)
+        if pid is not None:
+            for window in candidates:
+                if self.provider.pid(self.provider.handle(window)) == pid:
+                    return window
+        return candidates[0] if candidates else None
+
+    def _store(self, key: str, window: Any) -> WindowInfo:
+        hwnd = self.provider.handle(window)
+        info = WindowInfo(window, hwnd, (0, 0, 0, 0), 0, 0, 0, 0, pid=self.provider.pid(hwnd))
+        if not self.provider.is_minimized(hwnd):
+            self._update_geometry(info, self.provider.window_rect(hwnd))
+        self.windows[key] = info
+        self.pids[key] = info.pid
+        return info
+
+    def register(self, title: str, window: Any) -> WindowInfo:
+        """
+        Método responsável por definir qual janela representa o aplicativo (ex.: ao trocar pela instância reserva).
+        A janela deixa de ser reservada e o seu PID passa a ser o do app.
+        """
+        with self.lock:
+            self.reserved.discard(self.provider.handle(window))
+            return self._store(self._key(title), window)
+
+    def reserve(self, hwnd: int) -> None:
+        """
+        Método responsável por esconder uma janela das consultas por título (ex.: a instância reserva de um app).
+        """
+        with self.lock:
+            self.reserved.add(hwnd)
+
+    def release(self, hwnd: int) -> None:
+        with self.lock:
+            self.reserved.discard(hwnd)
+
+    def _update_geometry(self, info: WindowInfo, rect: windowRect) -> None:
+        # Janelas minimizadas têm área cliente vazia; mantemos a última geometria válida
+        info.window_rect = rect
+        info.client_left, info.client_top, info.width, info.height = self.provider.client_geometry(info.hwnd)
+
+    def invalidate(self, title: Optional[str] = None) -> None:
+        """
+        Método responsável por descartar a janela guardada (ex.: após fechar o aplicativo).
+        Sem título, descarta todas.
+        """
+        with self.lock:
+            if title is None:
+                self.windows.clear()
+                self.pids.clear()
+            else:
+                self.windows.pop(self._key(title), None)
+                self.pids.pop(self._key(title), None)
+
+
+# Registro compartilhado por todos os WindowManagers do processo
+window_registry = WindowRegistry()